@@ -3,64 +3,2512 @@ Sistema de Gestión de Países
 Maneja información de países con persistencia en CSV
 """
 
+import argparse
+import asyncio
+import atexit
+import bisect
+import contextlib
+import cProfile
 import csv
+import functools
+import gzip
+import heapq
+import io
+import itertools
+import json
+import mmap
 import os
+import pstats
+import signal
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+import unicodedata
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    # Sin NumPy la analítica usa array y listas de Python
+    np = None
+
+try:
+    import fcntl
+except ImportError:
+    # En Windows no hay bloqueo advisory; las escrituras siguen siendo atómicas
+    fcntl = None
 
 # Constantes
 ARCHIVO_CSV = "paises.csv"
 COLUMNAS_CSV = ["nombre", "poblacion", "superficie", "continente"]
 
-"""Funciones auxiliares"""
+# Journal de cambios: cada alta o modificación se agrega al final del
+# journal en lugar de reescribir todo el CSV
+USAR_JOURNAL = True
+EXTENSION_JOURNAL = ".journal"
+JOURNAL_REGISTROS_POR_FSYNC = 16
+JOURNAL_MAX_REGISTROS = 1000
+
+# Al recargar cambios de otro proceso, con más registros distintos que estos
+# conviene reconstruir los índices en lugar de actualizarlos uno por uno
+MAX_CAMBIOS_INCREMENTALES = 1000
+
+# Lectura del CSV: filas por lote, procesos para la carga en paralelo
+# (1 = lectura en el proceso principal) y reporte de filas rechazadas
+TAMANO_LOTE = 10000
+PROCESOS_CARGA = 1
+EXTENSION_RECHAZADOS = ".rechazados.csv"
+
+# Formatos de archivo según la extensión; con ".gz" al final además se
+# comprimen con gzip (por ejemplo "paises.csv.gz" o "paises.bin.gz")
+FORMATOS_ARCHIVO = {".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl", ".bin": "bin"}
+NIVEL_COMPRESION = 6
+MARCA_BINARIO = b"PAISREG2"
+# Cada registro empieza con población, superficie, código de continente y
+# bytes del nombre. Un valor que no entra se marca con el máximo del campo
+# y sigue completo a continuación ("<Q" los números, "<I" el largo). Un
+# código nuevo va seguido del continente (largo "<H" y UTF-8), así cada
+# continente se escribe una sola vez; al final va el nombre en UTF-8
+FORMATO_REGISTRO_BINARIO = "<IIHB"
+NUMERO_AMPLIO_BINARIO = 0xFFFFFFFF
+NOMBRE_LARGO_BINARIO = 0xFF
+TAMANO_BLOQUE_BINARIO = 1 << 20
+
+# Bloqueo entre procesos para escribir el CSV y el journal
+EXTENSION_BLOQUEO = ".lock"
+INTENTOS_LECTURA = 3
+
+# Snapshot binario del CSV para acelerar el inicio
+USAR_SNAPSHOT = True
+EXTENSION_SNAPSHOT = ".snap"
+MARCA_SNAPSHOT = b"PAISSNP3"
+# Marca, tamaño y mtime del CSV, cantidad de filas y de continentes distintos
+FORMATO_CABECERA_SNAPSHOT = "<8sQqQQ"
+# Separa los textos del snapshot; un texto que lo contenga impide guardarlo
+SEPARADOR_SNAPSHOT = "\x00"
+
+# Instrumentación opcional: se activa con la variable de entorno PAISES_PERFIL=1
+# (o --perfil en el modo consulta); PAISES_CPROFILE=<operación> además perfila
+# con cProfile la primera llamada de esa operación
+VARIABLE_PERFIL = "PAISES_PERFIL"
+VARIABLE_CPROFILE = "PAISES_CPROFILE"
+FUNCIONES_INSTRUMENTADAS = [
+    "cargar_paises", "guardar_paises", "persistir_cambio", "importar_paises",
+    "buscar_pais_por_nombre", "buscar_por_subcadena", "filtrar_rango",
+    "buscar_parecidos", "consultar_paises", "obtener_orden", "obtener_ranking", "obtener_estadisticas",
+    "calcular_analitica",
+]
+
+# Servidor de consultas local
+HOST_SERVIDOR = "127.0.0.1"
+PUERTO_SERVIDOR = 8765
+CONEXIONES_EN_ESPERA = 2048
+MAXIMO_SOLICITUD = 2 ** 20  # bytes por línea JSON
+INTERVALO_RECARGA_SERVIDOR = 1.0  # segundos entre revisiones de cambios externos
+
+# Representación en memoria: lista de diccionarios o tabla columnar compacta
+USAR_TABLA_COLUMNAR = False
+
+# Motor de almacenamiento: "csv" (todo en memoria) o "sqlite" (base en disco
+# consultada con SQL); ESPERA_SQLITE son los segundos de espera si otro
+# proceso está escribiendo
+MOTOR_ALMACENAMIENTO = "csv"
+ARCHIVO_SQLITE = "paises.db"
+ESPERA_SQLITE = 10
+
+# Presentación de tablas: filas por página en el menú y por escritura sin paginar
+FILAS_POR_PAGINA = 50
+FILAS_POR_BLOQUE = 10000
+ENCABEZADO_TABLA = (
+    "-" * 90 + "\n"
+    + f"{'País':<25} {'Población':>15} {'Superficie (km²)':>18} {'Continente':<20}\n"
+    + "-" * 90 + "\n"
+)
+
+# Términos de búsqueda normalizados que se recuerdan (caché LRU)
+TAMANO_CACHE_TERMINOS = 1024
+
+# Resultados de consultas que se recuerdan (caché LRU); 0 la desactiva
+TAMANO_CACHE_CONSULTAS = 256
+# Total de posiciones guardadas entre todos los resultados de la caché
+# (unos 36 bytes cada una); un resultado más grande no se guarda
+MAX_POSICIONES_CACHE = 1_000_000
+
+"""Funciones auxiliares"""
+
+# Estado de la consola
+consola = {"ansi_habilitado": False}
+
+def limpiar_consola():
+    """
+    Limpia la pantalla de la consola con secuencias de escape ANSI, sin abrir
+    una shell. En Windows la primera llamada habilita esas secuencias.
+    No hace nada si la salida no es una terminal.
+    """
+    if not sys.stdout.isatty():
+        return
+    if os.name == 'nt' and not consola["ansi_habilitado"]:
+        os.system('')
+        consola["ansi_habilitado"] = True
+    sys.stdout.write("\033[2J\033[3J\033[H")
+    sys.stdout.flush()
+
+def formatear_fila(pais):
+    """Retorna la línea de la tabla correspondiente a un país."""
+    return f"{pais['nombre']:<25} {pais['poblacion']:>15,} {pais['superficie']:>18,} {pais['continente']:<20}\n"
+
+def imprimir_tabla(paises, posiciones=None, desde=0, limite=None, paginar=True):
+    """
+    Imprime como tabla los países de las posiciones indicadas (todas por defecto),
+    dentro de la ventana desde/limite. Cada página se arma y se escribe de una vez,
+    y solo se formatean las filas que se muestran. Con paginar, pregunta entre
+    páginas si continuar. Retorna la cantidad de filas mostradas.
+    """
+    if posiciones is None:
+        posiciones = range(len(paises))
+    hasta = len(posiciones) if limite is None else min(len(posiciones), desde + limite)
+    tamano = FILAS_POR_PAGINA if paginar else FILAS_POR_BLOQUE
+    
+    sys.stdout.write(ENCABEZADO_TABLA)
+    inicio = desde
+    while inicio < hasta:
+        fin = min(inicio + tamano, hasta)
+        sys.stdout.write("".join(formatear_fila(paises[i]) for i in itertools.islice(posiciones, inicio, fin)))
+        inicio = fin
+        if paginar and inicio < hasta:
+            sys.stdout.flush()
+            respuesta = input(f"-- {inicio} de {len(posiciones)}. Enter para ver más, Q para terminar -- ")
+            if respuesta.strip().lower() == 'q':
+                break
+    sys.stdout.flush()
+    return inicio - desde
+
+def normalizar_texto(texto):
+    """Normaliza texto eliminando espacios extras y convirtiendo a minúsculas."""
+    return " ".join(texto.split()).lower()
+
+@functools.lru_cache(maxsize=TAMANO_CACHE_TERMINOS)
+def normalizar_termino(termino):
+    """
+    Normaliza un término ingresado por el usuario recordando los últimos usados.
+    También se usa para los continentes, que se repiten en muchos registros.
+    """
+    return normalizar_texto(termino)
+
+def crear_pais(nombre, poblacion, superficie, continente, nombre_norm=None, continente_norm=None):
+    """
+    Retorna el registro de un país con el nombre y el continente ya normalizados,
+    para no volver a normalizarlos en cada búsqueda u ordenamiento. Si ya se
+    conocen, nombre_norm y continente_norm no se vuelven a calcular.
+    """
+    return {
+        "nombre": nombre,
+        "poblacion": poblacion,
+        "superficie": superficie,
+        "continente": continente,
+        "nombre_norm": normalizar_texto(nombre) if nombre_norm is None else nombre_norm,
+        "continente_norm": normalizar_termino(continente) if continente_norm is None else continente_norm
+    }
+
+def clave_normalizada(pais, columna):
+    """
+    Retorna el nombre o el continente normalizado de un país, usando la clave
+    guardada en el registro o calculándola si el registro no la tiene.
+    """
+    valor = pais.get(columna + "_norm")
+    return normalizar_texto(pais[columna]) if valor is None else valor
+
+def cargar_paises(rechazados=None):
+    """
+    Carga la lista de países desde el archivo CSV.
+    Retorna lista vacía si el archivo no existe.
+    Si se pasa la lista rechazados, agrega allí las filas descartadas
+    cuando el CSV se lee (no al usar el snapshot).
+    No toma el bloqueo: si otro proceso reemplaza el CSV durante la lectura,
+    vuelve a leer.
+    Con el motor SQLite retorna la tabla de la base sin cargarla en memoria.
+    """
+    if MOTOR_ALMACENAMIENTO == "sqlite":
+        return TablaSQLite(ARCHIVO_SQLITE)
+    
+    paises, antes = leer_paises_consistentes(rechazados)
+    registrar_estado_en_disco(antes)
+    estado_archivo["pendientes"] = {}
+    reconstruir_indices(paises)
+    return paises
+
+def leer_paises_consistentes(rechazados=None):
+    """
+    Lee los países de disco y retorna (países, estado de los archivos leídos).
+    Si otro proceso reemplaza el CSV durante la lectura, vuelve a leer.
+    El snapshot se guarda solo con la lectura aceptada, antes de aplicarle
+    el journal.
+    """
+    for _ in range(INTENTOS_LECTURA):
+        antes = estado_en_disco()
+        descartadas = []
+        paises, estado = leer_archivo_paises(descartadas)
+        registros, _ = leer_journal_desde(0)
+        if estado_en_disco()[0] == antes[0]:
+            break
+    
+    if estado is not None and USAR_SNAPSHOT and not archivo_cambiado(estado):
+        guardar_snapshot(paises, estado)
+    aplicar_journal(paises, registros)
+    if rechazados is not None:
+        rechazados.extend(descartadas)
+    return paises, antes
+
+def leer_paises_de_disco(rechazados=None):
+    """Lee los países del CSV (o su snapshot) y les aplica el journal."""
+    paises, _ = leer_archivo_paises(rechazados)
+    aplicar_journal(paises)
+    return paises
+
+def leer_archivo_paises(rechazados=None):
+    """
+    Lee los países del CSV o de su snapshot, sin aplicar el journal.
+    Retorna (países, estado): el os.stat del CSV tal como estaba antes de
+    leerlo, al que se puede asociar el snapshot, o None si se usó el
+    snapshot o el CSV no existe.
+    """
+    paises = cargar_snapshot() if USAR_SNAPSHOT else None
+    if paises is not None:
+        return paises, None
+    
+    paises = TablaPaises() if USAR_TABLA_COLUMNAR else []
+    estado = None
+    if os.path.exists(ARCHIVO_CSV):
+        estado = os.stat(ARCHIVO_CSV)
+        descartadas = []
+        formato = detectar_formato(ARCHIVO_CSV)
+        if formato == ("csv", False) and PROCESOS_CARGA > 1:
+            lotes = [cargar_paises_paralelo(ARCHIVO_CSV, PROCESOS_CARGA, descartadas)]
+        elif formato[0] == "csv":
+            lotes = leer_paises_por_lotes(ARCHIVO_CSV, TAMANO_LOTE, descartadas)
+        else:
+            lotes = [leer_registros(ARCHIVO_CSV, descartadas)]
+        for lote in lotes:
+            for pais in lote:
+                paises.append(pais)
+        guardar_reporte_rechazados(descartadas)
+        if rechazados is not None:
+            rechazados.extend(descartadas)
+    return paises, estado
+
+def guardar_paises(paises):
+    """
+    Guarda la lista de países en el archivo CSV (o en el formato que indique
+    su extensión, ver escribir_registros).
+    Escribe un archivo temporal y lo reemplaza en forma atómica, de modo que
+    quien lea el CSV nunca lo vea a medio escribir. Si otro proceso modificó
+    los archivos desde la última lectura, primero incorpora esos cambios.
+    Como el CSV queda completo, el journal pendiente se descarta.
+    Con el motor SQLite solo confirma los cambios pendientes en la base.
+    """
+    if isinstance(paises, TablaSQLite):
+        paises.confirmar()
+        return
+    
+    with bloqueo_escritura():
+        if modificado_por_otro_proceso():
+            fusionar_cambios_externos(paises)
+        escribir_archivo_paises(paises)
+        registrar_estado_en_disco(estado_en_disco())
+        estado_archivo["pendientes"] = {}
+
+def escribir_archivo_paises(paises):
+    """
+    Escribe la lista en un archivo temporal, lo pone en lugar del CSV en forma
+    atómica, descarta el journal, cuyos cambios quedaron en el CSV, y guarda
+    el snapshot asociado al archivo escrito. Solo lee la lista: puede correr en otro hilo mientras nadie la modifique.
+    Debe llamarse con el bloqueo de escritura tomado.
+    """
+    directorio = os.path.dirname(os.path.abspath(ARCHIVO_CSV))
+    descriptor, temporal = tempfile.mkstemp(prefix=".paises-", suffix=".tmp", dir=directorio)
+    os.close(descriptor)
+    try:
+        formato, comprimido = detectar_formato(ARCHIVO_CSV)
+        escribir_registros(temporal, paises, formato, comprimido, sincronizar=True)
+        if metricas["activo"]:
+            metricas["bytes_escritos"] += os.path.getsize(temporal)
+        copiar_permisos(temporal)
+        # os.replace conserva el tamaño y la fecha: el snapshot se asocia al temporal
+        estado = os.stat(temporal)
+        os.replace(temporal, ARCHIVO_CSV)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    descartar_journal()
+    if USAR_SNAPSHOT:
+        guardar_snapshot(paises, estado)
+
+"""Escritura concurrente"""
+
+# Estado de los archivos según los vio este proceso por última vez:
+# marca del CSV (tamaño, mtime), tamaño esperado del journal, si otro proceso
+# escribió desde entonces y los cambios propios aún no guardados en disco
+estado_archivo = {
+    "csv": None,
+    "journal": 0,
+    "desactualizado": False,
+    "pendientes": {},
+}
+
+def ruta_bloqueo():
+    """Retorna la ruta del archivo de bloqueo asociado al CSV."""
+    return ARCHIVO_CSV + EXTENSION_BLOQUEO
+
+@contextlib.contextmanager
+def bloqueo_escritura():
+    """
+    Bloqueo exclusivo entre procesos para escribir el CSV o el journal.
+    Los lectores no lo toman. Sin fcntl (Windows) no bloquea.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(ruta_bloqueo(), mode='a') as archivo:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+
+def estado_en_disco():
+    """Retorna ((tamaño, mtime) del CSV o None, tamaño del journal)."""
+    try:
+        informacion = os.stat(ARCHIVO_CSV)
+        marca_csv = (informacion.st_size, informacion.st_mtime_ns)
+    except FileNotFoundError:
+        marca_csv = None
+    try:
+        tamano_journal = os.path.getsize(ruta_journal())
+    except FileNotFoundError:
+        tamano_journal = 0
+    return marca_csv, tamano_journal
+
+def registrar_estado_en_disco(estado):
+    """Registra el estado de los archivos como visto por este proceso."""
+    estado_archivo["csv"], estado_archivo["journal"] = estado
+    estado_archivo["desactualizado"] = False
+
+def modificado_por_otro_proceso():
+    """Indica si el CSV o el journal cambiaron desde la última lectura o escritura propia."""
+    return estado_archivo["desactualizado"] or estado_en_disco() != (estado_archivo["csv"], estado_archivo["journal"])
+
+def copiar_permisos(ruta):
+    """Da al archivo los permisos del CSV actual, o los de un archivo nuevo."""
+    if os.path.exists(ARCHIVO_CSV):
+        os.chmod(ruta, os.stat(ARCHIVO_CSV).st_mode & 0o777)
+    else:
+        mascara = os.umask(0)
+        os.umask(mascara)
+        os.chmod(ruta, 0o666 & ~mascara)
+
+def marcar_pendiente(pais):
+    """Registra un cambio propio que todavía no está escrito en disco."""
+    estado_archivo["pendientes"][clave_normalizada(pais, "nombre")] = dict(pais)
+
+def fusionar_cambios_externos(paises):
+    """
+    Vuelve a leer el CSV y el journal, les reaplica los cambios propios
+    pendientes y reemplaza con el resultado el contenido de la lista.
+    Debe llamarse con el bloqueo de escritura tomado.
+    """
+    incorporar_paises(paises, releer_paises_de_disco())
+
+def releer_paises_de_disco():
+    """
+    Cierra el journal abierto y retorna los países leídos de disco, sin tocar
+    la lista cargada. Debe llamarse con el bloqueo de escritura tomado.
+    """
+    if journal["archivo"] is not None:
+        journal["archivo"].close()
+        journal["archivo"] = None
+    return leer_paises_de_disco()
+
+def reemplazar_contenido(paises, en_disco):
+    """
+    Reemplaza el contenido de la lista por los países leídos de disco,
+    reaplicando los cambios propios pendientes, y reconstruye los índices.
+    """
+    posiciones = {}
+    for i, p in enumerate(en_disco):
+        posiciones.setdefault(clave_normalizada(p, "nombre"), i)
+    for nombre_norm, pais in estado_archivo["pendientes"].items():
+        if nombre_norm in posiciones:
+            en_disco[posiciones[nombre_norm]] = pais
+        else:
+            posiciones[nombre_norm] = len(en_disco)
+            en_disco.append(pais)
+    
+    filas = [dict(p) for p in en_disco]
+    paises.clear()
+    for fila in filas:
+        paises.append(fila)
+    reconstruir_indices(paises)
+
+def incorporar_paises(paises, en_disco):
+    """
+    Actualiza la lista con los países leídos de disco comparando por nombre:
+    reemplaza solo los registros que cambiaron y agrega los nuevos, manteniendo
+    los índices con registrar_pais. Los cambios propios pendientes tienen
+    prioridad. Si en disco falta algún país de la lista o hay más de
+    MAX_CAMBIOS_INCREMENTALES cambios, reemplaza todo y reconstruye los índices.
+    Retorna la cantidad de registros agregados, modificados o quitados.
+    """
+    por_nombre = obtener_indice(paises, "por_nombre")
+    pendientes = estado_archivo["pendientes"]
+    
+    cambios = []
+    vistos = set(pendientes)
+    for pais in en_disco:
+        nombre_norm = clave_normalizada(pais, "nombre")
+        if nombre_norm in vistos:
+            continue
+        vistos.add(nombre_norm)
+        indice = por_nombre.get(nombre_norm)
+        if indice is None or any(paises[indice][columna] != pais[columna] for columna in COLUMNAS_CSV):
+            cambios.append((indice, pais))
+    
+    faltantes = por_nombre.keys() - vistos
+    if len(cambios) > MAX_CAMBIOS_INCREMENTALES or faltantes:
+        reemplazar_contenido(paises, en_disco)
+        return len(cambios) + len(faltantes)
+    
+    for indice, pais in cambios:
+        aplicar_cambio_externo(paises, indice, pais)
+    return len(cambios)
+
+def aplicar_cambio_externo(paises, indice, pais):
+    """Agrega el país (indice None) o reemplaza el de esa posición y actualiza los índices."""
+    if indice is None:
+        paises.append(dict(pais))
+        registrar_pais(paises, len(paises) - 1)
+    else:
+        anterior = dict(paises[indice])
+        paises[indice] = dict(pais)
+        registrar_pais(paises, indice, anterior)
+
+def recargar_cambios_externos(paises):
+    """
+    Incorpora los cambios que otro proceso escribió en el CSV o en el journal
+    desde la última lectura o escritura propia. Solo compara tamaño y fecha de
+    modificación, así que sin cambios no lee nada. Si solo creció el journal,
+    aplica únicamente los registros nuevos; si cambió el CSV, lo vuelve a leer
+    y actualiza solo los países que difieren. Retorna la cantidad de registros
+    agregados, modificados o quitados. Con el motor SQLite no hace nada: la base ya
+    muestra los cambios confirmados por otras conexiones.
+    """
+    if isinstance(paises, TablaSQLite) or not modificado_por_otro_proceso():
+        return 0
+    return incorporar_cambios_externos(paises, *leer_cambios_externos())
+
+def leer_cambios_externos():
+    """
+    Lee de disco lo que otro proceso escribió desde la última lectura o
+    escritura propia, sin tocar la lista cargada. Retorna (registros, completo,
+    estado): los registros nuevos del journal o, con completo, todos los países
+    de disco, y el estado de los archivos leídos. Solo lee archivos, así que
+    el servidor puede ejecutarla en otro hilo.
+    """
+    marca_csv, tamano_journal = estado_en_disco()
+    if (not estado_archivo["desactualizado"] and marca_csv == estado_archivo["csv"]
+            and tamano_journal > estado_archivo["journal"]):
+        registros, leidos = leer_journal_desde(estado_archivo["journal"])
+        return registros, False, (marca_csv, estado_archivo["journal"] + leidos)
+    
+    en_disco, antes = leer_paises_consistentes()
+    return en_disco, True, antes
+
+def incorporar_cambios_externos(paises, registros, completo, estado):
+    """
+    Aplica a la lista lo leído con leer_cambios_externos y registra el estado
+    de los archivos. Retorna la cantidad de registros agregados, modificados o quitados.
+    """
+    if completo:
+        cambios = incorporar_paises(paises, registros)
+    else:
+        por_nombre = obtener_indice(paises, "por_nombre")
+        cambios = 0
+        for pais in registros:
+            indice = por_nombre.get(pais["nombre_norm"])
+            if indice is None or any(paises[indice][columna] != pais[columna] for columna in COLUMNAS_CSV):
+                aplicar_cambio_externo(paises, indice, pais)
+                cambios += 1
+        journal["registros"] += len(registros)
+    registrar_estado_en_disco(estado)
+    return cambios
+
+"""Lectura del CSV"""
+
+def convertir_fila(valores, estricto=False):
+    """
+    Convierte los valores de una fila (nombre, población, superficie, continente)
+    en un país. Retorna (pais, None) o (None, motivo) si la fila no es válida.
+    Con estricto además exige las reglas de un alta (ver motivo_rechazo_alta).
+    """
+    if len(valores) != len(COLUMNAS_CSV):
+        return None, f"se esperaban {len(COLUMNAS_CSV)} columnas y hay {len(valores)}"
+    
+    nombre, poblacion, superficie, continente = valores
+    if not poblacion.isdecimal():
+        return None, f"población inválida: '{poblacion}'"
+    if not superficie.isdecimal():
+        return None, f"superficie inválida: '{superficie}'"
+    
+    pais = crear_pais(nombre, int(poblacion), int(superficie), continente)
+    motivo = motivo_rechazo_alta(pais) if estricto else None
+    return (None, motivo) if motivo else (pais, None)
+
+def motivo_rechazo_alta(pais):
+    """
+    Retorna por qué el país no cumple las reglas de un alta desde el menú
+    (nombre y continente no vacíos, población y superficie mayores que 0),
+    o None si las cumple.
+    """
+    if not pais["nombre"].strip() or not pais["continente"].strip():
+        return "el nombre y el continente no pueden estar vacíos"
+    if pais["poblacion"] <= 0 or pais["superficie"] <= 0:
+        return "la población y la superficie deben ser mayores que 0"
+    return None
+
+def posiciones_de_columnas(encabezado):
+    """Retorna la posición de cada columna esperada dentro del encabezado."""
+    return [encabezado.index(columna) for columna in COLUMNAS_CSV]
+
+def leer_paises_por_lotes(ruta, tamano_lote=TAMANO_LOTE, rechazados=None, estricto=False):
+    """
+    Generador que lee el CSV en forma incremental y entrega listas de hasta
+    tamano_lote países. Las filas inválidas se agregan a rechazados como
+    diccionarios con el número de línea, el contenido y el motivo; las
+    líneas en blanco se saltean.
+    Si la ruta termina en ".gz" lo descomprime al leer. Con estricto
+    rechaza además las filas que no cumplen las reglas de un alta.
+    """
+    with abrir_archivo(ruta) as archivo:
+        lector = csv.reader(archivo)
+        encabezado = next(lector, None)
+        if encabezado is None:
+            return
+        posiciones = posiciones_de_columnas(encabezado)
+        
+        lote = []
+        for fila in lector:
+            # Las líneas en blanco no son filas rechazadas
+            if not fila:
+                continue
+            if len(fila) == len(encabezado):
+                fila = [fila[i] for i in posiciones]
+            pais, motivo = convertir_fila(fila, estricto)
+            if pais is not None:
+                lote.append(pais)
+                if len(lote) >= tamano_lote:
+                    yield lote
+                    lote = []
+            elif rechazados is not None:
+                rechazados.append({"linea": lector.line_num, "contenido": ",".join(fila), "motivo": motivo})
+        if lote:
+            yield lote
+        if metricas["activo"]:
+            metricas["bytes_leidos"] += archivo.tell()
+            metricas["filas_escaneadas"] += lector.line_num - 1
+
+def analizar_fragmento(ruta, inicio, fin, posiciones, cantidad_columnas):
+    """
+    Analiza las líneas completas entre los bytes inicio y fin del CSV.
+    Se ejecuta en un proceso aparte dentro de cargar_paises_paralelo; para
+    abaratar la transferencia retorna columnas en lugar de diccionarios:
+    (nombres, nombres normalizados, poblaciones, superficies, continentes,
+    rechazados, cantidad de líneas), con la línea de cada rechazo relativa al fragmento.
+    """
+    with open(ruta, mode='rb') as archivo:
+        archivo.seek(inicio)
+        texto = archivo.read(fin - inicio).decode('utf-8')
+    
+    nombres, nombres_norm, continentes, continentes_norm = [], [], [], []
+    poblaciones, superficies = array('q'), array('q')
+    rechazados = []
+    lector = csv.reader(io.StringIO(texto, newline=''))
+    for fila in lector:
+        if not fila:
+            continue
+        if len(fila) == cantidad_columnas:
+            fila = [fila[i] for i in posiciones]
+        pais, motivo = convertir_fila(fila)
+        if pais is not None:
+            nombres.append(pais["nombre"])
+            nombres_norm.append(pais["nombre_norm"])
+            poblaciones.append(pais["poblacion"])
+            superficies.append(pais["superficie"])
+            continentes.append(pais["continente"])
+            continentes_norm.append(pais["continente_norm"])
+        else:
+            rechazados.append({"linea": lector.line_num, "contenido": ",".join(fila), "motivo": motivo})
+    
+    return (nombres, nombres_norm, poblaciones, superficies, continentes, continentes_norm,
+            rechazados, texto.count("\n"))
+
+def cargar_paises_paralelo(ruta, procesos, rechazados=None):
+    """
+    Carga el CSV dividiéndolo en rangos de bytes que se analizan en paralelo
+    y se unen en orden. Supone un registro por línea (sin saltos de línea
+    dentro de campos entrecomillados). Los textos ya llegan normalizados
+    desde cada proceso, así que la unión no vuelve a normalizarlos.
+    """
+    tamano = os.path.getsize(ruta)
+    with open(ruta, mode='rb') as archivo:
+        encabezado = archivo.readline()
+        columnas = next(csv.reader([encabezado.decode('utf-8')]))
+        posiciones = posiciones_de_columnas(columnas)
+        
+        # Cortes alineados al final de línea siguiente a cada división
+        cortes = [archivo.tell()]
+        paso = max(1, (tamano - cortes[0]) // procesos)
+        for k in range(1, procesos):
+            archivo.seek(max(cortes[-1], cortes[0] + k * paso))
+            archivo.readline()
+            if archivo.tell() < tamano:
+                cortes.append(archivo.tell())
+        cortes.append(tamano)
+    
+    paises = []
+    linea_inicial = 2
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        cantidad = len(cortes) - 1
+        fragmentos = ejecutor.map(analizar_fragmento, [ruta] * cantidad, cortes[:-1], cortes[1:],
+                                  [posiciones] * cantidad, [len(columnas)] * cantidad)
+        for (nombres, nombres_norm, poblaciones, superficies, continentes, continentes_norm,
+             descartados, lineas) in fragmentos:
+            paises.extend(
+                crear_pais(nombre, poblacion, superficie, continente, nombre_norm, continente_norm)
+                for nombre, nombre_norm, poblacion, superficie, continente, continente_norm
+                in zip(nombres, nombres_norm, poblaciones, superficies, continentes, continentes_norm)
+            )
+            if rechazados is not None:
+                for rechazo in descartados:
+                    rechazo["linea"] += linea_inicial - 1
+                    rechazados.append(rechazo)
+            linea_inicial += lineas
+    
+    return paises
+
+def ruta_reporte_rechazados():
+    """Retorna la ruta del reporte de filas rechazadas del archivo CSV."""
+    return ARCHIVO_CSV + EXTENSION_RECHAZADOS
+
+def guardar_reporte_rechazados(rechazados):
+    """
+    Escribe el reporte de filas rechazadas junto al CSV, o lo elimina
+    si no hubo rechazos. Si no se puede escribir, se omite.
+    """
+    try:
+        if not rechazados:
+            if os.path.exists(ruta_reporte_rechazados()):
+                os.remove(ruta_reporte_rechazados())
+            return
+        with open(ruta_reporte_rechazados(), mode='w', encoding='utf-8', newline='') as archivo:
+            escritor = csv.DictWriter(archivo, fieldnames=["linea", "motivo", "contenido"])
+            escritor.writeheader()
+            escritor.writerows(rechazados)
+    except OSError:
+        pass
+
+"""Formatos de archivo"""
+
+def detectar_formato(ruta):
+    """
+    Retorna (formato, comprimido) según la extensión de la ruta, por ejemplo
+    "paises.jsonl.gz" -> ("jsonl", True). Las extensiones desconocidas son CSV.
+    """
+    nombre = ruta.lower()
+    comprimido = nombre.endswith(".gz")
+    if comprimido:
+        nombre = nombre[:-3]
+    return FORMATOS_ARCHIVO.get(os.path.splitext(nombre)[1], "csv"), comprimido
+
+def abrir_archivo(ruta, modo="r"):
+    """
+    Abre el archivo para leer como texto UTF-8 ("r") o como bytes ("rb"),
+    descomprimiéndolo con gzip si la ruta termina en ".gz".
+    """
+    comprimido = detectar_formato(ruta)[1]
+    if modo == "rb":
+        return gzip.open(ruta, mode="rb") if comprimido else open(ruta, mode="rb")
+    if comprimido:
+        return gzip.open(ruta, mode="rt", encoding='utf-8', newline='')
+    return open(ruta, mode='r', encoding='utf-8', newline='')
+
+def leer_registros(ruta, rechazados=None, estricto=False):
+    """
+    Generador de países de un archivo CSV, JSON lines o binario (según la
+    extensión, comprimido o no). Entrega un país a la vez, sin cargar el
+    archivo en memoria. Con estricto rechaza además los registros que no
+    cumplen las reglas de un alta.
+    """
+    formato = detectar_formato(ruta)[0]
+    if formato == "jsonl":
+        yield from leer_registros_json(ruta, rechazados, estricto)
+    elif formato == "bin":
+        yield from leer_registros_binarios(ruta, rechazados, estricto)
+    else:
+        for lote in leer_paises_por_lotes(ruta, TAMANO_LOTE, rechazados, estricto):
+            yield from lote
+
+def leer_registros_binarios(ruta, rechazados=None, estricto=False):
+    """
+    Generador de países de un archivo binario de registros (ver
+    FORMATO_REGISTRO_BINARIO). Lee por bloques de tamaño fijo; un registro
+    incompleto al final se agrega a rechazados.
+    """
+    with abrir_archivo(ruta, "rb") as archivo:
+        if archivo.read(len(MARCA_BINARIO)) != MARCA_BINARIO:
+            raise ValueError(f"'{ruta}' no es un archivo binario de países")
+        numero = 0
+        leidos = len(MARCA_BINARIO)
+        continentes = []
+        continentes_norm = []
+        datos = b""
+        while True:
+            bloque = archivo.read(TAMANO_BLOQUE_BINARIO)
+            if not bloque:
+                break
+            leidos += len(bloque)
+            datos = datos + bloque if datos else bloque
+            desde = 0
+            while True:
+                registro = desempaquetar_registro_binario(datos, desde, len(continentes))
+                if registro is None:
+                    break
+                nombre, poblacion, superficie, codigo, continente, desde = registro
+                if continente is not None:
+                    continentes.append(continente)
+                    continentes_norm.append(normalizar_termino(continente))
+                numero += 1
+                pais = crear_pais(nombre, poblacion, superficie, continentes[codigo],
+                                  continente_norm=continentes_norm[codigo])
+                motivo = motivo_rechazo_alta(pais) if estricto else None
+                if motivo is None:
+                    yield pais
+                elif rechazados is not None:
+                    rechazados.append({"linea": numero, "contenido": pais["nombre"], "motivo": motivo})
+            datos = datos[desde:]
+        if metricas["activo"]:
+            metricas["bytes_leidos"] += leidos
+            metricas["filas_escaneadas"] += numero
+    if datos and rechazados is not None:
+        rechazados.append({"linea": numero + 1, "contenido": datos[:80].hex(), "motivo": "registro incompleto"})
+
+def desempaquetar_registro_binario(datos, desde, cantidad_continentes):
+    """
+    Decodifica el registro que empieza en el byte desde. Retorna (nombre,
+    población, superficie, código de continente, continente nuevo o None,
+    byte siguiente al registro), o None si el registro no está completo en datos.
+    """
+    inicio = desde + struct.calcsize(FORMATO_REGISTRO_BINARIO)
+    if inicio > len(datos):
+        return None
+    poblacion, superficie, codigo, largo_nombre = struct.unpack_from(FORMATO_REGISTRO_BINARIO, datos, desde)
+    if codigo > cantidad_continentes:
+        raise ValueError(f"código de continente inválido en el byte {desde}")
+    try:
+        if poblacion == NUMERO_AMPLIO_BINARIO:
+            poblacion, = struct.unpack_from("<Q", datos, inicio)
+            inicio += 8
+        if superficie == NUMERO_AMPLIO_BINARIO:
+            superficie, = struct.unpack_from("<Q", datos, inicio)
+            inicio += 8
+        if largo_nombre == NOMBRE_LARGO_BINARIO:
+            largo_nombre, = struct.unpack_from("<I", datos, inicio)
+            inicio += 4
+        continente = None
+        if codigo == cantidad_continentes:
+            largo_continente, = struct.unpack_from("<H", datos, inicio)
+            inicio += 2 + largo_continente
+            continente = datos[inicio - largo_continente:inicio]
+    except struct.error:
+        return None
+    fin = inicio + largo_nombre
+    if fin > len(datos):
+        return None
+    return (datos[inicio:fin].decode("utf-8"), poblacion, superficie, codigo,
+            None if continente is None else continente.decode("utf-8"), fin)
+
+def empaquetar_registro_binario(bufer, pais, codigos):
+    """
+    Agrega al búfer el registro binario del país. codigos asocia cada
+    continente ya escrito con su código y se completa con los nuevos.
+    """
+    nombre = pais["nombre"].encode("utf-8")
+    poblacion, superficie = pais["poblacion"], pais["superficie"]
+    codigo = codigos.get(pais["continente"])
+    nuevo = codigo is None
+    if nuevo:
+        codigo = codigos[pais["continente"]] = len(codigos)
+    bufer += struct.pack(FORMATO_REGISTRO_BINARIO, min(poblacion, NUMERO_AMPLIO_BINARIO),
+                         min(superficie, NUMERO_AMPLIO_BINARIO), codigo, min(len(nombre), NOMBRE_LARGO_BINARIO))
+    if poblacion >= NUMERO_AMPLIO_BINARIO:
+        bufer += struct.pack("<Q", poblacion)
+    if superficie >= NUMERO_AMPLIO_BINARIO:
+        bufer += struct.pack("<Q", superficie)
+    if len(nombre) >= NOMBRE_LARGO_BINARIO:
+        bufer += struct.pack("<I", len(nombre))
+    if nuevo:
+        continente = pais["continente"].encode("utf-8")
+        bufer += struct.pack("<H", len(continente))
+        bufer += continente
+    bufer += nombre
+
+def escribir_registros(ruta, paises, formato=None, comprimido=None, sincronizar=False):
+    """
+    Escribe los países en la ruta como CSV, JSON lines o registros binarios,
+    comprimidos con gzip si corresponde; por defecto formato y compresión
+    salen de la extensión. Consume paises de a uno, así que acepta un
+    generador sin cargarlo en memoria. Con sincronizar fuerza la escritura
+    en disco antes de cerrar. Retorna la cantidad de filas escritas.
+    """
+    if formato is None:
+        formato, comprimido = detectar_formato(ruta)
+    filas = 0
+    with open(ruta, mode='wb') as crudo:
+        destino = gzip.GzipFile(fileobj=crudo, mode='wb', compresslevel=NIVEL_COMPRESION) if comprimido else crudo
+        if formato == "bin":
+            bufer = bytearray(MARCA_BINARIO)
+            codigos = {}
+            for p in paises:
+                empaquetar_registro_binario(bufer, p, codigos)
+                filas += 1
+                if len(bufer) >= TAMANO_BLOQUE_BINARIO:
+                    destino.write(bufer)
+                    bufer.clear()
+            destino.write(bufer)
+        else:
+            texto = io.TextIOWrapper(destino, encoding='utf-8', newline='')
+            if formato == "jsonl":
+                for p in paises:
+                    texto.write(json.dumps({columna: p[columna] for columna in COLUMNAS_CSV}, ensure_ascii=False) + "\n")
+                    filas += 1
+            else:
+                escritor = csv.writer(texto)
+                escritor.writerow(COLUMNAS_CSV)
+                for p in paises:
+                    escritor.writerow([p[columna] for columna in COLUMNAS_CSV])
+                    filas += 1
+            texto.flush()
+            texto.detach()
+        if comprimido:
+            destino.close()
+        crudo.flush()
+        if sincronizar:
+            os.fsync(crudo.fileno())
+    return filas
+
+"""Snapshot binario"""
+
+def ruta_snapshot():
+    """Retorna la ruta del snapshot asociado al archivo CSV."""
+    return ARCHIVO_CSV + EXTENSION_SNAPSHOT
+
+def archivo_cambiado(estado):
+    """Indica si el CSV ya no es el archivo descrito por estado (resultado de os.stat)."""
+    try:
+        actual = os.stat(ARCHIVO_CSV)
+    except FileNotFoundError:
+        return True
+    return (not os.path.samestat(actual, estado) or actual.st_size != estado.st_size
+            or actual.st_mtime_ns != estado.st_mtime_ns)
+
+def guardar_snapshot(paises, estado):
+    """
+    Escribe el snapshot binario de los países: columnas de población y
+    superficie de 64 bits, una columna de códigos de continente de 16 bits y
+    los textos unidos por SEPARADOR_SNAPSHOT (nombres, nombres normalizados y
+    la tabla de continentes con sus formas normalizadas). Queda asociado al
+    tamaño y la fecha de modificación de estado, el os.stat del archivo del
+    que salieron los países. Si no se puede escribir, se omite.
+    """
+    try:
+        continentes = []
+        continentes_norm = []
+        codigo_de_continente = {}
+        codigos = array('H')
+        for p in paises:
+            codigo = codigo_de_continente.get(p["continente"])
+            if codigo is None:
+                codigo = codigo_de_continente[p["continente"]] = len(continentes)
+                continentes.append(p["continente"])
+                continentes_norm.append(clave_normalizada(p, "continente"))
+            codigos.append(codigo)
+        textos = ([p["nombre"] for p in paises] + [clave_normalizada(p, "nombre") for p in paises]
+                  + continentes + continentes_norm)
+        if any(SEPARADOR_SNAPSHOT in texto for texto in textos):
+            return
+        poblaciones = array('q', (p["poblacion"] for p in paises))
+        superficies = array('q', (p["superficie"] for p in paises))
+        
+        temporal = f"{ruta_snapshot()}.{os.getpid()}.tmp"
+        with open(temporal, mode='wb') as archivo:
+            archivo.write(struct.pack(FORMATO_CABECERA_SNAPSHOT, MARCA_SNAPSHOT, estado.st_size,
+                                      estado.st_mtime_ns, len(paises), len(continentes)))
+            archivo.write(poblaciones.tobytes())
+            archivo.write(superficies.tobytes())
+            archivo.write(codigos.tobytes())
+            archivo.write(SEPARADOR_SNAPSHOT.join(textos).encode('utf-8'))
+        os.replace(temporal, ruta_snapshot())
+    except (OSError, OverflowError):
+        pass
+
+def cargar_snapshot():
+    """
+    Carga los países desde el snapshot binario mapeándolo en memoria. Las
+    columnas numéricas se copian directo del mapa y la tabla columnar usa la
+    tabla de continentes guardada, sin volver a normalizar ningún texto.
+    Retorna None si no existe, está dañado o no corresponde al CSV actual.
+    """
+    if not os.path.exists(ruta_snapshot()) or not os.path.exists(ARCHIVO_CSV):
+        return None
+    
+    estado = os.stat(ARCHIVO_CSV)
+    tamano_cabecera = struct.calcsize(FORMATO_CABECERA_SNAPSHOT)
+    try:
+        with open(ruta_snapshot(), mode='rb') as archivo, \
+                mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa, \
+                memoryview(mapa) as vista:
+            marca, tamano, mtime, filas, cantidad_continentes = struct.unpack_from(FORMATO_CABECERA_SNAPSHOT, mapa)
+            if marca != MARCA_SNAPSHOT or tamano != estado.st_size or mtime != estado.st_mtime_ns:
+                return None
+            
+            inicio = tamano_cabecera
+            columnas = []
+            for tipo in ('q', 'q', 'H'):
+                columna = array(tipo)
+                columna.frombytes(vista[inicio:inicio + filas * columna.itemsize])
+                inicio += filas * columna.itemsize
+                columnas.append(columna)
+            poblaciones, superficies, codigos = columnas
+            textos = str(vista[inicio:], 'utf-8').split(SEPARADOR_SNAPSHOT)
+            if metricas["activo"]:
+                metricas["bytes_leidos"] += len(mapa)
+                metricas["filas_escaneadas"] += filas
+    except (OSError, ValueError, struct.error):
+        return None
+    
+    if filas == 0:
+        # Sin países el texto unido queda vacío y split retorna un texto
+        return TablaPaises() if USAR_TABLA_COLUMNAR else []
+    if (len(poblaciones) != filas or len(superficies) != filas or len(codigos) != filas
+            or len(textos) != 2 * filas + 2 * cantidad_continentes
+            or max(codigos) >= cantidad_continentes):
+        return None
+    nombres = textos[:filas]
+    nombres_norm = textos[filas:2 * filas]
+    continentes = [sys.intern(texto) for texto in textos[2 * filas:2 * filas + cantidad_continentes]]
+    continentes_norm = [sys.intern(texto) for texto in textos[2 * filas + cantidad_continentes:]]
+    
+    if USAR_TABLA_COLUMNAR:
+        paises = TablaPaises()
+        paises.nombres = nombres
+        paises.nombres_norm = nombres_norm
+        paises.poblaciones = poblaciones
+        paises.superficies = superficies
+        paises.codigos_continente = codigos
+        paises.continentes = continentes
+        paises.continentes_norm = continentes_norm
+        paises.codigo_de_continente = {continente: codigo for codigo, continente in enumerate(continentes)}
+        return paises
+    
+    return [
+        crear_pais(nombre, poblacion, superficie, continentes[codigo], nombre_norm, continentes_norm[codigo])
+        for nombre, nombre_norm, poblacion, superficie, codigo
+        in zip(nombres, nombres_norm, poblaciones, superficies, codigos)
+    ]
+
+"""Journal de cambios"""
+
+# Estado del journal abierto para agregar registros
+journal = {
+    "archivo": None,
+    "sin_sincronizar": 0,
+    "registros": 0,
+}
+
+def ruta_journal():
+    """Retorna la ruta del journal asociado al archivo CSV."""
+    return ARCHIVO_CSV + EXTENSION_JOURNAL
+
+def aplicar_journal(paises, registros=None):
+    """
+    Reaplica sobre la lista los registros del journal, en orden, o los
+    registros dados si ya se leyeron con leer_journal_desde.
+    Cada registro reemplaza al país del mismo nombre o se agrega al final.
+    Ignora registros incompletos (por ejemplo, una escritura interrumpida).
+    Retorna la cantidad de registros aplicados.
+    """
+    if registros is None:
+        registros, _ = leer_journal_desde(0)
+    journal["registros"] = len(registros)
+    if not registros:
+        return 0
+    
+    posiciones = {}
+    for i, p in enumerate(paises):
+        posiciones.setdefault(clave_normalizada(p, "nombre"), i)
+    
+    for pais in registros:
+        nombre_norm = pais["nombre_norm"]
+        if nombre_norm in posiciones:
+            paises[posiciones[nombre_norm]] = pais
+        else:
+            posiciones[nombre_norm] = len(paises)
+            paises.append(pais)
+    return len(registros)
+
+def leer_journal_desde(desplazamiento):
+    """
+    Retorna (países, bytes leídos) de los registros del journal que empiezan
+    en el byte desplazamiento. Deja sin leer una última línea incompleta, que
+    puede estar escribiéndola otro proceso, e ignora los registros inválidos.
+    """
+    try:
+        with open(ruta_journal(), mode='rb') as archivo:
+            archivo.seek(desplazamiento)
+            datos = archivo.read()
+    except FileNotFoundError:
+        return [], 0
+    datos = datos[:datos.rfind(b"\n") + 1]
+    if metricas["activo"]:
+        metricas["bytes_leidos"] += len(datos)
+    
+    registros = []
+    for fila in csv.reader(io.StringIO(datos.decode("utf-8"), newline='')):
+        pais, _ = convertir_fila(fila)
+        if pais is not None:
+            registros.append(pais)
+    if metricas["activo"]:
+        metricas["filas_escaneadas"] += len(registros)
+    return registros, len(datos)
+
+def agregar_al_journal(pais):
+    """
+    Agrega un registro al journal con el bloqueo de escritura tomado.
+    Sincroniza con el disco cada tanto. Si otro proceso escribió desde la
+    última vez, lo registra para que la próxima reescritura lo incorpore.
+    """
+    with bloqueo_escritura():
+        if modificado_por_otro_proceso():
+            estado_archivo["desactualizado"] = True
+        # Si otro proceso compactó, el journal abierto ya no es el de la ruta
+        if journal["archivo"] is not None and not journal_abierto_vigente():
+            journal["archivo"].close()
+            journal["archivo"] = None
+        if journal["archivo"] is None:
+            journal["archivo"] = open(ruta_journal(), mode='a', encoding='utf-8', newline='')
+        recortar_linea_incompleta()
+        
+        inicio = journal["archivo"].tell()
+        csv.writer(journal["archivo"]).writerow([pais[columna] for columna in COLUMNAS_CSV])
+        journal["archivo"].flush()
+        desactualizado = estado_archivo["desactualizado"]
+        registrar_estado_en_disco(estado_en_disco())
+        estado_archivo["desactualizado"] = desactualizado
+    
+    if metricas["activo"]:
+        metricas["bytes_escritos"] += journal["archivo"].tell() - inicio
+    journal["registros"] += 1
+    journal["sin_sincronizar"] += 1
+    if journal["sin_sincronizar"] >= JOURNAL_REGISTROS_POR_FSYNC:
+        sincronizar_journal()
+
+def recortar_linea_incompleta():
+    """
+    Recorta del journal una última línea sin terminar (por ejemplo, de un
+    proceso que se interrumpió a mitad de una escritura) para que el próximo
+    registro no quede pegado a ella. Debe llamarse con el bloqueo tomado.
+    """
+    try:
+        with open(ruta_journal(), mode='rb+') as archivo:
+            fin = archivo.seek(0, os.SEEK_END)
+            if fin == 0:
+                return
+            archivo.seek(fin - 1)
+            if archivo.read(1) == b"\n":
+                return
+            # Busca hacia atrás el último salto de línea, de a bloques
+            posicion = fin
+            while posicion > 0:
+                desde = max(0, posicion - 4096)
+                archivo.seek(desde)
+                corte = archivo.read(posicion - desde).rfind(b"\n")
+                if corte >= 0:
+                    archivo.truncate(desde + corte + 1)
+                    return
+                posicion = desde
+            archivo.truncate(0)
+    except FileNotFoundError:
+        pass
+
+def journal_abierto_vigente():
+    """Indica si el journal abierto sigue siendo el archivo de ruta_journal()."""
+    try:
+        return os.path.samestat(os.fstat(journal["archivo"].fileno()), os.stat(ruta_journal()))
+    except FileNotFoundError:
+        return False
+
+def sincronizar_journal():
+    """Fuerza la escritura en disco de los registros pendientes del journal."""
+    if journal["archivo"] is not None and journal["sin_sincronizar"]:
+        os.fsync(journal["archivo"].fileno())
+    journal["sin_sincronizar"] = 0
+
+def cerrar_journal():
+    """Sincroniza y cierra el journal abierto."""
+    sincronizar_journal()
+    if journal["archivo"] is not None:
+        journal["archivo"].close()
+        journal["archivo"] = None
+
+def descartar_journal():
+    """Cierra y elimina el journal, cuyos cambios ya están en el CSV."""
+    if journal["archivo"] is not None:
+        journal["archivo"].close()
+        journal["archivo"] = None
+    journal["sin_sincronizar"] = 0
+    journal["registros"] = 0
+    if os.path.exists(ruta_journal()):
+        os.remove(ruta_journal())
+
+def persistir_cambio(paises, pais):
+    """
+    Persiste el alta o modificación de un país.
+    Con journal agrega un registro y compacta al superar el límite;
+    sin journal reescribe el CSV completo. Con el motor SQLite confirma
+    la transacción con el cambio, que ya se escribió en la base.
+    """
+    if isinstance(paises, TablaSQLite):
+        paises.confirmar()
+        return
+    
+    if not USAR_JOURNAL:
+        marcar_pendiente(pais)
+        guardar_paises(paises)
+        return
+    
+    agregar_al_journal(pais)
+    if journal["registros"] >= JOURNAL_MAX_REGISTROS:
+        # Compactación: el CSV reescrito incorpora el journal
+        guardar_paises(paises)
+
+def buscar_pais_por_nombre(paises, nombre):
+    """
+    Busca un país por coincidencia exacta de nombre.
+    Retorna índice o None.
+    """
+    if isinstance(paises, TablaSQLite):
+        return paises.buscar_por_nombre(normalizar_termino(nombre))
+    return obtener_indice(paises, "por_nombre").get(normalizar_termino(nombre))
+
+"""Importación masiva"""
+
+def leer_registros_json(ruta, rechazados=None, estricto=False):
+    """
+    Generador de países desde un archivo JSON lines (un objeto por línea),
+    comprimido con gzip si la ruta termina en ".gz".
+    Las líneas inválidas se agregan a rechazados con su número de línea.
+    """
+    with abrir_archivo(ruta) as archivo:
+        for numero, linea in enumerate(archivo, start=1):
+            if not linea.strip():
+                continue
+            try:
+                registro = json.loads(linea)
+                valores = [str(registro[columna]) for columna in COLUMNAS_CSV]
+            except KeyError as error:
+                pais, motivo = None, f"falta el campo {error}"
+            except (ValueError, TypeError) as error:
+                pais, motivo = None, f"registro inválido: {error}"
+            else:
+                pais, motivo = convertir_fila(valores, estricto)
+            if pais is not None:
+                yield pais
+            elif rechazados is not None:
+                rechazados.append({"linea": numero, "contenido": linea.strip(), "motivo": motivo})
+
+def importar_paises(paises, ruta, rechazados=None):
+    """
+    Importa países nuevos o actualizados desde un archivo CSV, JSON lines
+    (.jsonl) o binario (.bin), comprimido o no con gzip (.gz).
+    Los registros se validan con las mismas reglas que un alta desde el menú.
+    Dentro del lote prevalece la última aparición de cada nombre;
+    los nombres existentes se actualizan y el resto se agrega. Guarda el CSV
+    una sola vez al final. Retorna un resumen con las cantidades.
+    """
+    descartados = []
+    registros = leer_registros(ruta, descartados, estricto=True)
+    
+    # Deduplicación del lote por nombre normalizado
+    lote = {}
+    for pais in registros:
+        lote[pais["nombre_norm"]] = pais
+    
+    if isinstance(paises, TablaSQLite):
+        antes = len(paises)
+        paises.agregar_varios(lote.values())
+        paises.confirmar()
+        agregados = len(paises) - antes
+        actualizados = len(lote) - agregados
+        if rechazados is not None:
+            rechazados.extend(descartados)
+        return {"agregados": agregados, "actualizados": actualizados, "rechazados": len(descartados)}
+    
+    por_nombre = obtener_indice(paises, "por_nombre")
+    agregados = actualizados = 0
+    for nombre_norm, pais in lote.items():
+        indice = por_nombre.get(nombre_norm)
+        if indice is None:
+            paises.append(pais)
+            agregados += 1
+        else:
+            # Se conserva el nombre tal como estaba registrado
+            pais = dict(pais, nombre=paises[indice]["nombre"], nombre_norm=nombre_norm)
+            paises[indice] = pais
+            actualizados += 1
+        marcar_pendiente(pais)
+    
+    if lote:
+        reconstruir_indices(paises)
+        guardar_paises(paises)
+    if rechazados is not None:
+        rechazados.extend(descartados)
+    
+    return {"agregados": agregados, "actualizados": actualizados, "rechazados": len(descartados)}
+
+"""Instrumentación"""
+
+# Métricas acumuladas; los contadores de filas y bytes solo se actualizan
+# mientras la instrumentación está activa
+metricas = {
+    "activo": False,
+    "operaciones": {},
+    "filas_escaneadas": 0,
+    "bytes_leidos": 0,
+    "bytes_escritos": 0,
+    "normalizar_llamadas": 0,
+    "normalizar_segundos": 0.0,
+    "cprofile": None,
+    "senal_anterior": None,
+}
+
+def contar_filas(resultado):
+    """Retorna la cantidad de filas de un resultado, o None si no es una colección."""
+    if isinstance(resultado, (list, range, TablaPaises)):
+        return len(resultado)
+    if isinstance(resultado, int):
+        return 1
+    return None
+
+def registrar_llamada(nombre, segundos, escaneadas, devueltas, leidos, escritos):
+    """Acumula los datos de una llamada en las métricas de la operación."""
+    operacion = metricas["operaciones"].setdefault(nombre, {
+        "llamadas": 0, "segundos": 0.0, "maximo": 0.0, "histograma": {},
+        "filas_escaneadas": 0, "filas_devueltas": 0, "bytes_leidos": 0, "bytes_escritos": 0,
+    })
+    operacion["llamadas"] += 1
+    operacion["segundos"] += segundos
+    operacion["maximo"] = max(operacion["maximo"], segundos)
+    # Histograma de latencias en potencias de 2 de microsegundos
+    cubeta = 2 ** int(segundos * 1e6).bit_length()
+    operacion["histograma"][cubeta] = operacion["histograma"].get(cubeta, 0) + 1
+    operacion["filas_escaneadas"] += escaneadas
+    operacion["filas_devueltas"] += devueltas or 0
+    operacion["bytes_leidos"] += leidos
+    operacion["bytes_escritos"] += escritos
+
+def instrumentar(funcion, nombre):
+    """Retorna la función envuelta para medir cada llamada."""
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        antes = (metricas["filas_escaneadas"], metricas["bytes_leidos"], metricas["bytes_escritos"])
+        if metricas["cprofile"] == nombre:
+            metricas["cprofile"] = None
+            perfil = cProfile.Profile()
+            inicio = time.perf_counter()
+            resultado = perfil.runcall(funcion, *args, **kwargs)
+            segundos = time.perf_counter() - inicio
+            guardar_cprofile(perfil, nombre)
+        else:
+            inicio = time.perf_counter()
+            resultado = funcion(*args, **kwargs)
+            segundos = time.perf_counter() - inicio
+        registrar_llamada(nombre, segundos,
+                          metricas["filas_escaneadas"] - antes[0], contar_filas(resultado),
+                          metricas["bytes_leidos"] - antes[1], metricas["bytes_escritos"] - antes[2])
+        return resultado
+    envoltura.original = funcion
+    return envoltura
+
+def instrumentar_normalizacion(funcion):
+    """Retorna normalizar_texto envuelta para acumular su tiempo total."""
+    @functools.wraps(funcion)
+    def envoltura(texto):
+        inicio = time.perf_counter()
+        resultado = funcion(texto)
+        metricas["normalizar_segundos"] += time.perf_counter() - inicio
+        metricas["normalizar_llamadas"] += 1
+        return resultado
+    envoltura.original = funcion
+    return envoltura
+
+def guardar_cprofile(perfil, nombre):
+    """Guarda el perfil de cProfile en un archivo y muestra las funciones más costosas."""
+    archivo = f"perfil_{nombre}.prof"
+    perfil.dump_stats(archivo)
+    print(f"\n--- PERFIL DE {nombre} (guardado en '{archivo}') ---", file=sys.stderr)
+    pstats.Stats(perfil, stream=sys.stderr).sort_stats("cumulative").print_stats(15)
+
+def activar_instrumentacion(operacion_cprofile=None):
+    """
+    Activa la instrumentación reemplazando las funciones de FUNCIONES_INSTRUMENTADAS
+    por versiones medidas. Desactivada no agrega ningún costo a esas funciones.
+    El resumen se muestra al salir y, en sistemas POSIX, al recibir SIGUSR1.
+    """
+    if metricas["activo"]:
+        return
+    metricas["activo"] = True
+    metricas["cprofile"] = operacion_cprofile
+    
+    modulo = globals()
+    for nombre in FUNCIONES_INSTRUMENTADAS:
+        modulo[nombre] = instrumentar(modulo[nombre], nombre)
+    modulo["normalizar_texto"] = instrumentar_normalizacion(modulo["normalizar_texto"])
+    
+    atexit.register(mostrar_resumen_metricas)
+    if hasattr(signal, "SIGUSR1"):
+        metricas["senal_anterior"] = signal.signal(signal.SIGUSR1, lambda *_: mostrar_resumen_metricas())
+
+def desactivar_instrumentacion():
+    """
+    Deshace activar_instrumentacion: restaura las funciones originales, el
+    manejador anterior de SIGUSR1 y el resumen al salir. Las métricas ya
+    recolectadas se conservan.
+    """
+    if not metricas["activo"]:
+        return
+    modulo = globals()
+    for nombre in FUNCIONES_INSTRUMENTADAS + ["normalizar_texto"]:
+        modulo[nombre] = modulo[nombre].original
+    metricas["activo"] = False
+    metricas["cprofile"] = None
+    atexit.unregister(mostrar_resumen_metricas)
+    if hasattr(signal, "SIGUSR1"):
+        # None si el manejador anterior no se instaló desde Python
+        signal.signal(signal.SIGUSR1, metricas["senal_anterior"] or signal.SIG_DFL)
+        metricas["senal_anterior"] = None
+
+def mostrar_resumen_metricas(salida=None):
+    """Escribe el resumen de las métricas recolectadas (por defecto en stderr)."""
+    salida = salida or sys.stderr
+    lineas = ["", "--- MÉTRICAS DE OPERACIONES ---",
+              f"{'Operación':<24} {'Llamadas':>8} {'Prom. ms':>10} {'Máx. ms':>10} "
+              f"{'Escaneadas':>12} {'Devueltas':>11} {'Leídos':>12} {'Escritos':>12}"]
+    for nombre, operacion in sorted(metricas["operaciones"].items()):
+        promedio = operacion["segundos"] / operacion["llamadas"] * 1000
+        lineas.append(f"{nombre:<24} {operacion['llamadas']:>8} {promedio:>10.3f} {operacion['maximo'] * 1000:>10.3f} "
+                      f"{operacion['filas_escaneadas']:>12,} {operacion['filas_devueltas']:>11,} "
+                      f"{operacion['bytes_leidos']:>12,} {operacion['bytes_escritos']:>12,}")
+        cubetas = ", ".join(f"<{cubeta}µs: {cantidad}" for cubeta, cantidad in sorted(operacion["histograma"].items()))
+        lineas.append(f"{'':<24} latencias: {cubetas}")
+    lineas.append(f"normalizar_texto: {metricas['normalizar_llamadas']:,} llamadas, "
+                  f"{metricas['normalizar_segundos'] * 1000:.3f} ms en total")
+    cache = estadisticas_cache_consultas()
+    lineas.append(f"caché de consultas: {cache['aciertos']:,} aciertos, {cache['fallos']:,} fallos "
+                  f"({cache['tasa_aciertos']:.1%}), {cache['entradas']}/{cache['capacidad']} entradas, "
+                  f"{cache['posiciones']:,}/{cache['capacidad_posiciones']:,} posiciones")
+    salida.write("\n".join(lineas) + "\n")
+    salida.flush()
+
+"""Tabla columnar"""
+
+# Claves de una fila, con la misma interfaz que dict.keys()
+CLAVES_FILA = dict.fromkeys(COLUMNAS_CSV + ["nombre_norm", "continente_norm"]).keys()
+
+class FilaPais:
+    """
+    Vista de una fila de TablaPaises con acceso por clave como un diccionario.
+    No copia datos: lee y escribe directamente en las columnas de la tabla.
+    """
+    __slots__ = ("tabla", "posicion")
+    
+    def __init__(self, tabla, posicion):
+        self.tabla = tabla
+        self.posicion = posicion
+    
+    def __getitem__(self, clave):
+        return self.tabla.obtener_valor(self.posicion, clave)
+    
+    def __setitem__(self, clave, valor):
+        self.tabla.asignar_valor(self.posicion, clave, valor)
+    
+    def keys(self):
+        return CLAVES_FILA
+    
+    def get(self, clave, defecto=None):
+        return self[clave] if clave in CLAVES_FILA else defecto
+    
+    def update(self, valores):
+        for clave, valor in valores.items():
+            self[clave] = valor
+    
+    def __repr__(self):
+        return repr(dict(self))
+
+class TablaPaises:
+    """
+    Tabla de países almacenada por columnas: arrays de enteros de 64 bits para
+    población y superficie, y continentes guardados como códigos de una tabla
+    de textos internados. Los nombres normalizados se guardan en otra columna
+    y los continentes normalizados, uno por código. Se comporta como una lista
+    de diccionarios.
+    """
+    
+    def __init__(self):
+        self.nombres = []
+        self.nombres_norm = []
+        self.poblaciones = array('q')
+        self.superficies = array('q')
+        self.codigos_continente = array('H')
+        self.continentes = []
+        self.continentes_norm = []
+        self.codigo_de_continente = {}
+    
+    def codificar_continente(self, continente):
+        """Retorna el código del continente, registrándolo si es nuevo."""
+        codigo = self.codigo_de_continente.get(continente)
+        if codigo is None:
+            codigo = len(self.continentes)
+            self.continentes.append(sys.intern(continente))
+            self.continentes_norm.append(sys.intern(normalizar_termino(continente)))
+            self.codigo_de_continente[continente] = codigo
+        return codigo
+    
+    def obtener_valor(self, posicion, clave):
+        if clave == "nombre":
+            return self.nombres[posicion]
+        if clave == "nombre_norm":
+            return self.nombres_norm[posicion]
+        if clave == "poblacion":
+            return self.poblaciones[posicion]
+        if clave == "superficie":
+            return self.superficies[posicion]
+        if clave == "continente":
+            return self.continentes[self.codigos_continente[posicion]]
+        if clave == "continente_norm":
+            return self.continentes_norm[self.codigos_continente[posicion]]
+        raise KeyError(clave)
+    
+    def asignar_valor(self, posicion, clave, valor):
+        if clave == "nombre":
+            self.nombres[posicion] = valor
+            self.nombres_norm[posicion] = normalizar_texto(valor)
+        elif clave == "poblacion":
+            self.poblaciones[posicion] = valor
+        elif clave == "superficie":
+            self.superficies[posicion] = valor
+        elif clave == "continente":
+            self.codigos_continente[posicion] = self.codificar_continente(valor)
+        else:
+            raise KeyError(clave)
+    
+    def append(self, pais):
+        self.nombres.append(pais["nombre"])
+        self.nombres_norm.append(clave_normalizada(pais, "nombre"))
+        self.poblaciones.append(pais["poblacion"])
+        self.superficies.append(pais["superficie"])
+        self.codigos_continente.append(self.codificar_continente(pais["continente"]))
+    
+    def clear(self):
+        self.__init__()
+    
+    def __len__(self):
+        return len(self.nombres)
+    
+    def __getitem__(self, posicion):
+        if posicion < 0:
+            posicion += len(self)
+        if not 0 <= posicion < len(self):
+            raise IndexError("posición fuera de la tabla")
+        return FilaPais(self, posicion)
+    
+    def __setitem__(self, posicion, pais):
+        self.nombres[posicion] = pais["nombre"]
+        self.nombres_norm[posicion] = clave_normalizada(pais, "nombre")
+        self.poblaciones[posicion] = pais["poblacion"]
+        self.superficies[posicion] = pais["superficie"]
+        self.codigos_continente[posicion] = self.codificar_continente(pais["continente"])
+    
+    def __iter__(self):
+        for posicion in range(len(self)):
+            yield FilaPais(self, posicion)
+
+def medir_memoria_por_fila(paises):
+    """
+    Mide los bytes por fila que ocupa el dataset como lista de diccionarios
+    y como TablaPaises. Retorna un diccionario con ambas medidas.
+    """
+    if not paises:
+        return {"diccionarios": 0, "columnar": 0}
+    
+    filas = [{columna: p[columna] for columna in COLUMNAS_CSV} for p in paises]
+    medidas = {}
+    for nombre, construir in (("diccionarios", list), ("columnar", TablaPaises)):
+        tracemalloc.start()
+        copia = construir()
+        for fila in filas:
+            # Copias de los textos para no contar objetos compartidos con filas
+            copia.append(crear_pais("".join(fila["nombre"]), fila["poblacion"] + 0,
+                                    fila["superficie"] + 0, "".join(fila["continente"])))
+        usado, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        medidas[nombre] = usado // len(filas)
+        del copia
+    
+    return medidas
+
+"""Almacenamiento SQLite"""
+
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS paises (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    nombre_norm TEXT NOT NULL UNIQUE,
+    poblacion INTEGER NOT NULL,
+    superficie INTEGER NOT NULL,
+    continente TEXT NOT NULL,
+    continente_norm TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS paises_continente ON paises (continente_norm, poblacion);
+CREATE INDEX IF NOT EXISTS paises_poblacion ON paises (poblacion);
+CREATE INDEX IF NOT EXISTS paises_superficie ON paises (superficie);
+"""
+
+# Alta o actualización por nombre normalizado; un país nuevo recibe la
+# posición siguiente y uno existente conserva su posición y su nombre
+SQL_UPSERT_POR_NOMBRE = """
+INSERT INTO paises (id, nombre, nombre_norm, poblacion, superficie, continente, continente_norm)
+VALUES ((SELECT COALESCE(MAX(id) + 1, 0) FROM paises), ?, ?, ?, ?, ?, ?)
+ON CONFLICT (nombre_norm) DO UPDATE SET
+    poblacion = excluded.poblacion,
+    superficie = excluded.superficie,
+    continente = excluded.continente,
+    continente_norm = excluded.continente_norm
+"""
+
+SQL_ACTUALIZAR_POR_POSICION = """
+UPDATE paises SET nombre = ?, nombre_norm = ?, poblacion = ?, superficie = ?, continente = ?, continente_norm = ?
+WHERE id = ?
+"""
+
+COLUMNAS_SQLITE = "nombre, poblacion, superficie, continente, nombre_norm, continente_norm"
+
+# Columna SQL de cada criterio de orden o ranking
+EXPRESIONES_SQLITE = {
+    "nombre": "nombre_norm",
+    "poblacion": "poblacion",
+    "superficie": "superficie",
+    "continente": "continente_norm",
+    "densidad": "CASE WHEN superficie = 0 THEN 0.0 ELSE CAST(poblacion AS REAL) / superficie END",
+}
+
+def valores_sqlite(pais):
+    """Retorna los valores de un país en el orden de las columnas de SQL_UPSERT_POR_NOMBRE."""
+    return (pais["nombre"], clave_normalizada(pais, "nombre"), pais["poblacion"], pais["superficie"],
+            pais["continente"], clave_normalizada(pais, "continente"))
+
+class FilaSQLite(dict):
+    """
+    Registro leído de una TablaSQLite. Es un diccionario común cuyas
+    modificaciones se escriben además en la base con un UPDATE de una fila.
+    """
+    
+    def __init__(self, tabla, posicion, valores):
+        super().__init__(valores)
+        self.tabla = tabla
+        self.posicion = posicion
+    
+    def __setitem__(self, clave, valor):
+        self.update({clave: valor})
+    
+    def update(self, valores):
+        super().update(valores)
+        if "nombre" in valores or "continente" in valores:
+            super().update(nombre_norm=normalizar_texto(self["nombre"]),
+                           continente_norm=normalizar_termino(self["continente"]))
+        self.tabla[self.posicion] = self
+
+class TablaSQLite:
+    """
+    Países guardados en una base SQLite en modo WAL en lugar de en memoria.
+    Se comporta como una lista de diccionarios cuya posición es el id de cada
+    fila; las búsquedas, filtros, ordenamientos y estadísticas se resuelven
+    con consultas sobre los índices de la base. Los cambios quedan en una
+    transacción hasta persistir_cambio o guardar_paises.
+    """
+    
+    def __init__(self, ruta):
+        self.ruta = ruta
+        # Árbol BK de nombres: se mantiene con las escrituras propias y se
+        # descarta cuando otra conexión confirma cambios (PRAGMA data_version)
+        self.arbol_nombres = None
+        self.version_arbol = None
+        # check_same_thread=False: el servidor confirma los cambios desde otro hilo
+        self.conexion = sqlite3.connect(ruta, timeout=ESPERA_SQLITE, check_same_thread=False)
+        self.conexion.execute("PRAGMA journal_mode = WAL")
+        self.conexion.execute("PRAGMA synchronous = NORMAL")
+        self.conexion.executescript(ESQUEMA_SQLITE)
+    
+    def posiciones(self, sql, parametros=()):
+        """Ejecuta una consulta cuya primera columna es el id y retorna la lista de posiciones."""
+        return [fila[0] for fila in self.conexion.execute(sql, parametros)]
+    
+    def version(self):
+        """Retorna un valor que cambia con cada modificación propia o de otra conexión."""
+        return self.conexion.execute("PRAGMA data_version").fetchone()[0], self.conexion.total_changes
+    
+    def append(self, pais):
+        nombre_norm = clave_normalizada(pais, "nombre")
+        nuevo = self.arbol_nombres is not None and self.buscar_por_nombre(nombre_norm) is None
+        self.conexion.execute(SQL_UPSERT_POR_NOMBRE, valores_sqlite(pais))
+        if nuevo:
+            insertar_en_arbol(self.arbol_nombres, plegar_acentos(nombre_norm), [self.buscar_por_nombre(nombre_norm)])
+    
+    def agregar_varios(self, paises):
+        """Agrega o actualiza por nombre todos los países con una única sentencia preparada."""
+        self.conexion.executemany(SQL_UPSERT_POR_NOMBRE, map(valores_sqlite, paises))
+        self.arbol_nombres = None
+    
+    def clear(self):
+        self.conexion.execute("DELETE FROM paises")
+        self.arbol_nombres = None
+    
+    def confirmar(self):
+        """Confirma en disco los cambios pendientes."""
+        self.conexion.commit()
+    
+    def cerrar(self):
+        self.conexion.commit()
+        self.conexion.close()
+    
+    def __len__(self):
+        return self.conexion.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM paises").fetchone()[0]
+    
+    def __getitem__(self, posicion):
+        if posicion < 0:
+            posicion += len(self)
+        fila = self.conexion.execute(f"SELECT {COLUMNAS_SQLITE} FROM paises WHERE id = ?", (posicion,)).fetchone()
+        if fila is None:
+            raise IndexError("posición fuera de la tabla")
+        return FilaSQLite(self, posicion, zip(CLAVES_FILA, fila))
+    
+    def __setitem__(self, posicion, pais):
+        anterior = None
+        if self.arbol_nombres is not None:
+            anterior = self.conexion.execute("SELECT nombre_norm FROM paises WHERE id = ?", (posicion,)).fetchone()
+        self.conexion.execute(SQL_ACTUALIZAR_POR_POSICION, valores_sqlite(pais) + (posicion,))
+        nombre_norm = clave_normalizada(pais, "nombre")
+        if anterior is not None and anterior[0] != nombre_norm:
+            quitar_del_arbol(self.arbol_nombres, plegar_acentos(anterior[0]), posicion)
+            insertar_en_arbol(self.arbol_nombres, plegar_acentos(nombre_norm), [posicion])
+    
+    def __iter__(self):
+        for fila in self.conexion.execute(f"SELECT id, {COLUMNAS_SQLITE} FROM paises ORDER BY id"):
+            yield FilaSQLite(self, fila[0], zip(CLAVES_FILA, fila[1:]))
+    
+    def buscar_por_nombre(self, nombre_norm):
+        fila = self.conexion.execute("SELECT id FROM paises WHERE nombre_norm = ?", (nombre_norm,)).fetchone()
+        return None if fila is None else fila[0]
+    
+    def buscar_por_subcadena(self, termino_norm):
+        return self.posiciones("SELECT id FROM paises WHERE instr(nombre_norm, ?) > 0 ORDER BY id",
+                               (termino_norm,))
+    
+    def filtrar(self, rangos, continente_norm=None):
+        """Posiciones que cumplen los rangos {columna: (minimo, maximo)} y el continente."""
+        condiciones, parametros = [], []
+        for columna, (minimo, maximo) in rangos.items():
+            condiciones.append(f"{columna} BETWEEN ? AND ?")
+            parametros += [minimo, maximo]
+        if continente_norm is not None:
+            condiciones.append("continente_norm = ?")
+            parametros.append(continente_norm)
+        donde = " WHERE " + " AND ".join(condiciones) if condiciones else ""
+        return self.posiciones(f"SELECT id FROM paises{donde} ORDER BY id", parametros)
+    
+    def ordenar(self, criterios, limite=None, continente_norm=None):
+        """
+        Posiciones ordenadas según los criterios ('-' delante para descendente);
+        ante empates queda primero la posición menor, como en el orden estable.
+        """
+        orden = [EXPRESIONES_SQLITE[c.lstrip("-")] + (" DESC" if c.startswith("-") else "") for c in criterios]
+        donde = " WHERE continente_norm = ?" if continente_norm is not None else ""
+        parametros = [] if continente_norm is None else [continente_norm]
+        limitar = ""
+        if limite is not None:
+            limitar = " LIMIT ?"
+            parametros.append(limite)
+        return self.posiciones(f"SELECT id FROM paises{donde} ORDER BY {', '.join(orden + ['id'])}{limitar}",
+                               parametros)
+    
+    def estadisticas(self):
+        total, suma_poblacion, suma_superficie = self.conexion.execute(
+            "SELECT COUNT(*), SUM(poblacion), SUM(superficie) FROM paises").fetchone()
+        if not total:
+            return None
+        return {
+            "mayor_poblacion": self.ordenar(["-poblacion"], 1)[0],
+            "menor_poblacion": self.ordenar(["poblacion"], 1)[0],
+            "promedio_poblacion": suma_poblacion // total,
+            "promedio_superficie": suma_superficie // total,
+            "por_continente": sorted(self.conexion.execute(
+                "SELECT continente, COUNT(*) FROM paises GROUP BY continente").fetchall()),
+            "total": total,
+        }
+
+def migrar_csv_a_sqlite(rechazados=None):
+    """
+    Copia a la base SQLite los países del CSV y de su journal, reemplazando
+    los que tuviera, en una sola transacción y sin cargar el CSV completo en
+    memoria. Los nombres repetidos quedan en una sola fila con los datos de
+    la última aparición. Retorna la cantidad de países de la base.
+    """
+    tabla = TablaSQLite(ARCHIVO_SQLITE)
+    try:
+        tabla.clear()
+        if os.path.exists(ARCHIVO_CSV):
+            tabla.agregar_varios(leer_registros(ARCHIVO_CSV, rechazados))
+        # Igual que al cargar el CSV: se ignora una última línea incompleta
+        tabla.agregar_varios(leer_journal_desde(0)[0])
+        tabla.confirmar()
+        return len(tabla)
+    finally:
+        tabla.cerrar()
+
+def exportar_sqlite_a_csv():
+    """
+    Escribe en el CSV (o en el formato que indique su extensión) todos los
+    países de la base SQLite, en orden de posición, reemplazándolo en forma
+    atómica y descartando su journal. Retorna la cantidad de filas escritas.
+    """
+    tabla = TablaSQLite(ARCHIVO_SQLITE)
+    directorio = os.path.dirname(os.path.abspath(ARCHIVO_CSV))
+    descriptor, temporal = tempfile.mkstemp(prefix=".paises-", suffix=".tmp", dir=directorio)
+    os.close(descriptor)
+    try:
+        cursor = tabla.conexion.execute("SELECT nombre, poblacion, superficie, continente FROM paises ORDER BY id")
+        formato, comprimido = detectar_formato(ARCHIVO_CSV)
+        filas = escribir_registros(temporal, (dict(zip(COLUMNAS_CSV, fila)) for fila in cursor),
+                                   formato, comprimido, sincronizar=True)
+        copiar_permisos(temporal)
+        with bloqueo_escritura():
+            os.replace(temporal, ARCHIVO_CSV)
+            descartar_journal()
+        return filas
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    finally:
+        tabla.cerrar()
+
+"""Índices en memoria"""
+
+# Estado de los índices asociados a la lista de países cargada.
+# Cada índice se construye en su primer uso (None o ausente hasta entonces)
+# y desde ahí se actualiza en cada alta o modificación;
+# "generacion" cambia con cada modificación e invalida las vistas cacheadas.
+indices = {
+    "paises": None,
+    "cantidad": 0,
+    "generacion": 0,
+    "columnas": {},
+    "vistas": {},
+    "por_nombre": None,
+    "trigramas": None,
+    "busquedas_recorridas": 0,
+    "rangos": {},
+    "por_continente": None,
+    "agregados": None,
+    "arbol_nombres": None,
+}
+
+# Columnas numéricas con índice de rango ordenado
+COLUMNAS_RANGO = ["poblacion", "superficie"]
+
+# Columnas de clave precalculadas para ordenar
+COLUMNAS_ORDEN = ["nombre", "poblacion", "superficie", "continente"]
+
+# Búsquedas por subcadena que se resuelven recorriendo los nombres antes de
+# armar el índice de trigramas, para que una consulta suelta no pague su construcción
+BUSQUEDAS_SIN_TRIGRAMAS = 1
+
+# Sugerencias de nombres parecidos: distancia de edición máxima y cantidad
+DISTANCIA_SUGERENCIAS = 2
+CANTIDAD_SUGERENCIAS = 5
+
+# Criterios de ranking: columnas numéricas y claves derivadas
+COLUMNAS_RANKING = ["poblacion", "superficie", "densidad"]
+
+# Límites de los intervalos del histograma de población de la analítica
+LIMITES_HISTOGRAMA_POBLACION = [1_000_000, 10_000_000, 50_000_000, 100_000_000, 500_000_000]
+
+# Caché LRU de resultados de consultas. Se vacía cuando cambia la lista
+# de países o su generación (altas, modificaciones y recargas).
+cache_consultas = {
+    "paises": None,
+    "generacion": None,
+    "resultados": {},
+    "posiciones": 0,
+    "aciertos": 0,
+    "fallos": 0,
+}
+
+def generacion_de_datos(paises):
+    """Retorna un valor que cambia con cada modificación de los países."""
+    if isinstance(paises, TablaSQLite):
+        return paises.version()
+    return obtener_indices(paises)["generacion"]
+
+def cachear_consulta(armar_clave):
+    """
+    Decorador que guarda el resultado de una consulta en cache_consultas.
+    armar_clave recibe los mismos argumentos que la consulta (salvo la lista
+    de países) y retorna la clave normalizada de esos parámetros.
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(paises, *args, **kwargs):
+            if TAMANO_CACHE_CONSULTAS <= 0:
+                return funcion(paises, *args, **kwargs)
+            generacion = generacion_de_datos(paises)
+            if cache_consultas["paises"] is not paises or cache_consultas["generacion"] != generacion:
+                cache_consultas["paises"] = paises
+                cache_consultas["generacion"] = generacion
+                cache_consultas["resultados"] = {}
+                cache_consultas["posiciones"] = 0
+            resultados = cache_consultas["resultados"]
+            
+            # El diccionario conserva el orden de inserción: el primero es el menos usado
+            clave = (funcion.__name__,) + armar_clave(*args, **kwargs)
+            resultado = resultados.pop(clave, None)
+            if resultado is None:
+                cache_consultas["fallos"] += 1
+                resultado = funcion(paises, *args, **kwargs)
+                if len(resultado) > MAX_POSICIONES_CACHE:
+                    return resultado
+                while resultados and (len(resultados) >= TAMANO_CACHE_CONSULTAS or
+                                      cache_consultas["posiciones"] + len(resultado) > MAX_POSICIONES_CACHE):
+                    cache_consultas["posiciones"] -= len(resultados.pop(next(iter(resultados))))
+                cache_consultas["posiciones"] += len(resultado)
+            else:
+                cache_consultas["aciertos"] += 1
+            resultados[clave] = resultado
+            return resultado
+        return envoltura
+    return decorador
+
+def vaciar_cache_consultas():
+    """Descarta los resultados guardados y pone en cero los contadores."""
+    cache_consultas.update(paises=None, generacion=None, resultados={}, posiciones=0, aciertos=0, fallos=0)
+
+def estadisticas_cache_consultas():
+    """Retorna los aciertos, fallos, tasa de aciertos, entradas y posiciones de la caché de consultas."""
+    consultas = cache_consultas["aciertos"] + cache_consultas["fallos"]
+    return {
+        "aciertos": cache_consultas["aciertos"],
+        "fallos": cache_consultas["fallos"],
+        "tasa_aciertos": cache_consultas["aciertos"] / consultas if consultas else 0.0,
+        "entradas": len(cache_consultas["resultados"]),
+        "capacidad": TAMANO_CACHE_CONSULTAS,
+        "posiciones": cache_consultas["posiciones"],
+        "capacidad_posiciones": MAX_POSICIONES_CACHE,
+    }
 
-def limpiar_consola():
-    """Limpia la pantalla de la consola según el sistema operativo."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+def rango_normalizado(rango):
+    """Retorna el rango (minimo, maximo) como tupla, o None si no se indicó."""
+    return None if rango is None else (rango[0], rango[1])
 
-def normalizar_texto(texto):
-    """Normaliza texto eliminando espacios extras y convirtiendo a minúsculas."""
-    return " ".join(texto.split()).lower()
+def continente_normalizado(continente):
+    """Retorna el continente normalizado, o None si no se indicó."""
+    return None if continente is None else normalizar_termino(continente)
+
+def clave_de_columna(pais, columna):
+    """Retorna el valor de ordenamiento de un país para la columna indicada."""
+    if columna in ("nombre", "continente"):
+        return clave_normalizada(pais, columna)
+    return pais[columna]
 
-def cargar_paises():
+def obtener_trigramas(texto):
+    """Retorna el conjunto de subcadenas de 3 caracteres del texto."""
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+def reconstruir_indices(paises):
     """
-    Carga la lista de países desde el archivo CSV.
-    Retorna lista vacía si el archivo no existe.
+    Descarta los índices y los asocia a la lista de países.
+    Cada índice se vuelve a construir en su primer uso.
     """
-    paises = []
+    indices["paises"] = paises
+    indices["cantidad"] = len(paises)
+    indices["generacion"] += 1
+    indices["columnas"] = {}
+    indices["vistas"] = {}
+    indices["por_nombre"] = None
+    indices["trigramas"] = None
+    indices["busquedas_recorridas"] = 0
+    indices["rangos"] = {}
+    indices["por_continente"] = None
+    indices["agregados"] = None
+    indices["arbol_nombres"] = None
+
+def obtener_indices(paises):
+    """
+    Retorna los índices de la lista de países.
+    Los descarta si pertenecen a otra lista o si su tamaño no coincide.
+    """
+    if indices["paises"] is not paises or indices["cantidad"] != len(paises):
+        reconstruir_indices(paises)
+    return indices
+
+def obtener_columna(paises, columna):
+    """Retorna la columna de claves precalculadas, construyéndola en el primer uso."""
+    columnas = obtener_indices(paises)["columnas"]
+    if columna not in columnas:
+        columnas[columna] = [clave_de_columna(p, columna) for p in paises]
+    return columnas[columna]
+
+def obtener_rango(paises, columna):
+    """
+    Retorna el índice de rango de una columna numérica, (valores ordenados,
+    posiciones en el mismo orden), construyéndolo en el primer uso.
+    """
+    rangos = obtener_indices(paises)["rangos"]
+    if columna not in rangos:
+        valores = obtener_columna(paises, columna)
+        posiciones = sorted(range(len(valores)), key=valores.__getitem__)
+        rangos[columna] = ([valores[i] for i in posiciones], posiciones)
+    return rangos[columna]
+
+def construir_por_nombre(paises):
+    """Nombre normalizado -> posición (ante duplicados queda la primera)."""
+    por_nombre = {}
+    for i, nombre_norm in enumerate(obtener_columna(paises, "nombre")):
+        por_nombre.setdefault(nombre_norm, i)
+    return por_nombre
+
+def construir_trigramas(paises):
+    """Trigrama -> conjunto de posiciones cuyo nombre lo contiene."""
+    trigramas = {}
+    for i, nombre_norm in enumerate(obtener_columna(paises, "nombre")):
+        for trigrama in obtener_trigramas(nombre_norm):
+            trigramas.setdefault(trigrama, set()).add(i)
+    return trigramas
+
+def construir_por_continente(paises):
+    """Continente normalizado -> posiciones en orden ascendente."""
+    por_continente = {}
+    for i, continente_norm in enumerate(obtener_columna(paises, "continente")):
+        por_continente.setdefault(continente_norm, []).append(i)
+    return por_continente
+
+def construir_agregados(paises):
+    """
+    Totales y conteos acumulados; los montículos guardan (valor, posición)
+    y descartan en forma diferida las entradas que quedaron desactualizadas.
+    """
+    poblaciones = obtener_columna(paises, "poblacion")
+    conteo_continentes = {}
+    for p in paises:
+        conteo_continentes[p["continente"]] = conteo_continentes.get(p["continente"], 0) + 1
+    mayor = [(-v, i) for i, v in enumerate(poblaciones)]
+    menor = [(v, i) for i, v in enumerate(poblaciones)]
+    heapq.heapify(mayor)
+    heapq.heapify(menor)
+    return {
+        "total_poblacion": sum(poblaciones),
+        "total_superficie": sum(obtener_columna(paises, "superficie")),
+        "por_continente": conteo_continentes,
+        "mayor_poblacion": mayor,
+        "menor_poblacion": menor,
+    }
+
+# Índice -> función que lo construye desde la lista de países
+CONSTRUCTORES_INDICES = {
+    "por_nombre": construir_por_nombre,
+    "trigramas": construir_trigramas,
+    "por_continente": construir_por_continente,
+    "agregados": construir_agregados,
+}
+
+def obtener_indice(paises, nombre):
+    """Retorna el índice indicado, construyéndolo en el primer uso."""
+    idx = obtener_indices(paises)
+    if idx[nombre] is None:
+        idx[nombre] = CONSTRUCTORES_INDICES[nombre](paises)
+    return idx[nombre]
+
+def registrar_pais(paises, indice, anterior=None):
+    """
+    Actualiza los índices luego de agregar (anterior=None) o modificar
+    el país en la posición indicada. anterior es una copia del registro previo.
+    Con el motor SQLite no hace nada: la base mantiene sus propios índices.
+    """
+    if isinstance(paises, TablaSQLite):
+        return
+    esperado = len(paises) - 1 if anterior is None else len(paises)
+    if indices["paises"] is not paises or indices["cantidad"] != esperado:
+        reconstruir_indices(paises)
+        return
     
-    if not os.path.exists(ARCHIVO_CSV):
-        return paises
+    # Solo se actualizan los índices ya construidos; el resto se arma en su primer uso
+    pais = paises[indice]
+    nombre_norm = clave_normalizada(pais, "nombre")
+    for columna, valores in indices["columnas"].items():
+        if anterior is None:
+            valores.append(clave_de_columna(pais, columna))
+        else:
+            valores[indice] = clave_de_columna(pais, columna)
+    
+    por_nombre = indices["por_nombre"]
+    if por_nombre is not None:
+        if anterior is not None:
+            nombre_anterior = clave_normalizada(anterior, "nombre")
+            if por_nombre.get(nombre_anterior) == indice:
+                del por_nombre[nombre_anterior]
+        por_nombre.setdefault(nombre_norm, indice)
+    
+    trigramas = indices["trigramas"]
+    if trigramas is not None:
+        if anterior is not None:
+            for trigrama in obtener_trigramas(clave_normalizada(anterior, "nombre")):
+                trigramas[trigrama].discard(indice)
+        for trigrama in obtener_trigramas(nombre_norm):
+            trigramas.setdefault(trigrama, set()).add(indice)
+    
+    arbol = indices["arbol_nombres"]
+    if arbol is not None:
+        if anterior is not None:
+            quitar_del_arbol(arbol, plegar_acentos(clave_normalizada(anterior, "nombre")), indice)
+        insertar_en_arbol(arbol, plegar_acentos(nombre_norm), [indice])
+    
+    for columna, (valores, posiciones) in indices["rangos"].items():
+        if anterior is not None:
+            k = bisect.bisect_left(valores, anterior[columna])
+            while posiciones[k] != indice:
+                k += 1
+            del valores[k]
+            del posiciones[k]
+        k = bisect.bisect_right(valores, pais[columna])
+        valores.insert(k, pais[columna])
+        posiciones.insert(k, indice)
+    
+    por_continente = indices["por_continente"]
+    if por_continente is not None:
+        if anterior is not None:
+            por_continente[clave_normalizada(anterior, "continente")].remove(indice)
+        bisect.insort(por_continente.setdefault(clave_normalizada(pais, "continente"), []), indice)
+    
+    agregados = indices["agregados"]
+    if agregados is not None:
+        conteo_continentes = agregados["por_continente"]
+        if anterior is not None:
+            agregados["total_poblacion"] -= anterior["poblacion"]
+            agregados["total_superficie"] -= anterior["superficie"]
+            conteo_continentes[anterior["continente"]] -= 1
+            if conteo_continentes[anterior["continente"]] == 0:
+                del conteo_continentes[anterior["continente"]]
+        agregados["total_poblacion"] += pais["poblacion"]
+        agregados["total_superficie"] += pais["superficie"]
+        conteo_continentes[pais["continente"]] = conteo_continentes.get(pais["continente"], 0) + 1
+        if anterior is None or anterior["poblacion"] != pais["poblacion"]:
+            heapq.heappush(agregados["mayor_poblacion"], (-pais["poblacion"], indice))
+            heapq.heappush(agregados["menor_poblacion"], (pais["poblacion"], indice))
+    
+    if analitica["paises"] is paises and analitica["generacion"] == indices["generacion"]:
+        actualizar_columnas_analiticas(indice, pais, anterior)
+        analitica["generacion"] += 1
+    
+    indices["cantidad"] = len(paises)
+    indices["generacion"] += 1
+    indices["vistas"] = {}
+
+def obtener_orden(paises, criterios):
+    """
+    Retorna la permutación de posiciones que ordena la lista según los criterios.
+    Cada criterio es un nombre de columna; con prefijo '-' el orden es descendente.
+    La permutación se cachea hasta la próxima modificación de los datos.
+    """
+    if isinstance(paises, TablaSQLite):
+        return paises.ordenar(criterios)
+    idx = obtener_indices(paises)
+    criterios = tuple(criterios)
+    orden = idx["vistas"].get(criterios)
+    if orden is not None:
+        return orden
+    
+    if metricas["activo"]:
+        metricas["filas_escaneadas"] += len(paises)
+    orden = list(range(len(paises)))
+    # Ordenamientos estables sucesivos, del criterio menos al más significativo
+    for criterio in reversed(criterios):
+        descendente = criterio.startswith("-")
+        valores = obtener_columna(paises, criterio.lstrip("-"))
+        orden.sort(key=valores.__getitem__, reverse=descendente)
+    
+    idx["vistas"][criterios] = orden
+    return orden
+
+@cachear_consulta(lambda termino: (normalizar_termino(termino),))
+def buscar_por_subcadena(paises, termino):
+    """
+    Retorna las posiciones de los países cuyo nombre contiene el término.
+    Usa el índice de trigramas para acotar candidatos; con términos
+    de menos de 3 caracteres, o en las primeras BUSQUEDAS_SIN_TRIGRAMAS
+    búsquedas, recorre todos los nombres.
+    """
+    termino_norm = normalizar_termino(termino)
+    if isinstance(paises, TablaSQLite):
+        return paises.buscar_por_subcadena(termino_norm)
+    nombres = obtener_columna(paises, "nombre")
+    
+    recorrer = len(termino_norm) < 3
+    if not recorrer and indices["trigramas"] is None and indices["busquedas_recorridas"] < BUSQUEDAS_SIN_TRIGRAMAS:
+        indices["busquedas_recorridas"] += 1
+        recorrer = True
+    if recorrer:
+        if metricas["activo"]:
+            metricas["filas_escaneadas"] += len(nombres)
+        return [i for i, nombre in enumerate(nombres) if termino_norm in nombre]
+    
+    # Intersección de las listas de posiciones, empezando por la más chica
+    trigramas = obtener_indice(paises, "trigramas")
+    conjuntos = [trigramas.get(t, set()) for t in obtener_trigramas(termino_norm)]
+    conjuntos.sort(key=len)
+    candidatos = set(conjuntos[0])
+    for conjunto in conjuntos[1:]:
+        if not candidatos:
+            break
+        candidatos &= conjunto
+    
+    if metricas["activo"]:
+        metricas["filas_escaneadas"] += len(candidatos)
+    return [i for i in sorted(candidatos) if termino_norm in nombres[i]]
+
+def plegar_acentos(texto):
+    """Retorna el texto sin tildes ni diéresis (por ejemplo "japón" -> "japon")."""
+    descompuesto = unicodedata.normalize("NFD", texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+def distancia_edicion(a, b):
+    """
+    Retorna la distancia de Levenshtein entre dos textos con el algoritmo
+    de vectores de bits de Myers: una pasada por carácter del texto más largo.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+    
+    coincidencias = {}
+    bit = 1
+    for caracter in b:
+        coincidencias[caracter] = coincidencias.get(caracter, 0) | bit
+        bit <<= 1
+    mascara = bit - 1
+    ultimo = bit >> 1
+    positivos, negativos, distancia = mascara, 0, len(b)
+    for caracter in a:
+        igual = coincidencias.get(caracter, 0)
+        xv = igual | negativos
+        xh = (((igual & positivos) + positivos) ^ positivos) | igual
+        suben = negativos | (~(xh | positivos) & mascara)
+        bajan = positivos & xh
+        if suben & ultimo:
+            distancia += 1
+        elif bajan & ultimo:
+            distancia -= 1
+        suben = ((suben << 1) | 1) & mascara
+        bajan = (bajan << 1) & mascara
+        positivos = bajan | (~(xv | suben) & mascara)
+        negativos = suben & xv
+    return distancia
+
+def insertar_en_arbol(raiz, clave, posiciones):
+    """
+    Agrega las posiciones bajo la clave en el árbol BK y retorna la raíz.
+    Cada nodo es [clave, posiciones, hijos por distancia a la clave].
+    """
+    if raiz is None:
+        return [clave, list(posiciones), {}]
+    nodo = raiz
+    while True:
+        distancia = distancia_edicion(clave, nodo[0])
+        if distancia == 0:
+            nodo[1].extend(posiciones)
+            return raiz
+        hijo = nodo[2].get(distancia)
+        if hijo is None:
+            nodo[2][distancia] = [clave, list(posiciones), {}]
+            return raiz
+        nodo = hijo
+
+def quitar_del_arbol(raiz, clave, posicion):
+    """Quita la posición de la clave en el árbol BK; el nodo queda como ruta."""
+    nodo = raiz
+    while nodo is not None:
+        distancia = distancia_edicion(clave, nodo[0])
+        if distancia == 0:
+            nodo[1].remove(posicion)
+            return
+        nodo = nodo[2].get(distancia)
+
+def construir_arbol(nombres_norm):
+    """
+    Construye el árbol BK de nombres normalizados con las tildes plegadas.
+    nombres_norm es una secuencia de pares (posición, nombre normalizado).
+    """
+    por_clave = {}
+    for i, nombre_norm in nombres_norm:
+        por_clave.setdefault(plegar_acentos(nombre_norm), []).append(i)
+    raiz = None
+    for clave, posiciones in por_clave.items():
+        raiz = insertar_en_arbol(raiz, clave, posiciones)
+    return raiz
+
+def obtener_arbol_nombres(paises):
+    """
+    Retorna el árbol BK de los nombres, construyéndolo en el primer uso.
+    En memoria se mantiene con registrar_pais y con el motor SQLite con cada
+    escritura propia; en SQLite se reconstruye si otra conexión confirmó cambios.
+    """
+    if isinstance(paises, TablaSQLite):
+        version = paises.conexion.execute("PRAGMA data_version").fetchone()[0]
+        if paises.arbol_nombres is None or paises.version_arbol != version:
+            paises.version_arbol = version
+            paises.arbol_nombres = construir_arbol(paises.conexion.execute("SELECT id, nombre_norm FROM paises"))
+        return paises.arbol_nombres
+    
+    idx = obtener_indices(paises)
+    if idx["arbol_nombres"] is None:
+        idx["arbol_nombres"] = construir_arbol(enumerate(obtener_columna(paises, "nombre")))
+    return idx["arbol_nombres"]
+
+@cachear_consulta(lambda nombre, distancia=DISTANCIA_SUGERENCIAS, plegar=True, cantidad=CANTIDAD_SUGERENCIAS:
+                  (normalizar_termino(nombre), distancia, plegar, cantidad))
+def buscar_parecidos(paises, nombre, distancia=DISTANCIA_SUGERENCIAS, plegar=True, cantidad=CANTIDAD_SUGERENCIAS):
+    """
+    Retorna las posiciones de hasta cantidad países cuyo nombre está a lo sumo
+    a la distancia de edición indicada, del más parecido al menos parecido.
+    Con plegar, "japon" y "japón" se consideran iguales. El árbol BK solo
+    visita los nodos cuya distancia a la raíz de cada subárbol es compatible.
+    """
+    termino_norm = normalizar_termino(nombre)
+    termino = plegar_acentos(termino_norm)
+    raiz = obtener_arbol_nombres(paises)
+    
+    encontrados = []
+    pendientes = [raiz] if raiz is not None else []
+    visitados = 0
+    while pendientes:
+        nodo = pendientes.pop()
+        visitados += 1
+        d = distancia_edicion(termino, nodo[0])
+        if d <= distancia:
+            encontrados.extend((d, i) for i in nodo[1])
+        pendientes.extend(hijo for arista, hijo in nodo[2].items() if d - distancia <= arista <= d + distancia)
+    if metricas["activo"]:
+        metricas["filas_escaneadas"] += visitados
+    
+    if not plegar:
+        # La distancia sin plegar nunca es menor, así que basta con filtrar
+        encontrados = [(distancia_edicion(termino_norm, clave_normalizada(paises[i], "nombre")), i)
+                       for _, i in encontrados]
+        encontrados = [(d, i) for d, i in encontrados if d <= distancia]
+    return [i for _, i in sorted(encontrados)[:cantidad]]
+
+def sugerir_sin_arbol(paises, nombre, distancia=DISTANCIA_SUGERENCIAS, cantidad=CANTIDAD_SUGERENCIAS):
+    """
+    Como buscar_parecidos (con tildes plegadas), pero recorriendo los nombres
+    una sola vez en lugar de armar el árbol BK, que solo se amortiza si se
+    harán varias búsquedas: es lo que usa el modo consulta. Los nombres cuyo
+    largo difiere en más de distancia se descartan sin calcular la distancia.
+    """
+    termino = plegar_acentos(normalizar_termino(nombre))
+    if isinstance(paises, TablaSQLite):
+        nombres = paises.conexion.execute("SELECT id, nombre_norm FROM paises WHERE length(nombre_norm) BETWEEN ? AND ?",
+                                          (len(termino) - distancia, len(termino) + distancia))
+    else:
+        nombres = enumerate(obtener_columna(paises, "nombre"))
+    
+    encontrados = []
+    recorridos = 0
+    for i, nombre_norm in nombres:
+        recorridos += 1
+        clave = nombre_norm if nombre_norm.isascii() else plegar_acentos(nombre_norm)
+        if abs(len(clave) - len(termino)) > distancia:
+            continue
+        d = distancia_edicion(termino, clave)
+        if d <= distancia:
+            encontrados.append((d, i))
+    if metricas["activo"]:
+        metricas["filas_escaneadas"] += recorridos
+    return [i for _, i in sorted(encontrados)[:cantidad]]
+
+@cachear_consulta(lambda columna, minimo, maximo: (columna, minimo, maximo))
+def filtrar_rango(paises, columna, minimo, maximo):
+    """
+    Retorna las posiciones de los países con minimo <= columna <= maximo,
+    en el orden de la lista, usando búsqueda binaria sobre el índice de rango.
+    """
+    if isinstance(paises, TablaSQLite):
+        return paises.filtrar({columna: (minimo, maximo)})
+    valores, posiciones = obtener_rango(paises, columna)
+    desde = bisect.bisect_left(valores, minimo)
+    hasta = bisect.bisect_right(valores, maximo)
+    if metricas["activo"]:
+        metricas["filas_escaneadas"] += hasta - desde
+    return sorted(posiciones[desde:hasta])
+
+@cachear_consulta(lambda poblacion=None, superficie=None, continente=None:
+                  (rango_normalizado(poblacion), rango_normalizado(superficie), continente_normalizado(continente)))
+def consultar_paises(paises, poblacion=None, superficie=None, continente=None):
+    """
+    Retorna las posiciones de los países que cumplen todos los filtros dados.
+    poblacion y superficie son tuplas (minimo, maximo); continente es texto.
+    Parte del índice más selectivo y verifica el resto sobre las columnas.
+    """
+    rangos = {}
+    if poblacion is not None:
+        rangos["poblacion"] = poblacion
+    if superficie is not None:
+        rangos["superficie"] = superficie
+    if isinstance(paises, TablaSQLite):
+        return paises.filtrar(rangos, None if continente is None else normalizar_termino(continente))
+    
+    # Candidatos de cada filtro: (cantidad, función que los genera)
+    opciones = []
+    for columna, (minimo, maximo) in rangos.items():
+        valores, posiciones = obtener_rango(paises, columna)
+        desde = bisect.bisect_left(valores, minimo)
+        hasta = bisect.bisect_right(valores, maximo)
+        opciones.append((hasta - desde, columna, posiciones[desde:hasta]))
+    if continente is not None:
+        continente_norm = normalizar_termino(continente)
+        del_continente = obtener_indice(paises, "por_continente").get(continente_norm, [])
+        opciones.append((len(del_continente), "continente", del_continente))
+    
+    if not opciones:
+        return list(range(len(paises)))
+    
+    _, elegido, candidatos = min(opciones, key=lambda opcion: opcion[0])
+    if metricas["activo"]:
+        metricas["filas_escaneadas"] += len(candidatos)
+    columnas = {columna: obtener_columna(paises, columna) for columna in rangos}
+    if continente is not None:
+        columnas["continente"] = obtener_columna(paises, "continente")
+    resultado = []
+    for i in candidatos:
+        if continente is not None and elegido != "continente" and columnas["continente"][i] != continente_norm:
+            continue
+        if any(not minimo <= columnas[columna][i] <= maximo
+               for columna, (minimo, maximo) in rangos.items() if columna != elegido):
+            continue
+        resultado.append(i)
+    
+    return sorted(resultado)
+
+def calcular_densidad(poblacion, superficie):
+    """Retorna los habitantes por km²; 0 si la superficie no está cargada."""
+    return poblacion / superficie if superficie else 0.0
+
+@cachear_consulta(lambda criterio, cantidad, mayores=True, continente=None:
+                  (criterio, cantidad, bool(mayores), continente_normalizado(continente)))
+def obtener_ranking(paises, criterio, cantidad, mayores=True, continente=None):
+    """
+    Retorna las posiciones de los cantidad países con mayor (o menor) valor
+    del criterio, del primero al último puesto. Usa un montículo acotado a
+    cantidad elementos en lugar de ordenar toda la lista. criterio es una
+    columna numérica o "densidad"; con continente solo compiten los países
+    de ese continente.
+    """
+    if criterio not in COLUMNAS_RANKING:
+        raise ValueError(f"criterio de ranking desconocido '{criterio}'")
+    if isinstance(paises, TablaSQLite):
+        return paises.ordenar([criterio if not mayores else "-" + criterio], cantidad,
+                              None if continente is None else normalizar_termino(continente))
     
-    with open(ARCHIVO_CSV, mode='r', encoding='utf-8', newline='') as archivo:
-        lector = csv.DictReader(archivo)
-        for fila in lector:
-            if fila["poblacion"].isdigit() and fila["superficie"].isdigit():
-                paises.append({
-                    "nombre": fila["nombre"],
-                    "poblacion": int(fila["poblacion"]),
-                    "superficie": int(fila["superficie"]),
-                    "continente": fila["continente"]
-                })
+    if continente is None:
+        candidatos = range(len(paises))
+    else:
+        candidatos = obtener_indice(paises, "por_continente").get(normalizar_termino(continente), [])
+    if metricas["activo"]:
+        metricas["filas_escaneadas"] += len(candidatos)
+    
+    if criterio == "densidad":
+        poblaciones = obtener_columna(paises, "poblacion")
+        superficies = obtener_columna(paises, "superficie")
+        def clave(i):
+            return calcular_densidad(poblaciones[i], superficies[i])
+    else:
+        clave = obtener_columna(paises, criterio).__getitem__
     
-    return paises
-
-def guardar_paises(paises):
-    """Guarda la lista de países en el archivo CSV."""
-    with open(ARCHIVO_CSV, mode='w', encoding='utf-8', newline='') as archivo:
-        escritor = csv.DictWriter(archivo, fieldnames=COLUMNAS_CSV)
-        escritor.writeheader()
-        escritor.writerows(paises)
+    elegir = heapq.nlargest if mayores else heapq.nsmallest
+    return elegir(cantidad, candidatos, key=clave)
 
-def buscar_pais_por_nombre(paises, nombre):
+def tope_vigente(monticulo, poblaciones, signo):
     """
-    Busca un país por coincidencia exacta de nombre.
-    Retorna índice o None.
+    Retorna la posición del tope del montículo, descartando antes las entradas
+    cuyo valor ya no coincide con la población actual de esa posición.
     """
-    nombre_norm = normalizar_texto(nombre)
-    for i in range(len(paises)):
-        if normalizar_texto(paises[i]["nombre"]) == nombre_norm:
+    while monticulo:
+        valor, i = monticulo[0]
+        if poblaciones[i] == signo * valor:
             return i
+        heapq.heappop(monticulo)
     return None
 
+def obtener_estadisticas(paises):
+    """
+    Retorna las estadísticas generales a partir de los agregados acumulados.
+    Retorna None si no hay países.
+    """
+    if isinstance(paises, TablaSQLite):
+        return paises.estadisticas()
+    if not paises:
+        return None
+    
+    agregados = obtener_indice(paises, "agregados")
+    poblaciones = obtener_columna(paises, "poblacion")
+    
+    # Si las entradas obsoletas superan a las vigentes se rehacen los montículos
+    if len(agregados["mayor_poblacion"]) > 2 * len(paises):
+        agregados["mayor_poblacion"] = [(-v, i) for i, v in enumerate(poblaciones)]
+        heapq.heapify(agregados["mayor_poblacion"])
+    if len(agregados["menor_poblacion"]) > 2 * len(paises):
+        agregados["menor_poblacion"] = [(v, i) for i, v in enumerate(poblaciones)]
+        heapq.heapify(agregados["menor_poblacion"])
+    
+    return {
+        "mayor_poblacion": tope_vigente(agregados["mayor_poblacion"], poblaciones, -1),
+        "menor_poblacion": tope_vigente(agregados["menor_poblacion"], poblaciones, 1),
+        "promedio_poblacion": agregados["total_poblacion"] // len(paises),
+        "promedio_superficie": agregados["total_superficie"] // len(paises),
+        "por_continente": sorted(agregados["por_continente"].items()),
+        "total": len(paises),
+    }
+
 def validar_entero_positivo(mensaje, permitir_cero=False):
     """
     Solicita un número entero positivo con validación.
@@ -102,6 +2550,217 @@ def validar_texto_no_vacio(mensaje):
             if input().strip().lower() != 's':
                 return None
 
+"""Analítica por continente"""
+
+# Columnas numéricas preparadas para la analítica, grupo de cada continente
+# normalizado y último resultado. registrar_pais mantiene las columnas al día;
+# se descartan cuando los índices se reconstruyen
+analitica = {"paises": None, "generacion": None, "columnas": None, "grupo_de_continente": None,
+             "resultado": None}
+
+def columnas_analiticas(paises):
+    """
+    Retorna (etiquetas, grupos, poblaciones, superficies): el nombre de cada
+    continente, el número de grupo de cada país como array('H') y sus columnas
+    numéricas como array('q'). Los continentes que solo difieren en mayúsculas
+    o espacios forman un grupo. En memoria solo se arman de cero la primera
+    vez: después cada alta o modificación las actualiza en registrar_pais.
+    """
+    if isinstance(paises, TablaSQLite):
+        version = paises.version()
+    else:
+        version = obtener_indices(paises)["generacion"]
+    if analitica["paises"] is paises and analitica["generacion"] == version:
+        return analitica["columnas"]
+    
+    etiquetas = []
+    grupo_de_continente = {}
+    if isinstance(paises, TablaSQLite):
+        # Etiqueta de cada continente: la escritura de su primera aparición
+        for continente_norm, continente, _ in paises.conexion.execute(
+                "SELECT continente_norm, continente, MIN(id) FROM paises GROUP BY continente_norm"):
+            grupo_de_continente[continente_norm] = len(etiquetas)
+            etiquetas.append(continente)
+        grupos, poblaciones, superficies = array('H'), array('q'), array('q')
+        for continente_norm, poblacion, superficie in paises.conexion.execute(
+                "SELECT continente_norm, poblacion, superficie FROM paises ORDER BY id"):
+            grupos.append(grupo_de_continente[continente_norm])
+            poblaciones.append(poblacion)
+            superficies.append(superficie)
+    elif isinstance(paises, TablaPaises):
+        # Se traduce cada código de continente a su grupo
+        grupo_de_codigo = array('H')
+        for continente, continente_norm in zip(paises.continentes, paises.continentes_norm):
+            if continente_norm not in grupo_de_continente:
+                grupo_de_continente[continente_norm] = len(etiquetas)
+                etiquetas.append(continente)
+            grupo_de_codigo.append(grupo_de_continente[continente_norm])
+        if np is not None:
+            grupos = array('H')
+            grupos.frombytes(np.asarray(grupo_de_codigo, dtype=np.uint16)[
+                np.frombuffer(paises.codigos_continente, dtype=np.uint16)].tobytes())
+        else:
+            grupos = array('H', map(grupo_de_codigo.__getitem__, paises.codigos_continente))
+        # Copias, porque registrar_pais las actualiza aparte de la tabla
+        poblaciones = paises.poblaciones[:]
+        superficies = paises.superficies[:]
+    else:
+        for continente_norm, posiciones in obtener_indice(paises, "por_continente").items():
+            if posiciones:
+                grupo_de_continente[continente_norm] = len(etiquetas)
+                etiquetas.append(paises[posiciones[0]]["continente"])
+        grupos = array('H', map(grupo_de_continente.__getitem__, obtener_columna(paises, "continente")))
+        poblaciones = array('q', obtener_columna(paises, "poblacion"))
+        superficies = array('q', obtener_columna(paises, "superficie"))
+    
+    analitica["paises"] = paises
+    analitica["generacion"] = version
+    analitica["columnas"] = (etiquetas, grupos, poblaciones, superficies)
+    analitica["grupo_de_continente"] = grupo_de_continente
+    analitica["resultado"] = None
+    return analitica["columnas"]
+
+def actualizar_columnas_analiticas(indice, pais, anterior=None):
+    """
+    Aplica a las columnas de la analítica el alta (anterior=None) o la
+    modificación del país en la posición indicada. Un continente nuevo
+    agrega un grupo; los grupos que quedan vacíos no se muestran.
+    """
+    etiquetas, grupos, poblaciones, superficies = analitica["columnas"]
+    continente_norm = clave_normalizada(pais, "continente")
+    grupo = analitica["grupo_de_continente"].get(continente_norm)
+    if grupo is None:
+        grupo = analitica["grupo_de_continente"][continente_norm] = len(etiquetas)
+        etiquetas.append(pais["continente"])
+    if anterior is None:
+        grupos.append(grupo)
+        poblaciones.append(pais["poblacion"])
+        superficies.append(pais["superficie"])
+    else:
+        grupos[indice] = grupo
+        poblaciones[indice] = pais["poblacion"]
+        superficies[indice] = pais["superficie"]
+    analitica["resultado"] = None
+
+def describir_intervalo(limites, i):
+    """Retorna el texto del intervalo i del histograma ("desde a hasta" o "desde o más")."""
+    if i + 1 < len(limites):
+        return f"{limites[i]:,} a {limites[i + 1] - 1:,}"
+    return f"{limites[i]:,} o más"
+
+def percentil(ordenados, porcentaje):
+    """
+    Retorna el percentil de una secuencia ordenada, interpolando linealmente
+    entre los dos valores más cercanos (el mismo criterio que NumPy).
+    """
+    posicion = (len(ordenados) - 1) * porcentaje / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+def calcular_analitica(paises):
+    """
+    Calcula por continente la cantidad de países, la suma, el promedio, la
+    mediana y el percentil 90 de población, superficie y densidad,
+    y el histograma de población según LIMITES_HISTOGRAMA_POBLACION.
+    Retorna {"intervalos": [...], "continentes": [...], "histograma": [...]}
+    con los continentes en orden alfabético. El resultado se reutiliza
+    mientras los datos no cambien.
+    """
+    etiquetas, grupos, poblaciones, superficies = columnas_analiticas(paises)
+    if analitica["resultado"] is not None:
+        return analitica["resultado"]
+    if metricas["activo"]:
+        metricas["filas_escaneadas"] += len(grupos)
+    if np is not None:
+        # Vistas sin copia: las columnas no cambian mientras se agregan
+        continentes = agregar_con_numpy(etiquetas, np.frombuffer(grupos, dtype=np.uint16),
+                                        np.frombuffer(poblaciones, dtype=np.int64),
+                                        np.frombuffer(superficies, dtype=np.int64))
+    else:
+        continentes = agregar_con_arrays(etiquetas, grupos, poblaciones, superficies)
+    
+    continentes.sort(key=lambda fila: normalizar_termino(fila["continente"]))
+    histograma = [sum(conteos) for conteos in zip(*(fila["histograma"] for fila in continentes))]
+    analitica["resultado"] = {
+        "intervalos": [0] + LIMITES_HISTOGRAMA_POBLACION,
+        "continentes": continentes,
+        "histograma": histograma or [0] * (len(LIMITES_HISTOGRAMA_POBLACION) + 1),
+    }
+    return analitica["resultado"]
+
+def agregar_con_numpy(etiquetas, grupos, poblaciones, superficies):
+    """
+    Agregados por grupo con NumPy: se ordenan las posiciones por grupo (radix
+    sort estable sobre enteros de 16 bits) y cada grupo queda en un tramo
+    contiguo sobre el que se suman y se calculan los percentiles.
+    """
+    if len(grupos) == 0:
+        return []
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        densidades = poblaciones / superficies
+    densidades[superficies == 0] = 0.0
+    orden = np.argsort(grupos, kind="stable")
+    cantidades = np.bincount(grupos, minlength=len(etiquetas))
+    finales = np.cumsum(cantidades)
+    inicios = finales - cantidades
+    
+    limites = np.asarray(LIMITES_HISTOGRAMA_POBLACION, dtype=poblaciones.dtype)
+    cubetas = np.searchsorted(limites, poblaciones, side="right")
+    ancho = len(LIMITES_HISTOGRAMA_POBLACION) + 1
+    histogramas = np.bincount(grupos * np.intp(ancho) + cubetas,
+                              minlength=len(etiquetas) * ancho).reshape(len(etiquetas), ancho)
+    
+    # Solo los grupos con países; sus inicios quedan estrictamente crecientes
+    llenos = np.flatnonzero(cantidades)
+    filas = [{"continente": etiquetas[g], "cantidad": int(cantidades[g]), "histograma": histogramas[g].tolist()}
+             for g in llenos]
+    for columna, valores in (("poblacion", poblaciones), ("superficie", superficies), ("densidad", densidades)):
+        agrupados = valores[orden]
+        sumas = np.add.reduceat(agrupados, inicios[llenos])
+        for fila, g, suma in zip(filas, llenos, sumas):
+            # agrupados es una copia: cada tramo se particiona en el lugar
+            # alrededor de las posiciones que necesitan los percentiles
+            tramo = agrupados[inicios[g]:finales[g]]
+            posiciones = [(len(tramo) - 1) * porcentaje / 100 for porcentaje in (50, 90)]
+            tramo.partition(sorted({int(k) for k in posiciones} | {min(int(k) + 1, len(tramo) - 1) for k in posiciones}))
+            mediana, p90 = (percentil(tramo, porcentaje) for porcentaje in (50, 90))
+            fila[columna] = {
+                "suma": suma.item(),
+                "promedio": suma.item() / fila["cantidad"],
+                "mediana": float(mediana),
+                "p90": float(p90),
+            }
+    return filas
+
+def agregar_con_arrays(etiquetas, grupos, poblaciones, superficies):
+    """Agregados por grupo sin NumPy: reparte los valores por grupo y los ordena."""
+    valores = {columna: [[] for _ in etiquetas] for columna in ("poblacion", "superficie", "densidad")}
+    ancho = len(LIMITES_HISTOGRAMA_POBLACION) + 1
+    histogramas = [[0] * ancho for _ in etiquetas]
+    for grupo, poblacion, superficie in zip(grupos, poblaciones, superficies):
+        valores["poblacion"][grupo].append(poblacion)
+        valores["superficie"][grupo].append(superficie)
+        valores["densidad"][grupo].append(calcular_densidad(poblacion, superficie))
+        histogramas[grupo][bisect.bisect_right(LIMITES_HISTOGRAMA_POBLACION, poblacion)] += 1
+    
+    filas = [{"continente": etiqueta, "cantidad": len(valores["poblacion"][grupo]), "histograma": histogramas[grupo]}
+             for grupo, etiqueta in enumerate(etiquetas)]
+    for columna, por_grupo in valores.items():
+        for fila, lista in zip(filas, por_grupo):
+            if not lista:
+                continue
+            lista.sort()
+            suma = sum(lista)
+            fila[columna] = {
+                "suma": suma,
+                "promedio": suma / len(lista),
+                "mediana": float(percentil(lista, 50)),
+                "p90": float(percentil(lista, 90)),
+            }
+    return [fila for fila in filas if fila["cantidad"]]
+
 """Funciones del menú principal"""
 
 def agregar_pais(paises):
@@ -136,14 +2795,10 @@ def agregar_pais(paises):
         print("\nOperación cancelada.")
         return
     
-    paises.append({
-        "nombre": nombre,
-        "poblacion": poblacion,
-        "superficie": superficie,
-        "continente": continente
-    })
+    paises.append(crear_pais(nombre, poblacion, superficie, continente))
+    registrar_pais(paises, len(paises) - 1)
     
-    guardar_paises(paises)
+    persistir_cambio(paises, paises[-1])
     limpiar_consola()
     print(f"\n País '{nombre}' agregado exitosamente.")
 
@@ -166,6 +2821,8 @@ def actualizar_pais(paises):
         return
     
     indice = buscar_pais_por_nombre(paises, nombre)
+    if indice is None:
+        indice = elegir_sugerencia(paises, nombre)
     if indice is None:
         limpiar_consola()
         print(f"\nError: El país '{nombre}' no existe.")
@@ -181,28 +2838,50 @@ def actualizar_pais(paises):
     print("3. Actualizar ambos")
     
     opcion = input("\nSeleccione una opción (1-3): ").strip()
+    nuevos = {}
     
     if opcion in ["1", "3"]:
         poblacion = validar_entero_positivo("\nNueva población: ", permitir_cero=False)
         if poblacion is None:
             print("\nOperación cancelada.")
             return
-        paises[indice]["poblacion"] = poblacion
+        nuevos["poblacion"] = poblacion
     
     if opcion in ["2", "3"]:
         superficie = validar_entero_positivo("\nNueva superficie (km²): ", permitir_cero=False)
         if superficie is None:
             print("\nOperación cancelada.")
             return
-        paises[indice]["superficie"] = superficie
+        nuevos["superficie"] = superficie
     
     if opcion in ["1", "2", "3"]:
-        guardar_paises(paises)
+        anterior = dict(paises[indice])
+        paises[indice].update(nuevos)
+        registrar_pais(paises, indice, anterior)
+        nombre = paises[indice]["nombre"]
+        persistir_cambio(paises, paises[indice])
         limpiar_consola()
-        print(f"\n País '{paises[indice]['nombre']}' actualizado exitosamente.")
+        print(f"\n País '{nombre}' actualizado exitosamente.")
     else:
         print("\nOpción inválida.")
 
+def elegir_sugerencia(paises, nombre):
+    """
+    Ofrece los países de nombre parecido a uno inexistente y retorna la
+    posición del elegido, o None si no hay sugerencias o no se elige ninguno.
+    """
+    sugerencias = buscar_parecidos(paises, nombre)
+    if not sugerencias:
+        return None
+    
+    print(f"\nNo existe '{nombre}'. ¿Quiso decir?")
+    for numero, i in enumerate(sugerencias, start=1):
+        print(f"{numero}. {paises[i]['nombre']}")
+    eleccion = input("\nIngrese el número (Enter para cancelar): ").strip()
+    if eleccion.isdigit() and 1 <= int(eleccion) <= len(sugerencias):
+        return sugerencias[int(eleccion) - 1]
+    return None
+
 def buscar_pais(paises):
     """Busca país por coincidencia parcial o exacta en el nombre."""
     limpiar_consola()
@@ -220,19 +2899,18 @@ def buscar_pais(paises):
         print("\nOperación cancelada.")
         return
     
-    termino_norm = normalizar_texto(termino)
-    resultados = [p for p in paises if termino_norm in normalizar_texto(p["nombre"])]
+    resultados = buscar_por_subcadena(paises, termino)
     
     limpiar_consola()
     if not resultados:
         print(f"\nNo se encontraron países con '{termino}'.")
+        sugerencias = buscar_parecidos(paises, termino)
+        if sugerencias:
+            print("\n¿Quiso decir alguno de estos?")
+            imprimir_tabla(paises, sugerencias)
     else:
         print(f"\n--- RESULTADOS DE BÚSQUEDA: '{termino}' ---")
-        print("-" * 90)
-        print(f"{'País':<25} {'Población':>15} {'Superficie (km²)':>18} {'Continente':<20}")
-        print("-" * 90)
-        for p in resultados:
-            print(f"{p['nombre']:<25} {p['poblacion']:>15,} {p['superficie']:>18,} {p['continente']:<20}")
+        imprimir_tabla(paises, resultados)
         print(f"\nTotal encontrados: {len(resultados)}")
 
 def filtrar_por_continente(paises):
@@ -252,19 +2930,14 @@ def filtrar_por_continente(paises):
         print("\nOperación cancelada.")
         return
     
-    continente_norm = normalizar_texto(continente)
-    resultados = [p for p in paises if normalizar_texto(p["continente"]) == continente_norm]
+    resultados = consultar_paises(paises, continente=continente)
     
     limpiar_consola()
     if not resultados:
         print(f"\nNo hay países en '{continente}'.")
     else:
         print(f"\n--- PAÍSES EN {continente.upper()} ---")
-        print("-" * 90)
-        print(f"{'País':<25} {'Población':>15} {'Superficie (km²)':>18} {'Continente':<20}")
-        print("-" * 90)
-        for p in resultados:
-            print(f"{p['nombre']:<25} {p['poblacion']:>15,} {p['superficie']:>18,} {p['continente']:<20}")
+        imprimir_tabla(paises, resultados)
         print(f"\nTotal: {len(resultados)} países")
 
 def filtrar_por_poblacion(paises):
@@ -293,18 +2966,14 @@ def filtrar_por_poblacion(paises):
         print("\nError: El mínimo no puede ser mayor que el máximo.")
         return
     
-    resultados = [p for p in paises if minimo <= p["poblacion"] <= maximo]
+    resultados = filtrar_rango(paises, "poblacion", minimo, maximo)
     
     limpiar_consola()
     if not resultados:
         print(f"\nNo hay países con población entre {minimo:,} y {maximo:,}.")
     else:
         print(f"\n--- PAÍSES CON POBLACIÓN ENTRE {minimo:,} Y {maximo:,} ---")
-        print("-" * 90)
-        print(f"{'País':<25} {'Población':>15} {'Superficie (km²)':>18} {'Continente':<20}")
-        print("-" * 90)
-        for p in resultados:
-            print(f"{p['nombre']:<25} {p['poblacion']:>15,} {p['superficie']:>18,} {p['continente']:<20}")
+        imprimir_tabla(paises, resultados)
         print(f"\nTotal: {len(resultados)} países")
 
 def filtrar_por_superficie(paises):
@@ -333,18 +3002,14 @@ def filtrar_por_superficie(paises):
         print("\nError: El mínimo no puede ser mayor que el máximo.")
         return
     
-    resultados = [p for p in paises if minimo <= p["superficie"] <= maximo]
+    resultados = filtrar_rango(paises, "superficie", minimo, maximo)
     
     limpiar_consola()
     if not resultados:
         print(f"\nNo hay países con superficie entre {minimo:,} y {maximo:,} km².")
     else:
         print(f"\n--- PAÍSES CON SUPERFICIE ENTRE {minimo:,} Y {maximo:,} KM² ---")
-        print("-" * 90)
-        print(f"{'País':<25} {'Población':>15} {'Superficie (km²)':>18} {'Continente':<20}")
-        print("-" * 90)
-        for p in resultados:
-            print(f"{p['nombre']:<25} {p['poblacion']:>15,} {p['superficie']:>18,} {p['continente']:<20}")
+        imprimir_tabla(paises, resultados)
         print(f"\nTotal: {len(resultados)} países")
 
 def ordenar_paises(paises):
@@ -361,10 +3026,11 @@ def ordenar_paises(paises):
     print("\n1. Por nombre")
     print("2. Por población")
     print("3. Por superficie")
+    print("4. Por continente y población")
     
-    criterio = input("\nSeleccione criterio (1-3): ").strip()
+    criterio = input("\nSeleccione criterio (1-4): ").strip()
     
-    if criterio not in ["1", "2", "3"]:
+    if criterio not in ["1", "2", "3", "4"]:
         print("\nOpción inválida.")
         return
     
@@ -374,52 +3040,83 @@ def ordenar_paises(paises):
         return
     
     reverso = (direccion == "D")
+    signo = "-" if reverso else ""
     
-    # Ordenamiento manual 
     if criterio == "1":
-        paises_ordenados = []
-        for p in paises:
-            paises_ordenados.append(p)
-        
-        for i in range(len(paises_ordenados)):
-            for j in range(i + 1, len(paises_ordenados)):
-                cond = normalizar_texto(paises_ordenados[i]["nombre"]) > normalizar_texto(paises_ordenados[j]["nombre"])
-                if (cond and not reverso) or (not cond and reverso):
-                    paises_ordenados[i], paises_ordenados[j] = paises_ordenados[j], paises_ordenados[i]
+        criterios = (signo + "nombre",)
         titulo = "NOMBRE"
-    
     elif criterio == "2":
-        paises_ordenados = []
-        for p in paises:
-            paises_ordenados.append(p)
-        
-        for i in range(len(paises_ordenados)):
-            for j in range(i + 1, len(paises_ordenados)):
-                cond = paises_ordenados[i]["poblacion"] > paises_ordenados[j]["poblacion"]
-                if (cond and not reverso) or (not cond and reverso):
-                    paises_ordenados[i], paises_ordenados[j] = paises_ordenados[j], paises_ordenados[i]
+        criterios = (signo + "poblacion",)
         titulo = "POBLACIÓN"
-    
-    else:
-        paises_ordenados = []
-        for p in paises:
-            paises_ordenados.append(p)
-        
-        for i in range(len(paises_ordenados)):
-            for j in range(i + 1, len(paises_ordenados)):
-                cond = paises_ordenados[i]["superficie"] > paises_ordenados[j]["superficie"]
-                if (cond and not reverso) or (not cond and reverso):
-                    paises_ordenados[i], paises_ordenados[j] = paises_ordenados[j], paises_ordenados[i]
+    elif criterio == "3":
+        criterios = (signo + "superficie",)
         titulo = "SUPERFICIE"
+    else:
+        criterios = ("continente", signo + "poblacion")
+        titulo = "CONTINENTE Y POBLACIÓN"
+    
+    orden = obtener_orden(paises, criterios)
     
     limpiar_consola()
     orden_texto = "DESCENDENTE" if reverso else "ASCENDENTE"
     print(f"\n--- PAÍSES ORDENADOS POR {titulo} ({orden_texto}) ---")
+    imprimir_tabla(paises, orden)
+
+def mostrar_ranking(paises):
+    """Muestra los países con mayor o menor población, superficie o densidad."""
+    limpiar_consola()
+    
+    if not paises:
+        print("\nNo hay países registrados.")
+        return
+    
+    print("=" * 63)
+    print("--- RANKING DE PAÍSES ---")
+    print("=" * 63)
+    print("\n1. Por población")
+    print("2. Por superficie")
+    print("3. Por densidad de población (hab/km²)")
+    
+    opciones = {"1": ("poblacion", "POBLACIÓN"), "2": ("superficie", "SUPERFICIE"), "3": ("densidad", "DENSIDAD")}
+    eleccion = input("\nSeleccione criterio (1-3): ").strip()
+    if eleccion not in opciones:
+        print("\nOpción inválida.")
+        return
+    criterio, titulo = opciones[eleccion]
+    
+    extremo = input("¿Mayores (M) o menores (N)?: ").strip().upper()
+    if extremo not in ["M", "N"]:
+        print("\nOpción inválida.")
+        return
+    
+    cantidad = validar_entero_positivo("Cantidad de países a mostrar: ", permitir_cero=False)
+    if cantidad is None:
+        print("\nOperación cancelada.")
+        return
+    
+    continente = input("Continente (Enter para todos): ").strip() or None
+    resultados = obtener_ranking(paises, criterio, cantidad, extremo == "M", continente)
+    
+    limpiar_consola()
+    if not resultados:
+        print(f"\nNo hay países en '{continente}'.")
+        return
+    
+    alcance = f" EN {continente.upper()}" if continente else ""
+    print(f"\n--- {'MAYOR' if extremo == 'M' else 'MENOR'} {titulo}{alcance} ---")
+    print("-" * 90)
+    print(f"{'#':>4} {'País':<25} {'Continente':<20} {titulo.capitalize():>25}")
     print("-" * 90)
-    print(f"{'País':<25} {'Población':>15} {'Superficie (km²)':>18} {'Continente':<20}")
+    for puesto, i in enumerate(resultados, start=1):
+        pais = paises[i]
+        if criterio == "densidad":
+            valor = f"{calcular_densidad(pais['poblacion'], pais['superficie']):,.2f} hab/km²"
+        elif criterio == "superficie":
+            valor = f"{pais['superficie']:,} km²"
+        else:
+            valor = f"{pais['poblacion']:,}"
+        print(f"{puesto:>4} {pais['nombre']:<25} {pais['continente']:<20} {valor:>25}")
     print("-" * 90)
-    for p in paises_ordenados:
-        print(f"{p['nombre']:<25} {p['poblacion']:>15,} {p['superficie']:>18,} {p['continente']:<20}")
 
 def mostrar_estadisticas(paises):
     """Muestra estadísticas generales del dataset."""
@@ -433,55 +3130,50 @@ def mostrar_estadisticas(paises):
     print("--- ESTADÍSTICAS GENERALES ---")
     print("=" * 63)
     
-    # País con mayor y menor población 
-    pais_mayor_pob = paises[0]
-    pais_menor_pob = paises[0]
-    
-    for p in paises:
-        if p["poblacion"] > pais_mayor_pob["poblacion"]:
-            pais_mayor_pob = p
-        if p["poblacion"] < pais_menor_pob["poblacion"]:
-            pais_menor_pob = p
-    
-    # Promedios
-    total_pob = 0
-    total_sup = 0
-    for p in paises:
-        total_pob += p["poblacion"]
-        total_sup += p["superficie"]
-    
-    promedio_pob = total_pob // len(paises)
-    promedio_sup = total_sup // len(paises)
+    estadisticas = obtener_estadisticas(paises)
+    pais_mayor_pob = paises[estadisticas["mayor_poblacion"]]
+    pais_menor_pob = paises[estadisticas["menor_poblacion"]]
     
     print(f"\n Mayor población: {pais_mayor_pob['nombre']} ({pais_mayor_pob['poblacion']:,})")
     print(f" Menor población: {pais_menor_pob['nombre']} ({pais_menor_pob['poblacion']:,})")
-    print(f" Promedio de población: {promedio_pob:,}")
-    print(f" Promedio de superficie: {promedio_sup:,} km²")
-    
-    # Cantidad por continente
-    continentes = {}
-    for p in paises:
-        cont = p["continente"]
-        if cont in continentes:
-            continentes[cont] += 1
-        else:
-            continentes[cont] = 1
+    print(f" Promedio de población: {estadisticas['promedio_poblacion']:,}")
+    print(f" Promedio de superficie: {estadisticas['promedio_superficie']:,} km²")
     
     print("\n Cantidad de países por continente:")
-    cont_lista = []
-    for cont in continentes:
-        cont_lista.append((cont, continentes[cont]))
+    for cont, cantidad in estadisticas["por_continente"]:
+        print(f" {cont}: {cantidad} país(es)")
+    
+    print(f"\n Total de países registrados: {estadisticas['total']}")
+
+def mostrar_analitica(paises):
+    """
+    Muestra el detalle por continente y el histograma de la población.
+    Es una opción aparte porque recorre todas las filas tras cada modificación.
+    """
+    limpiar_consola()
     
-    # Ordenar continentes alfabéticamente
-    for i in range(len(cont_lista)):
-        for j in range(i + 1, len(cont_lista)):
-            if cont_lista[i][0] > cont_lista[j][0]:
-                cont_lista[i], cont_lista[j] = cont_lista[j], cont_lista[i]
+    if not paises:
+        print("\nNo hay países registrados.")
+        return
     
-    for cont, cantidad in cont_lista:
-        print(f" {cont}: {cantidad} país(es)")
+    print("=" * 63)
+    print("--- ANÁLISIS POR CONTINENTE ---")
+    print("=" * 63)
     
-    print(f"\n Total de países registrados: {len(paises)}")
+    analisis = calcular_analitica(paises)
+    print("\n Detalle por continente (suma / promedio / mediana / p90):")
+    for fila in analisis["continentes"]:
+        print(f"\n {fila['continente']} ({fila['cantidad']} país(es))")
+        for columna, titulo, unidad in (("poblacion", "Población", ""), ("superficie", "Superficie", " km²"),
+                                        ("densidad", "Densidad", " hab/km²")):
+            valores = fila[columna]
+            print(f"   {titulo + ':':<12} {valores['suma']:,.0f}{unidad} / {valores['promedio']:,.0f} / "
+                  f"{valores['mediana']:,.0f} / {valores['p90']:,.0f}")
+    
+    print("\n Distribución de la población:")
+    mayor = max(analisis["histograma"]) or 1
+    for i, cantidad in enumerate(analisis["histograma"]):
+        print(f" {describir_intervalo(analisis['intervalos'], i):<28} {'#' * (30 * cantidad // mayor):<30} {cantidad}")
 
 def mostrar_listado_paises(paises):
     """Muestra tabla completa de países."""
@@ -489,11 +3181,7 @@ def mostrar_listado_paises(paises):
         return
     
     print("\n--- LISTADO DE PAÍSES ---")
-    print("-" * 90)
-    print(f"{'País':<25} {'Población':>15} {'Superficie (km²)':>18} {'Continente':<20}")
-    print("-" * 90)
-    for p in paises:
-        print(f"{p['nombre']:<25} {p['poblacion']:>15,} {p['superficie']:>18,} {p['continente']:<20}")
+    imprimir_tabla(paises)
     print(f"\nTotal: {len(paises)} países")
 
 def mostrar_todos_los_paises(paises):
@@ -511,6 +3199,517 @@ def mostrar_todos_los_paises(paises):
     mostrar_listado_paises(paises)
     print("=" * 63)
 
+def importar_archivo(paises):
+    """Opción del menú para importar países desde un archivo CSV, JSON lines o binario."""
+    limpiar_consola()
+    
+    print("=" * 63)
+    print("--- IMPORTAR PAÍSES DESDE ARCHIVO ---")
+    print("=" * 63)
+    
+    ruta = validar_texto_no_vacio("\nIngrese la ruta del archivo (.csv, .jsonl o .bin, con .gz si está comprimido): ")
+    if ruta is None:
+        print("\nOperación cancelada.")
+        return
+    
+    if not os.path.exists(ruta):
+        print(f"\nError: El archivo '{ruta}' no existe.")
+        return
+    
+    rechazados = []
+    try:
+        resumen = importar_paises(paises, ruta, rechazados)
+    except (OSError, ValueError, EOFError) as error:
+        print(f"\nError: No se pudo leer el archivo ({error}).")
+        return
+    
+    limpiar_consola()
+    print(f"\n Países agregados: {resumen['agregados']}")
+    print(f" Países actualizados: {resumen['actualizados']}")
+    print(f" Filas rechazadas: {resumen['rechazados']}")
+    for rechazo in rechazados[:10]:
+        print(f"  Línea {rechazo['linea']}: {rechazo['motivo']}")
+
+"""Modo consulta por línea de comandos"""
+
+def escribir_paises(paises, formato, salida=None):
+    """Escribe los países en la salida como CSV o JSON lines, fila por fila."""
+    salida = salida or sys.stdout
+    if formato == "jsonl":
+        for p in paises:
+            salida.write(json.dumps({columna: p[columna] for columna in COLUMNAS_CSV}, ensure_ascii=False) + "\n")
+    else:
+        escritor = csv.writer(salida, lineterminator="\n")
+        escritor.writerow(COLUMNAS_CSV)
+        for p in paises:
+            escritor.writerow([p[columna] for columna in COLUMNAS_CSV])
+
+def resumir_estadisticas(paises):
+    """Retorna las estadísticas generales con nombres de país en lugar de posiciones."""
+    estadisticas = obtener_estadisticas(paises)
+    if estadisticas is None:
+        return {"total": 0}
+    return {
+        "mayor_poblacion": paises[estadisticas["mayor_poblacion"]]["nombre"],
+        "menor_poblacion": paises[estadisticas["menor_poblacion"]]["nombre"],
+        "promedio_poblacion": estadisticas["promedio_poblacion"],
+        "promedio_superficie": estadisticas["promedio_superficie"],
+        "total": estadisticas["total"],
+        "por_continente": dict(estadisticas["por_continente"]),
+    }
+
+def escribir_estadisticas(paises, formato, salida=None):
+    """Escribe las estadísticas generales como un objeto JSON o pares clave,valor."""
+    salida = salida or sys.stdout
+    resumen = resumir_estadisticas(paises)
+    
+    if formato == "jsonl":
+        salida.write(json.dumps(resumen, ensure_ascii=False) + "\n")
+    else:
+        escritor = csv.writer(salida, lineterminator="\n")
+        escritor.writerow(["clave", "valor"])
+        for clave, valor in resumen.items():
+            if clave == "por_continente":
+                for continente, cantidad in valor.items():
+                    escritor.writerow([f"continente:{continente}", cantidad])
+            else:
+                escritor.writerow([clave, valor])
+
+def escribir_analitica(paises, formato, salida=None):
+    """
+    Escribe la analítica por continente, una fila por continente con columnas
+    <medida>_<estadístico> e histograma_desde_<límite>, como CSV o JSON lines.
+    """
+    salida = salida or sys.stdout
+    analisis = calcular_analitica(paises)
+    filas = []
+    for continente in analisis["continentes"]:
+        fila = {"continente": continente["continente"], "cantidad": continente["cantidad"]}
+        for columna in COLUMNAS_RANKING:
+            for estadistico, valor in continente[columna].items():
+                fila[f"{columna}_{estadistico}"] = valor
+        for desde, cantidad in zip(analisis["intervalos"], continente["histograma"]):
+            fila[f"histograma_desde_{desde}"] = cantidad
+        filas.append(fila)
+    
+    if formato == "jsonl":
+        for fila in filas:
+            salida.write(json.dumps(fila, ensure_ascii=False) + "\n")
+    elif filas:
+        escritor = csv.DictWriter(salida, fieldnames=list(filas[0]), lineterminator="\n")
+        escritor.writeheader()
+        escritor.writerows(filas)
+
+def crear_parser():
+    """Crea el parser de argumentos del modo consulta."""
+    parser = argparse.ArgumentParser(
+        description="Consultas sobre el dataset de países sin el menú interactivo. "
+                    "Sin argumentos se abre el menú.")
+    parser.add_argument("--archivo", default=ARCHIVO_CSV,
+                        help="archivo de países: .csv, .jsonl o .bin, con .gz si está comprimido")
+    parser.add_argument("--motor", choices=["csv", "sqlite"], default=MOTOR_ALMACENAMIENTO,
+                        help="almacenamiento a consultar (por defecto %(default)s)")
+    parser.add_argument("--base", default=ARCHIVO_SQLITE, help="base SQLite del motor sqlite")
+    parser.add_argument("--procesos-carga", type=int, default=PROCESOS_CARGA, metavar="N",
+                        help="procesos para analizar un CSV sin comprimir en paralelo (por defecto %(default)s)")
+    parser.add_argument("--formato", choices=["csv", "jsonl"], default="csv",
+                        help="formato de salida (por defecto csv)")
+    parser.add_argument("--perfil", action="store_true",
+                        help="medir las operaciones y mostrar un resumen al terminar")
+    parser.add_argument("--cprofile", metavar="OPERACION", choices=FUNCIONES_INSTRUMENTADAS,
+                        help="perfilar con cProfile la primera llamada de la operación")
+    parser.add_argument("--limite", "--limit", type=int, help="cantidad máxima de países a mostrar")
+    parser.add_argument("--desde", "--offset", type=int, default=0,
+                        help="cantidad de países a saltear al comienzo")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    
+    buscar = comandos.add_parser("buscar", help="buscar países por nombre total o parcial")
+    buscar.add_argument("termino")
+    
+    filtrar = comandos.add_parser("filtrar", help="filtrar por continente y/o rangos")
+    filtrar.add_argument("--continente")
+    filtrar.add_argument("--poblacion", nargs=2, type=int, metavar=("MIN", "MAX"))
+    filtrar.add_argument("--superficie", nargs=2, type=int, metavar=("MIN", "MAX"))
+    
+    ordenar = comandos.add_parser("ordenar", help="listar países ordenados")
+    ordenar.add_argument("--por", default="nombre",
+                         help="columnas separadas por coma; con '-' delante el orden es "
+                              "descendente (ej.: continente,-poblacion)")
+    ordenar.add_argument("--desc", action="store_true", help="invertir el orden de todas las columnas")
+    
+    ranking = comandos.add_parser("ranking", help="países con mayor o menor valor de un criterio")
+    ranking.add_argument("--por", choices=COLUMNAS_RANKING, default="poblacion")
+    ranking.add_argument("--cantidad", type=int, default=10, help="cantidad de países (por defecto 10)")
+    ranking.add_argument("--menores", action="store_true", help="los de menor valor en lugar de mayor")
+    ranking.add_argument("--continente", help="considerar solo los países de ese continente")
+    
+    comandos.add_parser("estadisticas", help="estadísticas generales")
+    comandos.add_parser("analitica", help="agregados, percentiles e histograma por continente")
+    exportar = comandos.add_parser("exportar", help="exportar todos los países")
+    exportar.add_argument("--salida", metavar="RUTA",
+                          help="escribir en un archivo en lugar de la salida estándar; el formato sale de "
+                               "la extensión (.csv, .jsonl o .bin, con .gz para comprimir)")
+    
+    importar = comandos.add_parser("importar", help="importar países desde un CSV, JSON lines o binario")
+    importar.add_argument("ruta")
+    
+    migrar = comandos.add_parser("migrar", help="copiar el CSV a la base SQLite o la base al CSV")
+    migrar.add_argument("destino", choices=["sqlite", "csv"])
+    
+    servir = comandos.add_parser("servir", help="atender consultas en un socket local (JSON lines)")
+    servir.add_argument("--host", default=HOST_SERVIDOR)
+    servir.add_argument("--puerto", type=int, default=PUERTO_SERVIDOR)
+    servir.add_argument("--unix", metavar="RUTA", help="usar un socket Unix en lugar de TCP")
+    
+    return parser
+
+def ejecutar_comando(argumentos):
+    """
+    Ejecuta una consulta del modo línea de comandos sobre los datos cargados
+    y escribe el resultado en la salida estándar. Retorna el código de salida.
+    """
+    global ARCHIVO_CSV, ARCHIVO_SQLITE, MOTOR_ALMACENAMIENTO, PROCESOS_CARGA
+    parser = crear_parser()
+    opciones = parser.parse_args(argumentos)
+    if opciones.procesos_carga < 1:
+        parser.error("--procesos-carga debe ser al menos 1")
+    PROCESOS_CARGA = opciones.procesos_carga
+    ARCHIVO_CSV = opciones.archivo
+    ARCHIVO_SQLITE = opciones.base
+    MOTOR_ALMACENAMIENTO = opciones.motor
+    if opciones.perfil or opciones.cprofile:
+        activar_instrumentacion(opciones.cprofile)
+    
+    if opciones.desde < 0 or (opciones.limite is not None and opciones.limite < 0):
+        parser.error("--desde y --limite no pueden ser negativos")
+    if getattr(opciones, "cantidad", 0) < 0:
+        parser.error("--cantidad no puede ser negativa")
+    for rango in ("poblacion", "superficie"):
+        valores = getattr(opciones, rango, None)
+        if valores is not None and valores[0] > valores[1]:
+            parser.error(f"--{rango}: el mínimo no puede ser mayor que el máximo")
+    
+    criterios = None
+    if opciones.comando == "ordenar":
+        criterios = []
+        for criterio in opciones.por.split(","):
+            criterio = criterio.strip()
+            if criterio.lstrip("-") not in COLUMNAS_ORDEN:
+                parser.error(f"--por: columna desconocida '{criterio}'")
+            if opciones.desc:
+                criterio = criterio[1:] if criterio.startswith("-") else "-" + criterio
+            criterios.append(criterio)
+    
+    rechazados = []
+    if opciones.comando == "migrar":
+        if opciones.destino == "sqlite":
+            filas = migrar_csv_a_sqlite(rechazados)
+            for rechazo in rechazados:
+                print(f"Línea {rechazo['linea']} descartada: {rechazo['motivo']}", file=sys.stderr)
+            print(f"{filas} país(es) copiados de '{ARCHIVO_CSV}' a '{ARCHIVO_SQLITE}'.")
+        else:
+            filas = exportar_sqlite_a_csv()
+            print(f"{filas} país(es) copiados de '{ARCHIVO_SQLITE}' a '{ARCHIVO_CSV}'.")
+        return 0
+    
+    paises = cargar_paises(rechazados)
+    for rechazo in rechazados:
+        print(f"Línea {rechazo['linea']} descartada: {rechazo['motivo']}", file=sys.stderr)
+    
+    if opciones.comando == "buscar":
+        posiciones = buscar_por_subcadena(paises, opciones.termino)
+        if not posiciones:
+            # Una sola búsqueda: recorrer los nombres es más barato que armar el árbol BK
+            sugerencias = [paises[i]["nombre"] for i in sugerir_sin_arbol(paises, opciones.termino)]
+            if sugerencias:
+                print(f"¿Quiso decir: {', '.join(sugerencias)}?", file=sys.stderr)
+    elif opciones.comando == "filtrar":
+        posiciones = consultar_paises(paises, poblacion=opciones.poblacion,
+                                      superficie=opciones.superficie, continente=opciones.continente)
+    elif opciones.comando == "ordenar":
+        posiciones = obtener_orden(paises, criterios)
+    elif opciones.comando == "ranking":
+        posiciones = obtener_ranking(paises, opciones.por, opciones.cantidad,
+                                     not opciones.menores, opciones.continente)
+    elif opciones.comando == "estadisticas":
+        escribir_estadisticas(paises, opciones.formato)
+        return 0
+    elif opciones.comando == "analitica":
+        escribir_analitica(paises, opciones.formato)
+        return 0
+    elif opciones.comando == "importar":
+        try:
+            resumen = importar_paises(paises, opciones.ruta, rechazados)
+        except (OSError, ValueError, EOFError) as error:
+            print(f"Error: no se pudo importar '{opciones.ruta}' ({error}).", file=sys.stderr)
+            return 1
+        for rechazo in rechazados:
+            print(f"Línea {rechazo['linea']} de '{opciones.ruta}' descartada: {rechazo['motivo']}",
+                  file=sys.stderr)
+        print(json.dumps(resumen) if opciones.formato == "jsonl" else
+              "agregados,actualizados,rechazados\n{agregados},{actualizados},{rechazados}".format(**resumen))
+        return 0
+    elif opciones.comando == "servir":
+        try:
+            servir(paises, opciones.host, opciones.puerto, opciones.unix)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            cerrar_journal()
+        return 0
+    else:
+        posiciones = range(len(paises))
+    
+    hasta = None if opciones.limite is None else opciones.desde + opciones.limite
+    ventana = itertools.islice(posiciones, opciones.desde, hasta)
+    if getattr(opciones, "salida", None):
+        filas = escribir_registros(opciones.salida, (paises[i] for i in ventana))
+        print(f"{filas} país(es) exportados a '{opciones.salida}'.", file=sys.stderr)
+        return 0
+    escribir_paises((paises[i] for i in ventana), opciones.formato)
+    return 0
+
+"""Servidor de consultas"""
+
+def posiciones_de_consulta(paises, solicitud):
+    """Resuelve una solicitud de lectura y retorna las posiciones resultantes."""
+    operacion = solicitud.get("op")
+    if operacion == "buscar":
+        return buscar_por_subcadena(paises, str(solicitud["termino"]))
+    if operacion == "obtener":
+        indice = buscar_pais_por_nombre(paises, str(solicitud["nombre"]))
+        return [] if indice is None else [indice]
+    if operacion == "sugerir":
+        return buscar_parecidos(paises, str(solicitud["nombre"]), int(solicitud.get("distancia", DISTANCIA_SUGERENCIAS)),
+                                bool(solicitud.get("plegar", True)))
+    if operacion == "filtrar":
+        rangos = {}
+        for columna in COLUMNAS_RANGO:
+            if solicitud.get(columna) is not None:
+                minimo, maximo = solicitud[columna]
+                rangos[columna] = (int(minimo), int(maximo))
+        return consultar_paises(paises, continente=solicitud.get("continente"), **rangos)
+    if operacion == "ordenar":
+        criterios = [c.strip() for c in str(solicitud.get("por", "nombre")).split(",")]
+        for criterio in criterios:
+            if criterio.lstrip("-") not in COLUMNAS_ORDEN:
+                raise ValueError(f"columna desconocida '{criterio}'")
+        return obtener_orden(paises, criterios)
+    if operacion == "ranking":
+        return obtener_ranking(paises, str(solicitud.get("por", "poblacion")), int(solicitud.get("cantidad", 10)),
+                               not solicitud.get("menores", False), solicitud.get("continente"))
+    if operacion == "listar":
+        return range(len(paises))
+    raise ValueError(f"operación desconocida '{operacion}'")
+
+def atender_lectura(paises, solicitud):
+    """Atiende una solicitud de lectura y retorna la respuesta."""
+    if solicitud.get("op") == "estadisticas":
+        return {"ok": True, "estadisticas": resumir_estadisticas(paises)}
+    if solicitud.get("op") == "cache":
+        return {"ok": True, "cache": estadisticas_cache_consultas()}
+    
+    posiciones = posiciones_de_consulta(paises, solicitud)
+    desde = int(solicitud.get("desde", 0))
+    limite = solicitud.get("limite")
+    hasta = None if limite is None else desde + int(limite)
+    return {
+        "ok": True,
+        "total": len(posiciones),
+        "paises": [{columna: paises[i][columna] for columna in COLUMNAS_CSV}
+                   for i in itertools.islice(posiciones, desde, hasta)],
+    }
+
+def aplicar_escritura(paises, solicitud):
+    """
+    Aplica en memoria un alta ("agregar") o una modificación ("actualizar").
+    Retorna (respuesta, país a persistir o None si hubo error).
+    """
+    operacion = solicitud.get("op")
+    if operacion == "agregar":
+        pais, motivo = convertir_fila([str(solicitud.get(columna, "")) for columna in COLUMNAS_CSV], estricto=True)
+        if pais is None:
+            return {"ok": False, "error": motivo}, None
+        if buscar_pais_por_nombre(paises, pais["nombre"]) is not None:
+            return {"ok": False, "error": f"el país '{pais['nombre']}' ya existe"}, None
+        paises.append(pais)
+        registrar_pais(paises, len(paises) - 1)
+        return {"ok": True}, paises[-1]
+    
+    indice = buscar_pais_por_nombre(paises, str(solicitud.get("nombre", "")))
+    if indice is None:
+        return {"ok": False, "error": f"el país '{solicitud.get('nombre')}' no existe"}, None
+    nuevos = {}
+    for columna in COLUMNAS_RANGO:
+        if solicitud.get(columna) is not None:
+            valor = str(solicitud[columna])
+            if not valor.isdecimal() or int(valor) <= 0:
+                return {"ok": False, "error": f"{columna} debe ser un entero mayor que 0"}, None
+            nuevos[columna] = int(valor)
+    if not nuevos:
+        return {"ok": False, "error": "no se indicó población ni superficie"}, None
+    anterior = dict(paises[indice])
+    paises[indice].update(nuevos)
+    registrar_pais(paises, indice, anterior)
+    return {"ok": True}, paises[indice]
+
+async def persistir_cambio_sin_bloquear(paises, pais):
+    """
+    persistir_cambio para el servidor. Las escrituras de archivos corren en
+    otro hilo para no frenar las lecturas; lo que modifica la lista y sus
+    índices corre siempre en el hilo del bucle de eventos.
+    """
+    if isinstance(paises, TablaSQLite):
+        await asyncio.to_thread(paises.confirmar)
+        return
+    
+    if USAR_JOURNAL:
+        await asyncio.to_thread(agregar_al_journal, pais)
+        if journal["registros"] < JOURNAL_MAX_REGISTROS:
+            return
+    else:
+        marcar_pendiente(pais)
+    await guardar_paises_sin_bloquear(paises)
+
+async def guardar_paises_sin_bloquear(paises):
+    """
+    guardar_paises para el servidor: el bloqueo, la lectura de los cambios
+    externos y la escritura del archivo corren en otro hilo, y los cambios
+    leídos se incorporan a la lista en el hilo del bucle de eventos.
+    Debe llamarse desde escritor_de_cambios, la única tarea que modifica la lista.
+    """
+    with contextlib.ExitStack() as pila:
+        await asyncio.to_thread(pila.enter_context, bloqueo_escritura())
+        if modificado_por_otro_proceso():
+            incorporar_paises(paises, await asyncio.to_thread(releer_paises_de_disco))
+        await asyncio.to_thread(escribir_archivo_paises, paises)
+        registrar_estado_en_disco(estado_en_disco())
+        estado_archivo["pendientes"] = {}
+
+async def recargar_sin_bloquear(paises):
+    """
+    recargar_cambios_externos para el servidor: la lectura de los archivos
+    corre en otro hilo y los cambios se incorporan en el del bucle de eventos.
+    Debe llamarse desde escritor_de_cambios, la única tarea que modifica la lista.
+    """
+    if isinstance(paises, TablaSQLite) or not modificado_por_otro_proceso():
+        return 0
+    return incorporar_cambios_externos(paises, *await asyncio.to_thread(leer_cambios_externos))
+
+async def escritor_de_cambios(paises, cola):
+    """
+    Única tarea que modifica los datos: aplica las escrituras en orden de
+    llegada y las persiste antes de responder. Antes de cada escritura, y tras
+    INTERVALO_RECARGA_SERVIDOR segundos sin escrituras, incorpora los cambios
+    que otro proceso hizo en los archivos.
+    """
+    while True:
+        try:
+            solicitud, respuesta = await asyncio.wait_for(cola.get(), INTERVALO_RECARGA_SERVIDOR)
+        except asyncio.TimeoutError:
+            try:
+                await recargar_sin_bloquear(paises)
+            except (OSError, ValueError) as error:
+                print(f"No se pudieron incorporar los cambios externos: {error}", file=sys.stderr, flush=True)
+            continue
+        
+        try:
+            await recargar_sin_bloquear(paises)
+            resultado, pais = aplicar_escritura(paises, solicitud)
+            if pais is not None:
+                await persistir_cambio_sin_bloquear(paises, pais)
+            respuesta.set_result(resultado)
+        except Exception as error:
+            respuesta.set_result({"ok": False, "error": str(error)})
+        finally:
+            cola.task_done()
+
+async def leer_solicitud(lector):
+    """
+    Retorna la próxima línea de la conexión (b"" si se cerró). Si la línea
+    supera MAXIMO_SOLICITUD bytes la descarta completa y lanza ValueError,
+    de modo que la conexión puede seguir con la línea siguiente.
+    """
+    try:
+        return await lector.readuntil(b"\n")
+    except asyncio.IncompleteReadError as error:
+        return error.partial
+    except asyncio.LimitOverrunError as error:
+        excedente = error.consumed
+    
+    while True:
+        await lector.readexactly(excedente)
+        try:
+            await lector.readuntil(b"\n")
+            break
+        except asyncio.IncompleteReadError:
+            break
+        except asyncio.LimitOverrunError as error:
+            excedente = error.consumed
+    raise ValueError(f"la solicitud supera el máximo de {MAXIMO_SOLICITUD} bytes")
+
+async def atender_cliente(paises, cola, lector, escritor):
+    """Atiende las solicitudes JSON lines de una conexión hasta que se cierre."""
+    try:
+        while True:
+            try:
+                linea = await leer_solicitud(lector)
+                if not linea:
+                    break
+                solicitud = json.loads(linea)
+                if not isinstance(solicitud, dict):
+                    raise ValueError("la solicitud debe ser un objeto JSON")
+                if solicitud.get("op") in ("agregar", "actualizar"):
+                    respuesta = asyncio.get_running_loop().create_future()
+                    await cola.put((solicitud, respuesta))
+                    resultado = await respuesta
+                else:
+                    resultado = atender_lectura(paises, solicitud)
+            except (ValueError, KeyError, TypeError) as error:
+                resultado = {"ok": False, "error": str(error)}
+            escritor.write(json.dumps(resultado, ensure_ascii=False).encode('utf-8') + b"\n")
+            await escritor.drain()
+    except ConnectionError:
+        pass
+    finally:
+        escritor.close()
+
+async def ejecutar_servidor(paises, host=HOST_SERVIDOR, puerto=PUERTO_SERVIDOR, socket_unix=None):
+    """Inicia el servidor y atiende conexiones hasta ser cancelado."""
+    cola = asyncio.Queue()
+    tarea_escritor = asyncio.create_task(escritor_de_cambios(paises, cola))
+    
+    def conexion(lector, escritor):
+        return atender_cliente(paises, cola, lector, escritor)
+    
+    if socket_unix:
+        if os.path.exists(socket_unix):
+            os.remove(socket_unix)
+        servidor = await asyncio.start_unix_server(conexion, path=socket_unix, limit=MAXIMO_SOLICITUD,
+                                                  backlog=CONEXIONES_EN_ESPERA)
+        direccion = socket_unix
+    else:
+        servidor = await asyncio.start_server(conexion, host, puerto, limit=MAXIMO_SOLICITUD,
+                                             backlog=CONEXIONES_EN_ESPERA)
+        direccion = f"{host}:{puerto}"
+    
+    # SIGTERM detiene el servidor en forma ordenada, igual que Ctrl+C
+    detener = asyncio.Event()
+    if hasattr(signal, "SIGTERM") and os.name != 'nt':
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, detener.set)
+    
+    print(f"Servidor atendiendo {len(paises)} país(es) en {direccion}", file=sys.stderr, flush=True)
+    try:
+        async with servidor:
+            await detener.wait()
+    finally:
+        await cola.join()
+        tarea_escritor.cancel()
+
+def servir(paises, host=HOST_SERVIDOR, puerto=PUERTO_SERVIDOR, socket_unix=None):
+    """Atiende consultas sobre la lista cargada en un socket local (TCP o Unix)."""
+    asyncio.run(ejecutar_servidor(paises, host, puerto, socket_unix))
+
 """Menú principal"""
 
 def mostrar_menu():
@@ -528,20 +3727,27 @@ def mostrar_menu():
     print("8. Mostrar estadísticas")
     print("9. Mostrar todos los países")
     print("10. Salir")
+    print("11. Importar países desde archivo")
+    print("12. Ranking de países")
+    print("13. Análisis por continente")
     print("=" * 63)
 
 def main():
     """Función principal que ejecuta el menú interactivo."""
     limpiar_consola()
     
-    paises = cargar_paises()
+    rechazados = []
+    paises = cargar_paises(rechazados)
     
     print("=" * 63)
     print("\n--- Bienvenido al Sistema de Gestión de Países ---")
+    archivo = ARCHIVO_SQLITE if MOTOR_ALMACENAMIENTO == "sqlite" else ARCHIVO_CSV
     if paises:
-        print(f"Se cargaron {len(paises)} país(es) del archivo '{ARCHIVO_CSV}'.\n".center(63))
+        print(f"Se cargaron {len(paises)} país(es) del archivo '{archivo}'.\n".center(63))
     else:
-        print(f"No hay datos. Archivo '{ARCHIVO_CSV}' no encontrado.\n".center(63))
+        print(f"No hay datos. Archivo '{archivo}' no encontrado.\n".center(63))
+    if rechazados:
+        print(f"Se descartaron {len(rechazados)} fila(s) inválida(s). Detalle en '{ruta_reporte_rechazados()}'.")
     print("=" * 63)
     print("\nPresione Enter para continuar...")
     input()
@@ -551,6 +3757,11 @@ def main():
         mostrar_menu()
         opcion = input("\nSeleccione una opción: ").strip()
         
+        # Otro proceso pudo modificar el archivo mientras el menú esperaba
+        cambios = recargar_cambios_externos(paises)
+        if cambios:
+            print(f"\nSe incorporaron {cambios} cambio(s) hechos por otro proceso en '{ARCHIVO_CSV}'.")
+        
         match opcion:
             case "1":
                 agregar_pais(paises)
@@ -589,6 +3800,7 @@ def main():
                 input("\nPresione Enter para continuar...")
                 limpiar_consola()
             case "10":
+                cerrar_journal()
                 limpiar_consola()
                 print("=" * 60)
                 print("--- SALIENDO DEL SISTEMA ---")
@@ -596,13 +3808,36 @@ def main():
                 print("\n¡Gracias por usar el Sistema de Gestión de Países!\n")
                 print("=" * 60)
                 break
+            case "11":
+                importar_archivo(paises)
+                input("\nPresione Enter para continuar...")
+                limpiar_consola()
+            case "12":
+                mostrar_ranking(paises)
+                input("\nPresione Enter para continuar...")
+                limpiar_consola()
+            case "13":
+                mostrar_analitica(paises)
+                input("\nPresione Enter para continuar...")
+                limpiar_consola()
             case "":
                 limpiar_consola()
             case _:
                 limpiar_consola()
-                print("\nError: Opción inválida. Seleccione una opción del 1 al 10.")
+                print("\nError: Opción inválida. Seleccione una opción del 1 al 13.")
                 input("\nPresione Enter para continuar...")
                 limpiar_consola()
 
 if __name__ == "__main__":
+    if os.environ.get(VARIABLE_PERFIL) or os.environ.get(VARIABLE_CPROFILE):
+        activar_instrumentacion(os.environ.get(VARIABLE_CPROFILE))
+    if len(sys.argv) > 1:
+        try:
+            codigo = ejecutar_comando(sys.argv[1:])
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # La salida se cerró antes de tiempo (por ejemplo, con head)
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            codigo = 1
+        sys.exit(codigo)
     main()
@@ -0,0 +1,419 @@
+"""
+Benchmark del Sistema de Gestión de Países
+Genera catálogos sintéticos deterministas y mide las operaciones del sistema
+sin interacción, guardando los resultados en un archivo JSON.
+"""
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import Gestion_paises_Dominguez_Urrutia as gp
+
+# Constantes
+TAMANOS_POR_DEFECTO = [1000, 10000, 100000]
+CONSULTAS_POR_DEFECTO = 200
+ARCHIVO_RESULTADOS = "benchmark_resultados.json"
+CONTINENTES = ["América", "Asia", "África", "Europa", "Oceanía", "Antártida"]
+SCRIPT_PRINCIPAL = gp.__file__
+EXTENSIONES_FORMATOS = [".csv", ".csv.gz", ".jsonl", ".jsonl.gz", ".bin", ".bin.gz"]
+ESPERA_SERVIDOR = 120
+SILABAS = ["ar", "gen", "ti", "na", "bra", "sil", "ja", "pon", "ale", "ma",
+           "nia", "chi", "le", "pe", "ru", "mex", "co", "can", "da", "ko"]
+
+"""Generación de catálogos"""
+
+def generar_paises(cantidad, semilla=0, sesgo=1.0):
+    """
+    Generador determinista de países sintéticos con nombres únicos.
+    sesgo controla la distribución de continentes: 0 es uniforme y valores
+    mayores concentran los países en los primeros continentes (tipo Zipf).
+    """
+    azar = random.Random(semilla)
+    pesos = [1 / (k + 1) ** sesgo for k in range(len(CONTINENTES))]
+    for i in range(cantidad):
+        nombre = "".join(azar.choice(SILABAS) for _ in range(azar.randint(2, 4))).capitalize()
+        yield {
+            "nombre": f"{nombre} {i}",
+            "poblacion": azar.randint(1000, 1_500_000_000),
+            "superficie": azar.randint(1, 17_000_000),
+            "continente": azar.choices(CONTINENTES, pesos)[0]
+        }
+
+def escribir_catalogo(ruta, cantidad, semilla=0, sesgo=1.0):
+    """Escribe un catálogo sintético en formato CSV sin mantenerlo en memoria."""
+    with open(ruta, mode='w', encoding='utf-8', newline='') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=gp.COLUMNAS_CSV)
+        escritor.writeheader()
+        escritor.writerows(generar_paises(cantidad, semilla, sesgo))
+
+"""Mediciones"""
+
+def cronometrar(funcion, repeticiones=1):
+    """Ejecuta la función las veces indicadas y retorna los segundos por ejecución."""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+def medir_pico_memoria(funcion):
+    """Ejecuta la función y retorna el pico de memoria asignada, en bytes."""
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico
+
+def ampliar_limite_archivos(cantidad):
+    """Eleva el límite de archivos abiertos del proceso para muchos clientes simultáneos."""
+    try:
+        import resource
+    except ImportError:
+        return
+    blando, duro = resource.getrlimit(resource.RLIMIT_NOFILE)
+    deseado = cantidad + 256
+    if blando < deseado:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (deseado if duro == resource.RLIM_INFINITY else min(deseado, duro), duro))
+
+async def conectar(direccion):
+    """Abre una conexión al servidor, por socket Unix (ruta) o TCP (host, puerto)."""
+    if isinstance(direccion, str):
+        return await asyncio.open_unix_connection(direccion, limit=2 ** 20)
+    return await asyncio.open_connection(*direccion, limit=2 ** 20)
+
+async def consultar_en_paralelo(direccion, solicitudes):
+    """Envía cada solicitud desde un cliente distinto, todos a la vez. Retorna las latencias."""
+    async def cliente(solicitud):
+        inicio = time.perf_counter()
+        lector, escritor = await conectar(direccion)
+        escritor.write(json.dumps(solicitud).encode('utf-8') + b"\n")
+        await escritor.drain()
+        await lector.readline()
+        escritor.close()
+        await escritor.wait_closed()
+        return time.perf_counter() - inicio
+
+    return await asyncio.gather(*(cliente(solicitud) for solicitud in solicitudes))
+
+def esperar_servidor(direccion):
+    """Espera hasta que el servidor acepte conexiones."""
+    limite = time.monotonic() + ESPERA_SERVIDOR
+    while time.monotonic() < limite:
+        try:
+            if isinstance(direccion, str):
+                with socket.socket(socket.AF_UNIX) as prueba:
+                    prueba.connect(direccion)
+            else:
+                socket.create_connection(direccion).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError("el servidor no respondió a tiempo")
+
+def medir_servidor(ruta_csv, directorio, clientes, procesos, terminos):
+    """
+    Compara el servidor de consultas con lanzar el script una vez por consulta.
+    Retorna consultas por segundo y latencias de ambos modos.
+    """
+    if hasattr(socket, "AF_UNIX"):
+        direccion = os.path.join(directorio, "servidor.sock")
+        argumentos = ["--unix", direccion]
+    else:
+        direccion = (gp.HOST_SERVIDOR, gp.PUERTO_SERVIDOR)
+        argumentos = ["--host", gp.HOST_SERVIDOR, "--puerto", str(gp.PUERTO_SERVIDOR)]
+
+    ampliar_limite_archivos(clientes)
+    servidor = subprocess.Popen([sys.executable, SCRIPT_PRINCIPAL, "--archivo", ruta_csv, "servir"] + argumentos,
+                                stderr=subprocess.DEVNULL)
+    try:
+        esperar_servidor(direccion)
+        solicitudes = [{"op": "buscar", "termino": terminos[i % len(terminos)], "limite": 20}
+                       for i in range(clientes)]
+        inicio = time.perf_counter()
+        latencias = asyncio.run(consultar_en_paralelo(direccion, solicitudes))
+        total = time.perf_counter() - inicio
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+    inicio = time.perf_counter()
+    for i in range(procesos):
+        subprocess.run([sys.executable, SCRIPT_PRINCIPAL, "--archivo", ruta_csv, "--limite", "20",
+                        "buscar", terminos[i % len(terminos)]], stdout=subprocess.DEVNULL, check=True)
+    por_proceso = (time.perf_counter() - inicio) / procesos
+
+    latencias.sort()
+    return {
+        "clientes": clientes,
+        "servidor_segundos": total,
+        "servidor_consultas_por_segundo": clientes / total,
+        "servidor_latencia_media": sum(latencias) / len(latencias),
+        "servidor_latencia_p99": latencias[int(0.99 * (len(latencias) - 1))],
+        "proceso_por_consulta_segundos": por_proceso,
+        "proceso_por_consulta_consultas_por_segundo": 1 / por_proceso,
+    }
+
+def medir_tamano(cantidad, consultas, semilla=0, sesgo=1.0, clientes=0, procesos=10, procesos_carga=2):
+    """
+    Mide todas las operaciones sobre un catálogo sintético de la cantidad
+    indicada de países. Retorna un diccionario con los resultados.
+    """
+    azar = random.Random(semilla + 1)
+    resultado = {"filas": cantidad}
+
+    with tempfile.TemporaryDirectory() as directorio:
+        gp.ARCHIVO_CSV = os.path.join(directorio, "paises.csv")
+        escribir_catalogo(gp.ARCHIVO_CSV, cantidad, semilla, sesgo)
+        resultado["bytes_csv"] = os.path.getsize(gp.ARCHIVO_CSV)
+
+        # Carga sin snapshot (lectura del CSV) y con snapshot
+        usar_snapshot = gp.USAR_SNAPSHOT
+        procesos_carga_original = gp.PROCESOS_CARGA
+        gp.USAR_SNAPSHOT = False
+        segundos = cronometrar(gp.cargar_paises)
+        resultado["cargar_paises"] = {"segundos": segundos, "filas_por_segundo": cantidad / segundos}
+        resultado["cargar_paises"]["pico_memoria"] = medir_pico_memoria(gp.cargar_paises)
+        # Carga sin snapshot analizando el CSV con varios procesos
+        gp.PROCESOS_CARGA = procesos_carga
+        segundos = cronometrar(gp.cargar_paises)
+        resultado["cargar_paises_paralelo"] = {"segundos": segundos, "filas_por_segundo": cantidad / segundos,
+                                               "procesos": procesos_carga}
+        gp.PROCESOS_CARGA = procesos_carga_original
+        gp.USAR_SNAPSHOT = True
+        gp.cargar_paises()
+        segundos = cronometrar(gp.cargar_paises)
+        resultado["cargar_paises_snapshot"] = {"segundos": segundos, "filas_por_segundo": cantidad / segundos}
+        gp.USAR_SNAPSHOT = usar_snapshot
+
+        paises = gp.cargar_paises()
+        resultado["bytes_por_fila"] = gp.medir_memoria_por_fila(paises)
+
+        segundos = cronometrar(lambda: gp.guardar_paises(paises))
+        resultado["guardar_paises"] = {"segundos": segundos, "filas_por_segundo": cantidad / segundos}
+
+        # Construcción de todos los índices, que el programa arma en su primer uso;
+        # se mide aparte para que no quede sumada a las primeras consultas
+        def construir_indices():
+            gp.reconstruir_indices(paises)
+            for columna in gp.COLUMNAS_ORDEN:
+                gp.obtener_columna(paises, columna)
+            for columna in gp.COLUMNAS_RANGO:
+                gp.obtener_rango(paises, columna)
+            for nombre in gp.CONSTRUCTORES_INDICES:
+                gp.obtener_indice(paises, nombre)
+        segundos = cronometrar(construir_indices)
+        resultado["construir_indices"] = {"segundos": segundos, "filas_por_segundo": cantidad / segundos}
+
+        nombres = [paises[azar.randrange(cantidad)]["nombre"] for _ in range(consultas)]
+        terminos = [nombre[1:4] for nombre in nombres]
+        rangos = []
+        for _ in range(consultas):
+            minimo = azar.randint(0, 1_500_000_000)
+            rangos.append((minimo, minimo + azar.randint(0, 50_000_000)))
+
+        def medir_consultas(funcion, argumentos):
+            inicio = time.perf_counter()
+            for argumento in argumentos:
+                funcion(argumento)
+            segundos = (time.perf_counter() - inicio) / len(argumentos)
+            return {"segundos": segundos, "consultas_por_segundo": 1 / segundos if segundos else None}
+
+        # Las consultas se miden sin la caché de resultados; al final se mide aparte
+        tamano_cache = gp.TAMANO_CACHE_CONSULTAS
+        gp.TAMANO_CACHE_CONSULTAS = 0
+        resultado["buscar_pais_por_nombre"] = medir_consultas(
+            lambda nombre: gp.buscar_pais_por_nombre(paises, nombre), nombres)
+        resultado["buscar_por_subcadena"] = medir_consultas(
+            lambda termino: gp.buscar_por_subcadena(paises, termino), terminos)
+        resultado["filtrar_por_poblacion"] = medir_consultas(
+            lambda rango: gp.filtrar_rango(paises, "poblacion", *rango), rangos)
+        resultado["filtrar_por_superficie"] = medir_consultas(
+            lambda rango: gp.filtrar_rango(paises, "superficie", rango[0] // 100, rango[1] // 100), rangos)
+        resultado["filtrar_por_continente"] = medir_consultas(
+            lambda continente: gp.consultar_paises(paises, continente=continente), CONTINENTES)
+
+        # Ordenamiento: primera vez (sin vista cacheada) y reutilizando la vista
+        ordenamientos = {}
+        for criterios in (("nombre",), ("-poblacion",), ("superficie",), ("continente", "-poblacion")):
+            gp.indices["vistas"] = {}
+            ordenamientos[",".join(criterios)] = {
+                "segundos": cronometrar(lambda: gp.obtener_orden(paises, criterios)),
+                "segundos_cacheado": cronometrar(lambda: gp.obtener_orden(paises, criterios), 10),
+            }
+        resultado["ordenar_paises"] = ordenamientos
+
+        # Top 20 por criterio, en todo el catálogo y dentro de un continente
+        resultado["obtener_ranking"] = {
+            criterio: medir_consultas(
+                lambda continente: gp.obtener_ranking(paises, criterio, 20, continente=continente),
+                [None] + CONTINENTES)
+            for criterio in gp.COLUMNAS_RANKING
+        }
+
+        # Caché de resultados: filtros por continente y rangos repetidos,
+        # la primera pasada llena la caché y la segunda la reutiliza
+        gp.TAMANO_CACHE_CONSULTAS = tamano_cache
+        gp.vaciar_cache_consultas()
+        repetidas = [("continente", continente) for continente in CONTINENTES] + [("rango", r) for r in rangos[:20]]
+        def consulta_repetida(consulta):
+            tipo, argumento = consulta
+            if tipo == "continente":
+                return gp.consultar_paises(paises, continente=argumento)
+            return gp.filtrar_rango(paises, "poblacion", *argumento)
+        resultado["cache_consultas"] = {
+            "primera_pasada": medir_consultas(consulta_repetida, repetidas),
+            "segunda_pasada": medir_consultas(consulta_repetida, repetidas),
+        }
+        resultado["cache_consultas"].update(gp.estadisticas_cache_consultas())
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado["mostrar_estadisticas"] = {
+                "segundos": cronometrar(lambda: gp.mostrar_estadisticas(paises), 10)
+            }
+
+        # Analítica por continente: armando las columnas y con las columnas ya armadas
+        gp.analitica["paises"] = None
+        resultado["calcular_analitica"] = {"segundos": cronometrar(lambda: gp.calcular_analitica(paises))}
+        gp.analitica["resultado"] = None
+        resultado["calcular_analitica"]["segundos_agregacion"] = cronometrar(lambda: gp.calcular_analitica(paises))
+        resultado["calcular_analitica"]["numpy"] = gp.np is not None
+
+        resultado["formatos"] = medir_formatos(paises, directorio)
+
+        gp.cerrar_journal()
+
+        if clientes:
+            resultado["servidor"] = medir_servidor(gp.ARCHIVO_CSV, directorio, clientes, procesos, terminos)
+
+    return resultado
+
+def medir_formatos(paises, directorio):
+    """
+    Exporta e importa el catálogo en cada formato de archivo y retorna, por
+    extensión, los segundos de escritura y lectura, las filas por segundo,
+    el tamaño en bytes y el pico de memoria de la lectura.
+    """
+    resultados = {}
+    for extension in EXTENSIONES_FORMATOS:
+        ruta = os.path.join(directorio, "exportado" + extension)
+        escritura = cronometrar(lambda: gp.escribir_registros(ruta, iter(paises)))
+        # La lectura se consume sin guardar los países, como al importar en streaming
+        lectura = cronometrar(lambda: collections.deque(gp.leer_registros(ruta), maxlen=0))
+        resultados[extension] = {
+            "segundos_escritura": escritura,
+            "segundos_lectura": lectura,
+            "filas_por_segundo_escritura": len(paises) / escritura,
+            "filas_por_segundo_lectura": len(paises) / lectura,
+            "bytes": os.path.getsize(ruta),
+            "pico_memoria_lectura": medir_pico_memoria(
+                lambda: collections.deque(gp.leer_registros(ruta), maxlen=0)),
+        }
+    return resultados
+
+def ejecutar_benchmark(tamanos, consultas, semilla=0, sesgo=1.0, etiqueta=None, clientes=0, procesos=10,
+                       procesos_carga=2):
+    """Mide cada tamaño de catálogo y retorna el informe completo."""
+    archivo_original = gp.ARCHIVO_CSV
+    informe = {
+        "etiqueta": etiqueta,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "semilla": semilla,
+        "sesgo": sesgo,
+        "consultas": consultas,
+        "procesos_carga": procesos_carga,
+        "resultados": [],
+    }
+    try:
+        for cantidad in tamanos:
+            print(f"Midiendo {cantidad:,} países...")
+            informe["resultados"].append(medir_tamano(cantidad, consultas, semilla, sesgo, clientes, procesos,
+                                                      procesos_carga))
+    finally:
+        gp.ARCHIVO_CSV = archivo_original
+    return informe
+
+def mostrar_resumen(informe):
+    """Muestra una tabla con los segundos por operación para cada tamaño."""
+    operaciones = ["cargar_paises", "cargar_paises_paralelo", "cargar_paises_snapshot", "guardar_paises", "construir_indices",
+                   "buscar_pais_por_nombre",
+                   "buscar_por_subcadena", "filtrar_por_poblacion", "filtrar_por_superficie",
+                   "filtrar_por_continente", "mostrar_estadisticas", "calcular_analitica"]
+    print(f"\n{'Operación':<32}" + "".join(f"{r['filas']:>14,}" for r in informe["resultados"]))
+    print("-" * (32 + 14 * len(informe["resultados"])))
+    for operacion in operaciones:
+        print(f"{operacion:<32}" + "".join(f"{r[operacion]['segundos']:>13.6f}s" for r in informe["resultados"]))
+    for criterios in informe["resultados"][0]["ordenar_paises"] if informe["resultados"] else []:
+        print(f"{'ordenar ' + criterios:<32}"
+              + "".join(f"{r['ordenar_paises'][criterios]['segundos']:>13.6f}s" for r in informe["resultados"]))
+    for criterio in informe["resultados"][0]["obtener_ranking"] if informe["resultados"] else []:
+        print(f"{'top 20 ' + criterio:<32}"
+              + "".join(f"{r['obtener_ranking'][criterio]['segundos']:>13.6f}s" for r in informe["resultados"]))
+    if informe["resultados"]:
+        for pasada in ("primera_pasada", "segunda_pasada"):
+            print(f"{'caché de consultas ' + pasada.split('_')[0]:<32}"
+                  + "".join(f"{r['cache_consultas'][pasada]['segundos']:>13.6f}s" for r in informe["resultados"]))
+    for representacion in ("diccionarios", "columnar") if informe["resultados"] else []:
+        print(f"{'bytes por fila ' + representacion:<32}"
+              + "".join(f"{r['bytes_por_fila'][representacion]:>14,}" for r in informe["resultados"]))
+    for extension in EXTENSIONES_FORMATOS if informe["resultados"] else []:
+        print(f"{'escribir ' + extension:<32}"
+              + "".join(f"{r['formatos'][extension]['segundos_escritura']:>13.6f}s" for r in informe["resultados"]))
+        print(f"{'leer ' + extension:<32}"
+              + "".join(f"{r['formatos'][extension]['segundos_lectura']:>13.6f}s" for r in informe["resultados"]))
+        print(f"{'bytes ' + extension:<32}"
+              + "".join(f"{r['formatos'][extension]['bytes']:>14,}" for r in informe["resultados"]))
+    if informe["resultados"] and "servidor" in informe["resultados"][0]:
+        print(f"{'servidor (consultas/s)':<32}"
+              + "".join(f"{r['servidor']['servidor_consultas_por_segundo']:>14,.0f}" for r in informe["resultados"]))
+        print(f"{'proceso por consulta (cons./s)':<32}"
+              + "".join(f"{r['servidor']['proceso_por_consulta_consultas_por_segundo']:>14,.1f}"
+                        for r in informe["resultados"]))
+
+def main():
+    """Ejecuta el benchmark según los argumentos de la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Benchmark del Sistema de Gestión de Países")
+    parser.add_argument("--tamanos", nargs="+", type=int, default=TAMANOS_POR_DEFECTO,
+                        help="cantidades de países a generar (por ejemplo 1000 100000 10000000)")
+    parser.add_argument("--consultas", type=int, default=CONSULTAS_POR_DEFECTO,
+                        help="consultas por operación de búsqueda o filtrado")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--sesgo", type=float, default=1.0,
+                        help="concentración de países por continente (0 = uniforme)")
+    parser.add_argument("--clientes", type=int, default=0,
+                        help="clientes simultáneos para medir el servidor de consultas (0 = no medir)")
+    parser.add_argument("--procesos", type=int, default=10,
+                        help="ejecuciones del script, una por consulta, para comparar con el servidor")
+    parser.add_argument("--procesos-carga", type=int, default=os.cpu_count() or 2,
+                        help="procesos para medir la carga del CSV en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument("--etiqueta", help="nombre de la versión medida")
+    parser.add_argument("--salida", default=ARCHIVO_RESULTADOS, help="archivo JSON de resultados")
+    opciones = parser.parse_args()
+
+    informe = ejecutar_benchmark(opciones.tamanos, opciones.consultas, opciones.semilla,
+                                 opciones.sesgo, opciones.etiqueta, opciones.clientes, opciones.procesos,
+                                 opciones.procesos_carga)
+    with open(opciones.salida, mode='w', encoding='utf-8') as archivo:
+        json.dump(informe, archivo, indent=2, ensure_ascii=False)
+
+    mostrar_resumen(informe)
+    print(f"\nResultados guardados en '{opciones.salida}'.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Configuración de pytest: permite importar el programa desde la raíz del proyecto
+y ofrece un directorio de trabajo temporal con el estado global en blanco.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Gestion_paises_Dominguez_Urrutia as gp  # noqa: E402
+
+
+def reiniciar_estado_global():
+    """Cierra el journal abierto y deja en blanco el estado de archivos, índices y caché."""
+    if gp.journal["archivo"] is not None:
+        gp.journal["archivo"].close()
+    gp.journal.update(archivo=None, sin_sincronizar=0, registros=0)
+    gp.estado_archivo.update(csv=None, journal=0, desactualizado=False, pendientes={})
+    gp.vaciar_cache_consultas()
+    gp.reconstruir_indices([])
+
+
+@pytest.fixture
+def sin_estado_global():
+    """Deja la caché, los índices y el estado de los archivos en blanco antes y después de cada prueba."""
+    reiniciar_estado_global()
+    yield
+    reiniciar_estado_global()
+
+
+@pytest.fixture
+def en_directorio_temporal(tmp_path, monkeypatch):
+    """
+    Ejecuta la prueba dentro de un directorio temporal, donde quedan
+    paises.csv, su journal, snapshot y bloqueo, y paises.db.
+    """
+    monkeypatch.chdir(tmp_path)
+    reiniciar_estado_global()
+    yield tmp_path
+    reiniciar_estado_global()
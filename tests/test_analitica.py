@@ -0,0 +1,117 @@
+"""
+Pruebas de la analítica por continente: los tres motores calculan lo mismo,
+con y sin NumPy, y coincide con un cálculo directo.
+"""
+
+import random
+import statistics
+
+import pytest
+
+import Gestion_paises_Dominguez_Urrutia as gp
+from test_motores import MOTORES, SEMILLAS, generar_pais, recorrer_motor
+
+
+def resumen_analitica(paises):
+    """Retorna la analítica por continente normalizado, sin la etiqueta que se muestra."""
+    analisis = gp.calcular_analitica(paises)
+    continentes = {}
+    for fila in analisis["continentes"]:
+        datos = {"cantidad": fila["cantidad"], "histograma": list(fila["histograma"])}
+        for columna in gp.COLUMNAS_RANKING:
+            for estadistico, valor in fila[columna].items():
+                datos[f"{columna}_{estadistico}"] = valor
+        continentes[gp.normalizar_termino(fila["continente"])] = datos
+    return continentes, list(analisis["histograma"])
+
+
+def analitica_directa(paises):
+    """Calcula la misma analítica sin índices ni columnas, con el módulo statistics."""
+    grupos = {}
+    for p in paises:
+        grupos.setdefault(p["continente_norm"], []).append(p)
+    continentes = {}
+    for continente, miembros in grupos.items():
+        datos = {"cantidad": len(miembros), "histograma": [0] * (len(gp.LIMITES_HISTOGRAMA_POBLACION) + 1)}
+        for p in miembros:
+            cubeta = sum(p["poblacion"] >= limite for limite in gp.LIMITES_HISTOGRAMA_POBLACION)
+            datos["histograma"][cubeta] += 1
+        for columna in gp.COLUMNAS_RANKING:
+            if columna == "densidad":
+                valores = [gp.calcular_densidad(p["poblacion"], p["superficie"]) for p in miembros]
+            else:
+                valores = [p[columna] for p in miembros]
+            datos[f"{columna}_suma"] = sum(valores)
+            datos[f"{columna}_promedio"] = sum(valores) / len(valores)
+            datos[f"{columna}_mediana"] = statistics.median(valores)
+            datos[f"{columna}_p90"] = (statistics.quantiles(valores, n=10, method="inclusive")[-1]
+                                       if len(valores) > 1 else valores[0])
+        continentes[continente] = datos
+    return continentes
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_motores_calculan_la_misma_analitica(tmp_path, semilla, sin_estado_global):
+    recorridos = {motor: recorrer_motor(motor, tmp_path / "paises.db", semilla, 10,
+                                        lambda azar, paises: resumen_analitica(paises), 1, 300)[0]
+                  for motor in MOTORES}
+
+    for paso, (continentes, histograma) in enumerate(recorridos["lista"]):
+        for motor in ("columnar", "sqlite"):
+            otros, otro_histograma = recorridos[motor][paso]
+            assert otro_histograma == histograma
+            assert otros.keys() == continentes.keys()
+            for continente, datos in continentes.items():
+                assert otros[continente] == pytest.approx(datos), f"{motor}, paso {paso}: {continente}"
+
+
+@pytest.mark.parametrize("usar_numpy", [True, False])
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_analitica_coincide_con_el_calculo_directo(semilla, usar_numpy, sin_estado_global, monkeypatch):
+    if usar_numpy and gp.np is None:
+        pytest.skip("NumPy no está instalado")
+    if not usar_numpy:
+        monkeypatch.setattr(gp, "np", None)
+    azar = random.Random(semilla)
+    usados = set()
+    paises = [generar_pais(azar, usados) for _ in range(azar.randint(1, 300))]
+    for i in range(0, len(paises), 7):
+        paises[i]["poblacion"] = azar.choice(gp.LIMITES_HISTOGRAMA_POBLACION)
+
+    continentes, histograma = resumen_analitica(paises)
+
+    esperado = analitica_directa(paises)
+    assert continentes.keys() == esperado.keys()
+    for continente, datos in esperado.items():
+        assert continentes[continente] == pytest.approx(datos), continente
+    assert histograma == [sum(c) for c in zip(*(datos["histograma"] for datos in esperado.values()))]
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_las_altas_y_modificaciones_actualizan_las_columnas_sin_rearmarlas(columnar, sin_estado_global):
+    azar = random.Random(columnar)
+    usados = set()
+    paises = gp.TablaPaises() if columnar else []
+    for _ in range(50):
+        paises.append(generar_pais(azar, usados))
+    columnas = gp.columnas_analiticas(paises)
+    gp.calcular_analitica(paises)
+
+    for paso in range(40):
+        if paso % 2:
+            paises.append(generar_pais(azar, usados))
+            gp.registrar_pais(paises, len(paises) - 1)
+        else:
+            indice = azar.randrange(len(paises))
+            anterior = dict(paises[indice])
+            paises[indice]["poblacion"] = azar.randint(1, 10 ** 9)
+            # Un continente nuevo, y después otro que ya existe escrito distinto
+            paises[indice]["continente"] = "Antártida" if paso == 10 else " " + anterior["continente"].upper()
+            gp.registrar_pais(paises, indice, anterior)
+
+        assert gp.columnas_analiticas(paises) is columnas
+        continentes, _ = resumen_analitica(paises)
+        esperado = analitica_directa(paises)
+        assert continentes.keys() == esperado.keys()
+        for continente, datos in esperado.items():
+            assert continentes[continente] == pytest.approx(datos), (paso, continente)
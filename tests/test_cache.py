@@ -0,0 +1,81 @@
+"""
+Pruebas de la caché de consultas: los resultados no cambian al usarla, se
+invalida con cada modificación y respeta sus límites de entradas y posiciones.
+"""
+
+import pytest
+
+import Gestion_paises_Dominguez_Urrutia as gp
+from test_motores import MOTORES, SEMILLAS, consultas_al_azar, recorrer_motor
+
+
+@pytest.fixture
+def paises(sin_estado_global, monkeypatch):
+    monkeypatch.setattr(gp, "TAMANO_CACHE_CONSULTAS", 3)
+    monkeypatch.setattr(gp, "MAX_POSICIONES_CACHE", 10)
+    return [gp.crear_pais(f"País {i}", 1000 * i, i + 1, "Asia") for i in range(8)]
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_cache_de_consultas_no_cambia_los_resultados(tmp_path, semilla, sin_estado_global, monkeypatch):
+    def consultar_con_y_sin_cache(azar, paises):
+        nombres = [pais["nombre"] for pais in paises]
+        for descripcion, consulta in consultas_al_azar(azar, nombres):
+            monkeypatch.setattr(gp, "TAMANO_CACHE_CONSULTAS", 0)
+            esperado = consulta(paises)
+            monkeypatch.setattr(gp, "TAMANO_CACHE_CONSULTAS", 4)
+            monkeypatch.setattr(gp, "MAX_POSICIONES_CACHE", 60)
+            assert consulta(paises) == esperado, descripcion
+            assert consulta(paises) == esperado, f"(repetida) {descripcion}"
+            assert gp.cache_consultas["posiciones"] <= gp.MAX_POSICIONES_CACHE
+
+    for motor in MOTORES:
+        recorrer_motor(motor, tmp_path / "paises.db", semilla, 20, consultar_con_y_sin_cache, 100, 100)
+
+
+def test_una_consulta_repetida_es_un_acierto(paises):
+    primera = gp.filtrar_rango(paises, "poblacion", 0, 2000)
+    assert gp.filtrar_rango(paises, "poblacion", 0, 2000) is primera
+    estadisticas = gp.estadisticas_cache_consultas()
+    assert (estadisticas["aciertos"], estadisticas["fallos"], estadisticas["posiciones"]) == (1, 1, 3)
+
+
+def test_una_modificacion_invalida_los_resultados(paises):
+    assert gp.filtrar_rango(paises, "poblacion", 0, 2000) == [0, 1, 2]
+    anterior = dict(paises[5])
+    paises[5]["poblacion"] = 1500
+    gp.registrar_pais(paises, 5, anterior)
+
+    assert gp.filtrar_rango(paises, "poblacion", 0, 2000) == [0, 1, 2, 5]
+    assert gp.estadisticas_cache_consultas()["fallos"] == 2
+
+
+def test_descarta_primero_el_resultado_menos_usado(paises):
+    for maximo in (0, 1000, 2000):
+        gp.filtrar_rango(paises, "poblacion", 0, maximo)
+    gp.filtrar_rango(paises, "poblacion", 0, 0)
+    gp.filtrar_rango(paises, "superficie", 1, 1)
+
+    claves = [clave[2:] for clave in gp.cache_consultas["resultados"]]
+    assert claves == [(0, 2000), (0, 0), (1, 1)]
+    assert gp.cache_consultas["posiciones"] == 3 + 1 + 1
+
+
+def test_respeta_el_total_de_posiciones(paises):
+    gp.filtrar_rango(paises, "poblacion", 0, 3000)
+    gp.filtrar_rango(paises, "poblacion", 0, 4000)
+    assert gp.cache_consultas["posiciones"] == 4 + 5
+
+    # Para guardar 6 posiciones más hay que descartar los dos resultados anteriores
+    gp.filtrar_rango(paises, "poblacion", 0, 5000)
+    assert [clave[2:] for clave in gp.cache_consultas["resultados"]] == [(0, 5000)]
+    assert gp.cache_consultas["posiciones"] == 6
+
+
+def test_un_resultado_mas_grande_que_el_limite_no_se_guarda(paises, monkeypatch):
+    monkeypatch.setattr(gp, "MAX_POSICIONES_CACHE", 5)
+    gp.filtrar_rango(paises, "poblacion", 0, 1000)
+
+    assert len(gp.filtrar_rango(paises, "poblacion", 0, 10000)) == 8
+    assert [clave[2:] for clave in gp.cache_consultas["resultados"]] == [(0, 1000)]
+    assert gp.estadisticas_cache_consultas()["posiciones"] == 2
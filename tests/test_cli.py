@@ -0,0 +1,142 @@
+"""
+Pruebas del modo consulta por línea de comandos.
+"""
+
+import csv
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+import Gestion_paises_Dominguez_Urrutia as gp
+
+PAISES = [
+    ("Argentina", 45000000, 2780400, "América"),
+    ("Chile", 18000000, 756102, "América"),
+    ("Japón", 125000000, 377975, "Asia"),
+    ("Kenia", 54000000, 580367, "África"),
+    ("Perú", 33000000, 1285216, " américa"),
+]
+
+
+@pytest.fixture
+def ejecutar(en_directorio_temporal, monkeypatch, capsys):
+    """
+    Retorna una función que ejecuta el modo consulta con los argumentos dados
+    y retorna (código, salida, errores). ejecutar_comando cambia las
+    constantes globales de archivos y motor; monkeypatch las restaura.
+    """
+    for constante in ("ARCHIVO_CSV", "ARCHIVO_SQLITE", "MOTOR_ALMACENAMIENTO", "PROCESOS_CARGA"):
+        monkeypatch.setattr(gp, constante, getattr(gp, constante))
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais(*fila) for fila in PAISES])
+
+    def ejecutar(*argumentos):
+        gp.vaciar_cache_consultas()
+        codigo = gp.ejecutar_comando(list(argumentos))
+        salida = capsys.readouterr()
+        return codigo, salida.out, salida.err
+    return ejecutar
+
+
+def nombres(salida):
+    return [fila["nombre"] for fila in csv.DictReader(io.StringIO(salida))]
+
+
+def test_buscar_por_subcadena(ejecutar):
+    codigo, salida, _ = ejecutar("buscar", "EN")
+    assert codigo == 0
+    assert nombres(salida) == ["Argentina", "Kenia"]
+
+
+def test_buscar_sin_resultados_sugiere_nombres_parecidos(ejecutar):
+    codigo, salida, errores = ejecutar("buscar", "japin")
+    assert codigo == 0
+    assert nombres(salida) == []
+    assert "¿Quiso decir: Japón?" in errores
+
+
+def test_filtrar_por_continente_y_rango(ejecutar):
+    _, salida, _ = ejecutar("filtrar", "--continente", "AMÉRICA", "--poblacion", "20000000", "50000000")
+    assert nombres(salida) == ["Argentina", "Perú"]
+
+
+def test_ordenar_por_varias_columnas(ejecutar):
+    _, salida, _ = ejecutar("ordenar", "--por", "continente,-poblacion")
+    assert nombres(salida) == ["Argentina", "Perú", "Chile", "Japón", "Kenia"]
+    _, salida, _ = ejecutar("ordenar", "--por", "continente,-poblacion", "--desc")
+    assert nombres(salida) == ["Kenia", "Japón", "Chile", "Perú", "Argentina"]
+
+
+def test_ranking_y_ventana_de_resultados(ejecutar):
+    _, salida, _ = ejecutar("--formato", "jsonl", "ranking", "--por", "densidad", "--menores", "--cantidad", "3")
+    assert [json.loads(linea)["nombre"] for linea in salida.splitlines()] == ["Argentina", "Chile", "Perú"]
+    _, salida, _ = ejecutar("--desde", "1", "--limite", "2", "ordenar", "--por", "nombre")
+    assert nombres(salida) == ["Chile", "Japón"]
+
+
+def test_estadisticas_y_analitica(ejecutar):
+    _, salida, _ = ejecutar("--formato", "jsonl", "estadisticas")
+    estadisticas = json.loads(salida)
+    assert (estadisticas["total"], estadisticas["mayor_poblacion"], estadisticas["menor_poblacion"]) == (
+        5, "Japón", "Chile")
+    _, salida, _ = ejecutar("analitica")
+    filas = list(csv.DictReader(io.StringIO(salida)))
+    assert [(fila["continente"], fila["cantidad"]) for fila in filas] == [
+        ("América", "3"), ("Asia", "1"), ("África", "1")]
+
+
+def test_exportar_e_importar(ejecutar, en_directorio_temporal):
+    codigo, _, errores = ejecutar("exportar", "--salida", "copia.bin.gz")
+    assert codigo == 0 and "5 país(es) exportados" in errores
+    assert [p["nombre"] for p in gp.leer_registros("copia.bin.gz")] == [fila[0] for fila in PAISES]
+
+    (en_directorio_temporal / "nuevos.jsonl").write_text(
+        '{"nombre": "chile", "poblacion": 19000000, "superficie": 756102, "continente": "América"}\n'
+        '{"nombre": "Fiyi", "poblacion": 900000, "superficie": 18274, "continente": "Oceanía"}\n'
+        '{"nombre": "Nada", "poblacion": 0, "superficie": 1, "continente": "Oceanía"}\n', encoding="utf-8")
+    codigo, salida, errores = ejecutar("importar", "nuevos.jsonl")
+    assert codigo == 0
+    assert salida.splitlines()[1] == "1,1,1"
+    assert "Línea 3 de 'nuevos.jsonl' descartada" in errores
+    _, salida, _ = ejecutar("buscar", "chile")
+    assert list(csv.DictReader(io.StringIO(salida)))[0]["poblacion"] == "19000000"
+
+
+def test_importar_una_ruta_que_no_se_puede_leer(ejecutar, en_directorio_temporal):
+    codigo, _, errores = ejecutar("importar", str(en_directorio_temporal))
+    assert codigo == 1
+    assert "no se pudo importar" in errores
+
+
+def test_el_motor_sqlite_responde_igual_que_el_csv(ejecutar):
+    consultas = [("buscar", "a"), ("filtrar", "--continente", "américa"), ("ordenar", "--por=-superficie"),
+                 ("ranking", "--cantidad", "2"), ("estadisticas",)]
+    esperado = [ejecutar(*consulta)[1] for consulta in consultas]
+
+    codigo, salida, _ = ejecutar("migrar", "sqlite")
+    assert codigo == 0 and salida.startswith("5 país(es) copiados")
+    assert [ejecutar("--motor", "sqlite", *consulta)[1] for consulta in consultas] == esperado
+
+
+@pytest.mark.parametrize("argumentos", [
+    ["--limite", "-1", "buscar", "a"],
+    ["filtrar", "--poblacion", "10", "5"],
+    ["ordenar", "--por", "capital"],
+    ["ranking", "--cantidad", "-3"],
+    ["--procesos-carga", "0", "estadisticas"],
+])
+def test_argumentos_invalidos(ejecutar, argumentos):
+    with pytest.raises(SystemExit) as salida:
+        ejecutar(*argumentos)
+    assert salida.value.code == 2
+
+
+def test_el_script_ejecuta_el_modo_consulta(ejecutar, en_directorio_temporal):
+    resultado = subprocess.run([sys.executable, gp.__file__, "--limite", "1", "ordenar", "--por=-poblacion"],
+                               cwd=en_directorio_temporal, capture_output=True, text=True, encoding="utf-8",
+                               timeout=60)
+    assert resultado.returncode == 0
+    assert resultado.stdout.splitlines() == ["nombre,poblacion,superficie,continente",
+                                             "Japón,125000000,377975,Asia"]
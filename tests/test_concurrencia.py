@@ -0,0 +1,92 @@
+"""
+Pruebas de escritura concurrente: varios procesos agregan y modifican países
+en el mismo CSV y ningún cambio se pierde, con y sin journal.
+"""
+
+import multiprocessing
+import os
+
+import pytest
+
+import Gestion_paises_Dominguez_Urrutia as gp
+from conftest import reiniciar_estado_global
+
+PROCESOS = 4
+ALTAS_POR_PROCESO = 25
+
+
+def escribir_desde_otro_proceso(directorio, numero, usar_journal):
+    """
+    Agrega ALTAS_POR_PROCESO países propios y actualiza uno de ellos cada
+    tanto, recargando antes de cada cambio como lo hace el menú.
+    """
+    os.chdir(directorio)
+    gp.USAR_JOURNAL = usar_journal
+    gp.JOURNAL_MAX_REGISTROS = 7
+    paises = gp.cargar_paises()
+    for i in range(ALTAS_POR_PROCESO):
+        gp.recargar_cambios_externos(paises)
+        paises.append(gp.crear_pais(f"Proceso {numero} país {i}", 1000 + i, 10 + numero, "Asia"))
+        gp.registrar_pais(paises, len(paises) - 1)
+        gp.persistir_cambio(paises, paises[-1])
+        if i % 5 == 4:
+            gp.recargar_cambios_externos(paises)
+            indice = gp.buscar_pais_por_nombre(paises, f"Proceso {numero} país {i - 4}")
+            anterior = dict(paises[indice])
+            paises[indice]["poblacion"] = 999
+            gp.registrar_pais(paises, indice, anterior)
+            gp.persistir_cambio(paises, paises[indice])
+    gp.cerrar_journal()
+
+
+@pytest.mark.skipif(gp.fcntl is None, reason="sin bloqueo entre procesos en esta plataforma")
+@pytest.mark.parametrize("usar_journal", [True, False])
+def test_procesos_concurrentes_no_pierden_cambios(en_directorio_temporal, monkeypatch, usar_journal):
+    monkeypatch.setattr(gp, "USAR_JOURNAL", usar_journal)
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais("Chile", 18000000, 756102, "América")])
+
+    contexto = multiprocessing.get_context("spawn")
+    procesos = [contexto.Process(target=escribir_desde_otro_proceso,
+                                 args=(str(en_directorio_temporal), numero, usar_journal))
+                for numero in range(PROCESOS)]
+    for proceso in procesos:
+        proceso.start()
+    for proceso in procesos:
+        proceso.join(60)
+        assert proceso.exitcode == 0
+
+    reiniciar_estado_global()
+    paises = gp.cargar_paises()
+    poblaciones = {p["nombre"]: p["poblacion"] for p in paises}
+    assert len(paises) == len(poblaciones) == 1 + PROCESOS * ALTAS_POR_PROCESO
+    for numero in range(PROCESOS):
+        for i in range(ALTAS_POR_PROCESO):
+            esperado = 999 if i % 5 == 0 else 1000 + i
+            assert poblaciones[f"Proceso {numero} país {i}"] == esperado, (numero, i)
+    assert poblaciones["Chile"] == 18000000
+
+
+def test_guardar_incorpora_lo_escrito_por_otro_proceso(en_directorio_temporal, monkeypatch):
+    monkeypatch.setattr(gp, "USAR_JOURNAL", False)
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais("Chile", 18000000, 756102, "América"),
+                                           gp.crear_pais("Perú", 33000000, 1285216, "América")])
+    paises = gp.cargar_paises()
+
+    # Otro proceso quita Perú, modifica Chile y agrega Kenia
+    os.remove(gp.ruta_snapshot())
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais("Chile", 19000000, 756102, "América"),
+                                           gp.crear_pais("Kenia", 54000000, 580367, "África")])
+    os.utime(gp.ARCHIVO_CSV, ns=(0, 0))
+
+    # Este proceso modifica Perú sin haber visto esos cambios
+    indice = gp.buscar_pais_por_nombre(paises, "Perú")
+    anterior = dict(paises[indice])
+    paises[indice]["poblacion"] = 34000000
+    gp.registrar_pais(paises, indice, anterior)
+    gp.persistir_cambio(paises, paises[indice])
+
+    # Perú sigue en su posición porque el cambio propio tiene prioridad
+    esperado = [("Chile", 19000000), ("Perú", 34000000), ("Kenia", 54000000)]
+    assert [(p["nombre"], p["poblacion"]) for p in paises] == esperado
+    assert [(p["nombre"], p["poblacion"]) for p in gp.leer_registros(gp.ARCHIVO_CSV)] == esperado
+    assert gp.buscar_pais_por_nombre(paises, "kenia") == 2
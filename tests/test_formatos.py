@@ -0,0 +1,113 @@
+"""
+Pruebas de los formatos de archivo: ida y vuelta en CSV, JSON lines y
+binario, con y sin gzip, y los archivos binarios dañados.
+"""
+
+import gzip
+
+import pytest
+
+import Gestion_paises_Dominguez_Urrutia as gp
+
+EXTENSIONES = [".csv", ".csv.gz", ".jsonl", ".jsonl.gz", ".bin", ".bin.gz"]
+
+PAISES = [
+    gp.crear_pais("Argentina", 45000000, 2780400, "América"),
+    gp.crear_pais("Côte d'Ivoire, \"República\"", 27000000, 322463, "África"),
+    gp.crear_pais("日本", 125000000, 377975, "Asia"),
+    gp.crear_pais("Mundo", 2 ** 40, 2 ** 33, "Tierra"),
+    gp.crear_pais("N" * 300, 1, 1, "Asia"),
+    gp.crear_pais("Chile", 18000000, 756102, " AMÉRICA "),
+]
+
+
+def columnas(paises):
+    return [{columna: p[columna] for columna in gp.COLUMNAS_CSV} for p in paises]
+
+
+@pytest.mark.parametrize("extension", EXTENSIONES)
+def test_escribir_y_leer_devuelve_los_mismos_paises(tmp_path, extension):
+    ruta = str(tmp_path / ("paises" + extension))
+
+    assert gp.escribir_registros(ruta, iter(PAISES)) == len(PAISES)
+
+    leidos = list(gp.leer_registros(ruta))
+    assert columnas(leidos) == columnas(PAISES)
+    assert [p["continente_norm"] for p in leidos] == [p["continente_norm"] for p in PAISES]
+    if extension.endswith(".gz"):
+        with gzip.open(ruta) as archivo:
+            archivo.read()
+
+
+@pytest.mark.parametrize("extension", EXTENSIONES)
+def test_un_archivo_vacio_se_lee_sin_paises(tmp_path, extension):
+    ruta = str(tmp_path / ("paises" + extension))
+    gp.escribir_registros(ruta, [])
+    assert list(gp.leer_registros(ruta)) == []
+
+
+def test_el_binario_se_lee_por_bloques(tmp_path, monkeypatch):
+    monkeypatch.setattr(gp, "TAMANO_BLOQUE_BINARIO", 7)
+    ruta = str(tmp_path / "paises.bin")
+    paises = PAISES * 50
+    gp.escribir_registros(ruta, paises)
+    rechazados = []
+
+    assert columnas(gp.leer_registros(ruta, rechazados)) == columnas(paises)
+    assert rechazados == []
+
+
+def test_el_binario_es_mas_chico_que_el_csv(tmp_path):
+    paises = [gp.crear_pais(f"País {i}", 1000 * i + 1, i + 1, ["Asia", "Europa", "América"][i % 3])
+              for i in range(1000)]
+    gp.escribir_registros(str(tmp_path / "paises.csv"), paises)
+    gp.escribir_registros(str(tmp_path / "paises.bin"), paises)
+    assert (tmp_path / "paises.bin").stat().st_size < 0.7 * (tmp_path / "paises.csv").stat().st_size
+
+
+@pytest.mark.parametrize("corte", [1, 5, 11, 20])
+def test_un_registro_binario_incompleto_se_rechaza(tmp_path, corte):
+    ruta = tmp_path / "paises.bin"
+    gp.escribir_registros(str(ruta), PAISES[:2])
+    datos = ruta.read_bytes()
+    ruta.write_bytes(datos[:-corte])
+    rechazados = []
+
+    leidos = list(gp.leer_registros(str(ruta), rechazados))
+
+    assert columnas(leidos) == columnas(PAISES[:1])
+    assert [(r["linea"], r["motivo"]) for r in rechazados] == [(2, "registro incompleto")]
+
+
+def test_un_binario_con_otra_marca_no_se_lee(tmp_path):
+    ruta = tmp_path / "paises.bin"
+    gp.escribir_registros(str(ruta), PAISES)
+    ruta.write_bytes(b"PAISREG1" + ruta.read_bytes()[len(gp.MARCA_BINARIO):])
+
+    with pytest.raises(ValueError, match="no es un archivo binario de países"):
+        list(gp.leer_registros(str(ruta)))
+
+
+def test_el_modo_estricto_rechaza_registros_binarios_invalidos(tmp_path):
+    ruta = str(tmp_path / "paises.bin")
+    gp.escribir_registros(ruta, PAISES[:1] + [gp.crear_pais("Vacío", 0, 10, "Asia")])
+    rechazados = []
+
+    assert columnas(gp.leer_registros(ruta, rechazados, estricto=True)) == columnas(PAISES[:1])
+    assert [(r["linea"], r["contenido"]) for r in rechazados] == [(2, "Vacío")]
+
+
+@pytest.mark.parametrize("procesos", [1, 2])
+def test_las_lineas_en_blanco_del_csv_no_se_rechazan(tmp_path, procesos):
+    ruta = tmp_path / "paises.csv"
+    ruta.write_text("nombre,poblacion,superficie,continente\n\nChile,18000000,756102,América\n"
+                    "\r\nJapón,x,377975,Asia\n\nKenia,54000000,580367,África\n\n", encoding="utf-8")
+    rechazados = []
+
+    if procesos == 1:
+        paises = [p for lote in gp.leer_paises_por_lotes(str(ruta), rechazados=rechazados) for p in lote]
+    else:
+        paises = gp.cargar_paises_paralelo(str(ruta), procesos, rechazados)
+
+    assert [p["nombre"] for p in paises] == ["Chile", "Kenia"]
+    assert [(r["linea"], r["motivo"]) for r in rechazados] == [(5, "población inválida: 'x'")]
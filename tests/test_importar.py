@@ -0,0 +1,35 @@
+"""
+Pruebas de la importación de países desde archivos.
+"""
+
+import Gestion_paises_Dominguez_Urrutia as gp
+
+
+def test_importar_valida_y_deduplica_el_lote(en_directorio_temporal):
+    paises = gp.cargar_paises()
+    paises.append(gp.crear_pais("Japón", 125000000, 377975, "Asia"))
+    gp.registrar_pais(paises, 0)
+    with open("nuevos.csv", mode='w', encoding='utf-8', newline='') as archivo:
+        archivo.write("nombre,poblacion,superficie,continente\n"
+                      "JAPÓN,124000000,377975,Asia\n"
+                      "Kenia,0,580367,África\n"
+                      "Perú,33000000,1285216,América\n"
+                      "perú,34000000,1285216,América\n")
+    rechazados = []
+
+    resumen = gp.importar_paises(paises, "nuevos.csv", rechazados)
+
+    assert resumen == {"agregados": 1, "actualizados": 1, "rechazados": 1}
+    assert [r["linea"] for r in rechazados] == [3]
+    assert [(p["nombre"], p["poblacion"]) for p in gp.leer_paises_de_disco()] == [
+        ("Japón", 124000000), ("perú", 34000000)]
+
+
+def test_importar_desde_el_menu_informa_si_la_ruta_no_se_puede_leer(en_directorio_temporal, monkeypatch, capsys):
+    paises = gp.cargar_paises()
+    monkeypatch.setattr("builtins.input", lambda mensaje="": str(en_directorio_temporal))
+
+    gp.importar_archivo(paises)
+
+    assert "Error: No se pudo leer el archivo" in capsys.readouterr().out
+    assert len(paises) == 0
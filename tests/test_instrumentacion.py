@@ -0,0 +1,55 @@
+"""
+Pruebas de la instrumentación: mide las operaciones mientras está activa y
+desactivarla deja el módulo como antes de activarla.
+"""
+
+import signal
+
+import pytest
+
+import Gestion_paises_Dominguez_Urrutia as gp
+
+FUNCIONES = gp.FUNCIONES_INSTRUMENTADAS + ["normalizar_texto"]
+
+
+@pytest.fixture
+def paises(en_directorio_temporal):
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais("Chile", 18000000, 756102, "América"),
+                                           gp.crear_pais("Japón", 125000000, 377975, "Asia")])
+    yield gp.cargar_paises()
+    gp.desactivar_instrumentacion()
+
+
+def test_la_instrumentacion_mide_las_operaciones(paises):
+    gp.activar_instrumentacion()
+    llamadas = gp.metricas["operaciones"].get("buscar_por_subcadena", {}).get("llamadas", 0)
+
+    assert gp.buscar_por_subcadena(paises, "i") == [0]
+
+    operacion = gp.metricas["operaciones"]["buscar_por_subcadena"]
+    assert operacion["llamadas"] == llamadas + 1
+    assert operacion["filas_devueltas"] >= 1
+
+
+def test_desactivar_deshace_la_instrumentacion(paises):
+    originales = {nombre: getattr(gp, nombre) for nombre in FUNCIONES}
+    senal = signal.getsignal(signal.SIGUSR1) if hasattr(signal, "SIGUSR1") else None
+
+    gp.activar_instrumentacion("obtener_ranking")
+    assert all(getattr(gp, nombre) is not originales[nombre] for nombre in FUNCIONES)
+    gp.desactivar_instrumentacion()
+
+    assert {nombre: getattr(gp, nombre) for nombre in FUNCIONES} == originales
+    assert not gp.metricas["activo"] and gp.metricas["cprofile"] is None
+    if senal is not None:
+        assert signal.getsignal(signal.SIGUSR1) is senal
+    # Desactivada, las operaciones ya no se cuentan
+    operaciones = {nombre: dict(datos) for nombre, datos in gp.metricas["operaciones"].items()}
+    leidos = gp.metricas["bytes_leidos"]
+    gp.cargar_paises()
+    gp.obtener_ranking(paises, "poblacion", 1)
+    assert gp.metricas["operaciones"] == operaciones
+    assert gp.metricas["bytes_leidos"] == leidos
+    # Se puede volver a activar sin envolver dos veces
+    gp.activar_instrumentacion()
+    assert gp.cargar_paises.original is originales["cargar_paises"]
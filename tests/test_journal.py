@@ -0,0 +1,92 @@
+"""
+Pruebas del journal de cambios: reaplicación al reiniciar, línea final
+incompleta y compactación.
+"""
+
+import os
+
+import Gestion_paises_Dominguez_Urrutia as gp
+from conftest import reiniciar_estado_global
+
+
+def agregar(paises, *datos):
+    """Agrega un país como lo hace el menú."""
+    paises.append(gp.crear_pais(*datos))
+    gp.registrar_pais(paises, len(paises) - 1)
+    gp.persistir_cambio(paises, paises[-1])
+
+
+def modificar(paises, nombre, poblacion):
+    """Modifica la población de un país como lo hace el menú."""
+    indice = gp.buscar_pais_por_nombre(paises, nombre)
+    anterior = dict(paises[indice])
+    paises[indice]["poblacion"] = poblacion
+    gp.registrar_pais(paises, indice, anterior)
+    gp.persistir_cambio(paises, paises[indice])
+
+
+def reiniciar():
+    """Simula cerrar el programa y volver a abrirlo."""
+    gp.cerrar_journal()
+    reiniciar_estado_global()
+    return gp.cargar_paises()
+
+
+def filas(paises):
+    return [(p["nombre"], p["poblacion"], p["superficie"], p["continente"]) for p in paises]
+
+
+def test_los_cambios_del_journal_se_reaplican_al_reiniciar(en_directorio_temporal):
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais("Chile", 18000000, 756102, "América")])
+    paises = gp.cargar_paises()
+    agregar(paises, "Japón", 125000000, 377975, "Asia")
+    modificar(paises, "chile", 19000000)
+    agregar(paises, "Kenia", 54000000, 580367, "África")
+    esperado = filas(paises)
+
+    # El CSV no se reescribió: los cambios solo están en el journal
+    assert len(list(gp.leer_registros(gp.ARCHIVO_CSV))) == 1
+    assert os.path.exists(gp.ruta_journal())
+
+    paises = reiniciar()
+    assert filas(paises) == esperado
+    assert gp.buscar_pais_por_nombre(paises, "KENIA") == 2
+    assert gp.journal["registros"] == 3
+
+
+def test_una_linea_final_incompleta_se_ignora_y_se_recorta(en_directorio_temporal):
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais("Chile", 18000000, 756102, "América")])
+    with open(gp.ruta_journal(), mode='w', encoding='utf-8', newline='') as archivo:
+        archivo.write("Perú,33000000,1285216,América\r\nChile,19,756,Am")
+
+    paises = gp.cargar_paises()
+    assert filas(paises) == [("Chile", 18000000, 756102, "América"), ("Perú", 33000000, 1285216, "América")]
+
+    # El próximo registro no queda pegado a la línea incompleta
+    agregar(paises, "Japón", 125000000, 377975, "Asia")
+    with open(gp.ruta_journal(), encoding='utf-8', newline='') as archivo:
+        assert archivo.read() == "Perú,33000000,1285216,América\r\nJapón,125000000,377975,Asia\r\n"
+    assert filas(reiniciar()) == filas(paises)
+
+
+def test_recortar_linea_incompleta_sin_ningun_salto_de_linea(en_directorio_temporal):
+    with open(gp.ruta_journal(), mode='wb') as archivo:
+        archivo.write(b"x" * 10000)
+    gp.recortar_linea_incompleta()
+    assert os.path.getsize(gp.ruta_journal()) == 0
+
+
+def test_la_compactacion_reescribe_el_csv_y_elimina_el_journal(en_directorio_temporal, monkeypatch):
+    monkeypatch.setattr(gp, "JOURNAL_MAX_REGISTROS", 3)
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais("Chile", 18000000, 756102, "América")])
+    paises = gp.cargar_paises()
+    agregar(paises, "Japón", 125000000, 377975, "Asia")
+    modificar(paises, "Chile", 19000000)
+    assert os.path.exists(gp.ruta_journal())
+
+    agregar(paises, "Kenia", 54000000, 580367, "África")
+
+    assert not os.path.exists(gp.ruta_journal())
+    assert gp.journal["registros"] == 0
+    assert filas(gp.leer_registros(gp.ARCHIVO_CSV)) == filas(paises)
+    assert filas(reiniciar()) == filas(paises)
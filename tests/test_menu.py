@@ -0,0 +1,16 @@
+"""
+Pruebas del menú interactivo.
+"""
+
+import Gestion_paises_Dominguez_Urrutia as gp
+
+
+def test_la_opcion_10_sigue_siendo_salir(en_directorio_temporal, monkeypatch, capsys):
+    respuestas = iter(["", "10"])
+    monkeypatch.setattr("builtins.input", lambda mensaje="": next(respuestas))
+
+    gp.main()
+
+    salida = capsys.readouterr().out
+    assert "10. Salir" in salida
+    assert "--- SALIENDO DEL SISTEMA ---" in salida
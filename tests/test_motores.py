@@ -0,0 +1,172 @@
+"""
+Pruebas aleatorias que comparan los tres motores de almacenamiento: la lista
+de diccionarios en memoria, la tabla columnar (TablaPaises) y la base SQLite
+(TablaSQLite). Con los mismos datos y las mismas altas y modificaciones,
+todas las consultas deben devolver las mismas posiciones. Cada motor recorre
+la secuencia por separado, de modo que se prueban los índices actualizados
+con cada cambio y no reconstruidos.
+"""
+
+import random
+
+import pytest
+
+import Gestion_paises_Dominguez_Urrutia as gp
+
+SILABAS = ["ar", "gen", "ti", "na", "bra", "sil", "ja", "pón", "ale", "ma", "Ñu", "chí", "le", "pe", "ÜR"]
+CONTINENTES = ["Asia", "asia", " ASIA ", "América", "AMÉRICA", "Europa", "África", "Oceanía"]
+SEMILLAS = range(8)
+
+
+def generar_nombre(azar, usados):
+    """Retorna un nombre de país cuyo nombre normalizado todavía no está en usados."""
+    while True:
+        nombre = "".join(azar.choice(SILABAS) for _ in range(azar.randint(1, 4)))
+        if azar.random() < 0.3:
+            nombre = nombre.upper()
+        nombre_norm = gp.normalizar_texto(nombre)
+        if nombre_norm not in usados:
+            usados.add(nombre_norm)
+            return nombre
+
+
+def generar_pais(azar, usados):
+    """Retorna un país al azar, con valores repetidos a propósito para probar los empates."""
+    return gp.crear_pais(generar_nombre(azar, usados), azar.randint(1, 40) * 1000,
+                         azar.randint(1, 30), azar.choice(CONTINENTES))
+
+
+MOTORES = ["lista", "columnar", "sqlite"]
+
+
+def crear_motor(motor, ruta_base, filas):
+    """Retorna la lista, la TablaPaises o la TablaSQLite con las filas cargadas."""
+    if motor == "lista":
+        return [dict(pais) for pais in filas]
+    if motor == "columnar":
+        paises = gp.TablaPaises()
+        for pais in filas:
+            paises.append(pais)
+        return paises
+    paises = gp.TablaSQLite(str(ruta_base))
+    paises.agregar_varios(filas)
+    paises.confirmar()
+    return paises
+
+
+def aplicar_cambio(paises, cambio):
+    """
+    Aplica el cambio: un alta o una modificación de números como lo hace el
+    menú, o un reemplazo del registro completo como al importar.
+    """
+    if cambio[0] == "alta":
+        paises.append(dict(cambio[1]))
+        gp.registrar_pais(paises, len(paises) - 1)
+    elif cambio[0] == "modificacion":
+        _, indice, nuevos = cambio
+        anterior = dict(paises[indice])
+        paises[indice].update(nuevos)
+        gp.registrar_pais(paises, indice, anterior)
+    else:
+        _, indice, pais = cambio
+        gp.aplicar_cambio_externo(paises, indice, pais)
+
+
+def cambio_al_azar(azar, paises, usados):
+    """
+    Retorna al azar un alta, una modificación de población o superficie, o el
+    reemplazo de un registro por otro con otro continente y a veces otro nombre.
+    """
+    if azar.random() < 0.3 or not paises:
+        return ("alta", generar_pais(azar, usados))
+    indice = azar.randrange(len(paises))
+    if azar.random() < 0.25:
+        nombre = generar_nombre(azar, usados) if azar.random() < 0.5 else paises[indice]["nombre"]
+        return ("reemplazo", indice, gp.crear_pais(nombre, azar.randint(1, 40) * 1000, azar.randint(1, 30),
+                                                   azar.choice(CONTINENTES)))
+    nuevos = {}
+    if azar.random() < 0.7:
+        nuevos["poblacion"] = azar.randint(1, 40) * 1000
+    if azar.random() < 0.5:
+        nuevos["superficie"] = azar.randint(1, 30)
+    return ("modificacion", indice, nuevos or {"poblacion": 1})
+
+
+def recorrer_motor(motor, ruta_base, semilla, pasos, consultar, minimo=50, maximo=250):
+    """
+    Carga en el motor entre minimo y maximo países al azar y alterna pasos de
+    consultas y cambios; con la misma semilla la secuencia es igual en todos
+    los motores. consultar(azar, países) retorna los resultados de un paso.
+    Cada motor se recorre por separado porque los índices en memoria son de
+    una sola lista a la vez: así se actualizan con cada cambio en lugar de
+    reconstruirse. Retorna (resultados de cada paso, filas finales).
+    """
+    gp.vaciar_cache_consultas()
+    gp.reconstruir_indices([])
+    azar = random.Random(semilla)
+    usados = set()
+    paises = crear_motor(motor, ruta_base, [generar_pais(azar, usados) for _ in range(azar.randint(minimo, maximo))])
+    try:
+        resultados = []
+        for _ in range(pasos):
+            resultados.append(consultar(azar, paises))
+            aplicar_cambio(paises, cambio_al_azar(azar, paises, usados))
+        return resultados, [{columna: p[columna] for columna in gp.COLUMNAS_CSV} for p in paises]
+    finally:
+        if motor == "sqlite":
+            paises.cerrar()
+
+
+def consultas_al_azar(azar, nombres):
+    """Genera pares (descripción, función de consulta) con parámetros al azar."""
+    nombre = azar.choice(nombres)
+    desde = azar.randrange(len(nombre))
+    termino = nombre[desde:desde + azar.randint(1, 4)]
+    minimo = azar.randint(0, 40) * 1000
+    rango_poblacion = (minimo, minimo + azar.randint(0, 20) * 1000)
+    rango_superficie = (azar.randint(0, 15), azar.randint(15, 31))
+    superficie = rango_superficie if azar.random() < 0.5 else None
+    continente = azar.choice(CONTINENTES + [None])
+    criterios = tuple(azar.choice(["", "-"]) + columna
+                      for columna in azar.sample(gp.COLUMNAS_ORDEN, azar.randint(1, 3)))
+    criterio = azar.choice(gp.COLUMNAS_RANKING)
+    cantidad = azar.randint(1, 15)
+    mayores = azar.random() < 0.5
+    parecido = nombre.lower()[:-1] + azar.choice("xyzá") if len(nombre) > 2 else nombre + "x"
+
+    return [
+        (f"buscar_por_subcadena {termino!r}", lambda p: gp.buscar_por_subcadena(p, termino)),
+        (f"buscar_pais_por_nombre {nombre!r}", lambda p: gp.buscar_pais_por_nombre(p, nombre.upper())),
+        (f"filtrar_rango poblacion {rango_poblacion}", lambda p: gp.filtrar_rango(p, "poblacion", *rango_poblacion)),
+        (f"filtrar_rango superficie {rango_superficie}",
+         lambda p: gp.filtrar_rango(p, "superficie", *rango_superficie)),
+        (f"consultar_paises {rango_poblacion} {superficie} {continente!r}",
+         lambda p: list(gp.consultar_paises(p, poblacion=rango_poblacion, superficie=superficie,
+                                            continente=continente))),
+        (f"obtener_orden {criterios}", lambda p: list(gp.obtener_orden(p, criterios))),
+        (f"obtener_ranking {criterio} {cantidad} {mayores} {continente!r}",
+         lambda p: gp.obtener_ranking(p, criterio, cantidad, mayores, continente)),
+        ("obtener_estadisticas", gp.obtener_estadisticas),
+        (f"buscar_parecidos {parecido!r}", lambda p: gp.buscar_parecidos(p, parecido)),
+        (f"sugerir_sin_arbol {parecido!r}", lambda p: gp.sugerir_sin_arbol(p, parecido)),
+    ]
+
+
+def consultar_al_azar(azar, paises):
+    """Ejecuta las consultas de consultas_al_azar y retorna [(descripción, resultado)]."""
+    nombres = [pais["nombre"] for pais in paises]
+    return [(descripcion, consulta(paises)) for descripcion, consulta in consultas_al_azar(azar, nombres)]
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_motores_devuelven_las_mismas_posiciones(tmp_path, semilla, sin_estado_global):
+    recorridos = {motor: recorrer_motor(motor, tmp_path / "paises.db", semilla, 40, consultar_al_azar)
+                  for motor in MOTORES}
+
+    pasos, filas = recorridos["lista"]
+    for motor in ("columnar", "sqlite"):
+        for paso, (esperados, obtenidos) in enumerate(zip(pasos, recorridos[motor][0])):
+            for (descripcion, esperado), (_, obtenido) in zip(esperados, obtenidos):
+                assert obtenido == esperado, f"{motor}, paso {paso}: {descripcion}"
+        # Después de los cambios, los tres motores guardan exactamente los mismos países
+        assert recorridos[motor][1] == filas
@@ -0,0 +1,124 @@
+"""
+Pruebas de la recarga de cambios hechos por otro proceso: los índices ya
+construidos y la caché de consultas deben quedar igual que si la lista se
+hubiera cargado de cero.
+"""
+
+import os
+
+import pytest
+
+import Gestion_paises_Dominguez_Urrutia as gp
+
+INICIALES = [
+    ("Argentina", 45000000, 2780400, "América"),
+    ("Chile", 18000000, 756102, "América"),
+    ("Japón", 125000000, 377975, "Asia"),
+    ("Kenia", 54000000, 580367, "África"),
+    ("Perú", 33000000, 1285216, "América"),
+]
+
+
+def consultar_todo(paises):
+    """Ejecuta sobre la lista las consultas que usan cada índice y la caché."""
+    return {
+        "por_nombre": [gp.buscar_pais_por_nombre(paises, p["nombre"].upper()) for p in paises],
+        "subcadena": [gp.buscar_por_subcadena(paises, termino) for termino in ("a", "ile", "nia", "ecu")],
+        "rango": gp.filtrar_rango(paises, "poblacion", 20000000, 60000000),
+        "continente": list(gp.consultar_paises(paises, continente="américa")),
+        "orden": list(gp.obtener_orden(paises, ("-superficie",))),
+        "ranking": gp.obtener_ranking(paises, "densidad", 3),
+        "estadisticas": gp.obtener_estadisticas(paises),
+        "parecidos": gp.buscar_parecidos(paises, "kenya"),
+    }
+
+
+def construir_todos_los_indices(paises):
+    """Construye cada índice, para que la recarga tenga que actualizarlos."""
+    for nombre in gp.CONSTRUCTORES_INDICES:
+        gp.obtener_indice(paises, nombre)
+    for columna in gp.COLUMNAS_RANGO:
+        gp.obtener_rango(paises, columna)
+    gp.obtener_arbol_nombres(paises)
+    consultar_todo(paises)
+    consultar_todo(paises)
+
+
+def comprobar_como_recien_cargada(paises):
+    """Compara las consultas sobre la lista recargada con las de una copia nueva."""
+    obtenido = consultar_todo(paises)
+    copia = [dict(p) for p in paises]
+    gp.vaciar_cache_consultas()
+    assert obtenido == consultar_todo(copia)
+
+
+def reescribir_csv_desde_otro_proceso(filas):
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais(*fila) for fila in filas])
+    # Otra fecha de modificación aunque el tamaño coincida
+    os.utime(gp.ARCHIVO_CSV, ns=(1, 1))
+
+
+@pytest.fixture
+def paises(en_directorio_temporal):
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais(*fila) for fila in INICIALES])
+    paises = gp.cargar_paises()
+    construir_todos_los_indices(paises)
+    return paises
+
+
+def test_recarga_solo_los_registros_nuevos_del_journal(paises, monkeypatch):
+    por_nombre = gp.indices["por_nombre"]
+    with open(gp.ruta_journal(), mode='a', encoding='utf-8', newline='') as archivo:
+        archivo.write("Chile,19000000,756102,América\r\nEcuador,18000000,283561,América\r\n")
+    # Con solo el journal nuevo no hace falta releer el CSV
+    monkeypatch.setattr(gp, "leer_paises_consistentes", None)
+
+    assert gp.recargar_cambios_externos(paises) == 2
+
+    assert gp.indices["por_nombre"] is por_nombre
+    assert gp.journal["registros"] == 2
+    assert [p["nombre"] for p in paises][-1] == "Ecuador"
+    assert gp.buscar_por_subcadena(paises, "ecu") == [5]
+    comprobar_como_recien_cargada(paises)
+
+
+def test_recarga_un_csv_reescrito_actualizando_solo_lo_que_cambio(paises):
+    por_nombre = gp.indices["por_nombre"]
+    reescribir_csv_desde_otro_proceso(INICIALES[:1] + [("Chile", 19000000, 756102, "América")] + INICIALES[2:]
+                                      + [("Kenya", 1000, 10, "Oceanía")])
+
+    assert gp.recargar_cambios_externos(paises) == 2
+
+    assert gp.indices["por_nombre"] is por_nombre
+    assert paises[1]["poblacion"] == 19000000
+    assert gp.buscar_parecidos(paises, "kenya") == [5, 3]
+    comprobar_como_recien_cargada(paises)
+
+
+def test_si_faltan_paises_en_disco_reconstruye_los_indices(paises):
+    reescribir_csv_desde_otro_proceso(INICIALES[:2] + INICIALES[3:])
+
+    assert gp.recargar_cambios_externos(paises) == 1
+
+    assert [p["nombre"] for p in paises] == ["Argentina", "Chile", "Kenia", "Perú"]
+    assert gp.buscar_pais_por_nombre(paises, "Japón") is None
+    assert gp.obtener_ranking(paises, "poblacion", 1) == [2]
+    comprobar_como_recien_cargada(paises)
+
+
+def test_con_demasiados_cambios_reconstruye_los_indices(paises, monkeypatch):
+    monkeypatch.setattr(gp, "MAX_CAMBIOS_INCREMENTALES", 2)
+    por_nombre = gp.indices["por_nombre"]
+    reescribir_csv_desde_otro_proceso([(nombre, poblacion + 1, superficie, continente)
+                                       for nombre, poblacion, superficie, continente in INICIALES])
+
+    assert gp.recargar_cambios_externos(paises) == 5
+
+    assert gp.obtener_indice(paises, "por_nombre") is not por_nombre
+    assert [p["poblacion"] for p in paises] == [fila[1] + 1 for fila in INICIALES]
+    comprobar_como_recien_cargada(paises)
+
+
+def test_sin_cambios_en_disco_no_lee_nada(paises, monkeypatch):
+    monkeypatch.setattr(gp, "leer_cambios_externos", None)
+    assert gp.recargar_cambios_externos(paises) == 0
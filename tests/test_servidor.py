@@ -0,0 +1,112 @@
+"""
+Pruebas del servidor de consultas: lecturas, escrituras y solicitudes de
+más de MAXIMO_SOLICITUD bytes, sobre un socket Unix en un directorio temporal.
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+import Gestion_paises_Dominguez_Urrutia as gp
+
+PAISES = [
+    ("Argentina", 45000000, 2780400, "América"),
+    ("Chile", 18000000, 756102, "América"),
+    ("Japón", 125000000, 377975, "Asia"),
+]
+
+
+@pytest.fixture
+def paises(en_directorio_temporal):
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais(*fila) for fila in PAISES])
+    return gp.cargar_paises()
+
+
+def test_atender_lectura(paises):
+    respuesta = gp.atender_lectura(paises, {"op": "ordenar", "por": "-poblacion", "desde": 1, "limite": 1})
+    assert respuesta == {"ok": True, "total": 3, "paises": [
+        {"nombre": "Argentina", "poblacion": 45000000, "superficie": 2780400, "continente": "América"}]}
+    assert gp.atender_lectura(paises, {"op": "obtener", "nombre": "JAPON"})["total"] == 0
+    assert gp.atender_lectura(paises, {"op": "sugerir", "nombre": "JAPON"})["paises"][0]["nombre"] == "Japón"
+    assert gp.atender_lectura(paises, {"op": "filtrar", "continente": "américa",
+                                       "poblacion": [20000000, 50000000]})["total"] == 1
+    assert gp.atender_lectura(paises, {"op": "estadisticas"})["estadisticas"]["total"] == 3
+    with pytest.raises(ValueError, match="columna desconocida"):
+        gp.atender_lectura(paises, {"op": "ordenar", "por": "capital"})
+    with pytest.raises(ValueError, match="operación desconocida"):
+        gp.atender_lectura(paises, {"op": "borrar"})
+
+
+def test_aplicar_escritura(paises):
+    assert gp.aplicar_escritura(paises, {"op": "agregar", "nombre": "Kenia", "poblacion": 54000000,
+                                         "superficie": 580367, "continente": "África"})[0] == {"ok": True}
+    assert gp.buscar_pais_por_nombre(paises, "kenia") == 3
+
+    respuestas = [
+        gp.aplicar_escritura(paises, {"op": "agregar", "nombre": "chile", "poblacion": 1, "superficie": 1,
+                                      "continente": "América"}),
+        gp.aplicar_escritura(paises, {"op": "agregar", "nombre": "Nada", "poblacion": 0, "superficie": 1,
+                                      "continente": "Asia"}),
+        gp.aplicar_escritura(paises, {"op": "actualizar", "nombre": "Atlántida", "poblacion": 1}),
+        gp.aplicar_escritura(paises, {"op": "actualizar", "nombre": "Chile", "poblacion": "-5"}),
+        gp.aplicar_escritura(paises, {"op": "actualizar", "nombre": "Chile"}),
+    ]
+    assert [(respuesta["ok"], pais) for respuesta, pais in respuestas] == [(False, None)] * 5
+    assert len(paises) == 4
+
+    respuesta, pais = gp.aplicar_escritura(paises, {"op": "actualizar", "nombre": "CHILE", "poblacion": 19000000})
+    assert respuesta == {"ok": True} and pais["poblacion"] == 19000000
+    assert gp.filtrar_rango(paises, "poblacion", 19000000, 19000000) == [1]
+
+
+async def conversar(paises, ruta_socket, solicitudes):
+    """Inicia el servidor, envía cada línea por una misma conexión y retorna las respuestas."""
+    servidor = asyncio.create_task(gp.ejecutar_servidor(paises, socket_unix=ruta_socket))
+    try:
+        for _ in range(100):
+            if os.path.exists(ruta_socket):
+                break
+            await asyncio.sleep(0.01)
+        lector, escritor = await asyncio.open_unix_connection(ruta_socket, limit=2 ** 22)
+        respuestas = []
+        for linea in solicitudes:
+            escritor.write(linea + b"\n")
+            await escritor.drain()
+            respuestas.append(json.loads(await lector.readline()))
+        escritor.close()
+        return respuestas
+    finally:
+        servidor.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await servidor
+
+
+@pytest.mark.skipif(not hasattr(asyncio, "open_unix_connection") or os.name == "nt", reason="sin sockets Unix")
+def test_el_servidor_atiende_una_conexion(paises, en_directorio_temporal, monkeypatch):
+    monkeypatch.setattr(gp, "MAXIMO_SOLICITUD", 1024)
+    solicitudes = [
+        json.dumps({"op": "buscar", "termino": "a"}).encode(),
+        json.dumps({"op": "buscar", "termino": "a" * 5000}).encode(),
+        b"no es json",
+        b"[1, 2]",
+        json.dumps({"op": "agregar", "nombre": "Perú", "poblacion": 33000000, "superficie": 1285216,
+                    "continente": "América"}).encode(),
+        json.dumps({"op": "agregar", "nombre": "Perú", "poblacion": 1, "superficie": 1,
+                    "continente": "América"}).encode(),
+        json.dumps({"op": "obtener", "nombre": "perú"}).encode(),
+        json.dumps({"op": "cache"}).encode(),
+    ]
+
+    respuestas = asyncio.run(conversar(paises, str(en_directorio_temporal / "servidor.sock"), solicitudes))
+
+    assert respuestas[0]["total"] == 2
+    # La solicitud demasiado larga se descarta sin cerrar la conexión
+    assert respuestas[1] == {"ok": False, "error": "la solicitud supera el máximo de 1024 bytes"}
+    assert [respuesta["ok"] for respuesta in respuestas[2:]] == [False, False, True, False, True, True]
+    assert "ya existe" in respuestas[5]["error"]
+    assert respuestas[6]["paises"][0]["poblacion"] == 33000000
+    # El alta quedó en el journal antes de la respuesta
+    gp.cerrar_journal()
+    assert [p["nombre"] for p in gp.leer_journal_desde(0)[0]] == ["Perú"]
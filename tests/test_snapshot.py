@@ -0,0 +1,64 @@
+"""
+Pruebas del snapshot binario: cargar desde el snapshot devuelve lo mismo que
+leer el CSV, en lista y en tabla columnar, y un snapshot que no sirve se ignora.
+"""
+
+import os
+
+import pytest
+
+import Gestion_paises_Dominguez_Urrutia as gp
+
+PAISES = [
+    ("Argentina", 45000000, 2780400, "América"),
+    ("Côte d'Ivoire", 27000000, 322463, "África"),
+    ("日本", 125000000, 377975, "Asia"),
+    ("Chile", 18000000, 756102, " AMÉRICA "),
+    ("Mundo", 2 ** 40, 2 ** 33, "Asia"),
+]
+
+
+def registros(paises):
+    return [dict(p) for p in paises]
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+@pytest.mark.parametrize("filas", [PAISES, []])
+def test_el_snapshot_devuelve_lo_mismo_que_el_csv(en_directorio_temporal, monkeypatch, columnar, filas):
+    monkeypatch.setattr(gp, "USAR_TABLA_COLUMNAR", columnar)
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais(*fila) for fila in filas])
+    monkeypatch.setattr(gp, "USAR_SNAPSHOT", False)
+    esperado = registros(gp.leer_paises_consistentes()[0])
+    monkeypatch.setattr(gp, "USAR_SNAPSHOT", True)
+    gp.guardar_snapshot(esperado, os.stat(gp.ARCHIVO_CSV))
+
+    paises = gp.cargar_snapshot()
+
+    assert isinstance(paises, gp.TablaPaises if columnar else list)
+    assert registros(paises) == esperado
+    if columnar and filas:
+        # Los continentes escritos distinto comparten la forma normalizada
+        assert paises.continentes_norm == ["américa", "áfrica", "asia", "américa"]
+        paises.append(gp.crear_pais("Perú", 33000000, 1285216, "América"))
+        assert paises.codigos_continente[-1] == 0
+
+
+def test_un_snapshot_truncado_o_de_otro_csv_se_ignora(en_directorio_temporal):
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais(*fila) for fila in PAISES])
+    gp.cargar_paises()
+    ruta = en_directorio_temporal / gp.ruta_snapshot()
+    datos = ruta.read_bytes()
+    assert registros(gp.cargar_snapshot()) == registros(gp.crear_pais(*fila) for fila in PAISES)
+
+    ruta.write_bytes(datos[:-40])
+    assert gp.cargar_snapshot() is None
+
+    ruta.write_bytes(datos)
+    os.utime(gp.ARCHIVO_CSV, ns=(1, 1))
+    assert gp.cargar_snapshot() is None
+
+
+def test_un_nombre_con_el_separador_no_genera_snapshot(en_directorio_temporal):
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais("Uno\x00Dos", 1, 1, "Asia")])
+    gp.cargar_paises()
+    assert not os.path.exists(gp.ruta_snapshot())
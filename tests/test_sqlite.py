@@ -0,0 +1,37 @@
+"""
+Pruebas de la migración entre el CSV (con su journal) y la base SQLite.
+"""
+
+import Gestion_paises_Dominguez_Urrutia as gp
+
+
+def escribir_csv(filas):
+    gp.escribir_registros(gp.ARCHIVO_CSV, [gp.crear_pais(*fila) for fila in filas])
+
+
+def test_migrar_ignora_la_ultima_linea_incompleta_del_journal(en_directorio_temporal):
+    escribir_csv([("Argentina", 45000000, 2780400, "América"), ("Chile", 18000000, 756102, "América")])
+    with open(gp.ruta_journal(), mode='w', encoding='utf-8', newline='') as archivo:
+        archivo.write("Perú,33000000,1285216,América\r\nChile,19,756,Am")
+
+    assert gp.migrar_csv_a_sqlite() == 3
+
+    tabla = gp.TablaSQLite(gp.ARCHIVO_SQLITE)
+    try:
+        en_base = [{columna: p[columna] for columna in gp.COLUMNAS_CSV} for p in tabla]
+    finally:
+        tabla.cerrar()
+    en_csv = [{columna: p[columna] for columna in gp.COLUMNAS_CSV} for p in gp.leer_paises_de_disco()]
+    assert en_base == en_csv
+    assert en_base[1] == {"nombre": "Chile", "poblacion": 18000000, "superficie": 756102, "continente": "América"}
+
+
+def test_exportar_sqlite_a_csv_vuelve_al_mismo_contenido(en_directorio_temporal):
+    escribir_csv([("Japón", 125000000, 377975, "Asia"), ("Kenia", 54000000, 580367, "África")])
+    with open(gp.ruta_journal(), mode='w', encoding='utf-8', newline='') as archivo:
+        archivo.write("Japón,124000000,377975,Asia\r\n")
+    gp.migrar_csv_a_sqlite()
+
+    assert gp.exportar_sqlite_a_csv() == 2
+    assert not (en_directorio_temporal / gp.ruta_journal()).exists()
+    assert [p["poblacion"] for p in gp.leer_paises_de_disco()] == [124000000, 54000000]
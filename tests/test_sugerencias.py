@@ -0,0 +1,76 @@
+"""
+Pruebas de las sugerencias de nombres parecidos: la distancia de edición,
+el árbol BK mantenido con cada cambio y la búsqueda lineal del modo consulta.
+"""
+
+import random
+
+import pytest
+
+import Gestion_paises_Dominguez_Urrutia as gp
+from test_motores import MOTORES, SEMILLAS, recorrer_motor
+
+
+def levenshtein(a, b):
+    """Distancia de edición con la tabla de programación dinámica clásica."""
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        actual = [i]
+        for j, cb in enumerate(b, 1):
+            actual.append(min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        anterior = actual
+    return anterior[-1]
+
+
+def parecidos_por_fuerza_bruta(paises, nombre, distancia, plegar, cantidad):
+    termino = gp.normalizar_termino(nombre)
+    encontrados = []
+    for i, p in enumerate(paises):
+        a, b = termino, p["nombre_norm"]
+        if plegar:
+            a, b = gp.plegar_acentos(a), gp.plegar_acentos(b)
+        d = levenshtein(a, b)
+        if d <= distancia:
+            encontrados.append((d, i))
+    return [i for _, i in sorted(encontrados)[:cantidad]]
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_distancia_edicion_coincide_con_la_tabla_clasica(semilla):
+    azar = random.Random(semilla)
+    for _ in range(300):
+        a = "".join(azar.choice("abcñá ") for _ in range(azar.randint(0, 80)))
+        b = "".join(azar.choice("abcñá ") for _ in range(azar.randint(0, 80)))
+        assert gp.distancia_edicion(a, b) == levenshtein(a, b), (a, b)
+
+
+@pytest.mark.parametrize("motor", MOTORES)
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_el_arbol_bk_encuentra_lo_mismo_que_la_fuerza_bruta(tmp_path, semilla, motor, sin_estado_global):
+    def comparar(azar, paises):
+        nombre = azar.choice(paises)["nombre"]
+        nombre = nombre[:-1] + azar.choice("xáé") if azar.random() < 0.7 else nombre
+        distancia = azar.randint(0, 3)
+        plegar = azar.random() < 0.7
+        esperado = parecidos_por_fuerza_bruta(paises, nombre, distancia, plegar, 5)
+        # El árbol se construye en la primera búsqueda y después se actualiza con cada cambio
+        assert gp.buscar_parecidos(paises, nombre, distancia, plegar) == esperado, nombre
+        if plegar:
+            assert gp.sugerir_sin_arbol(paises, nombre, distancia) == esperado, nombre
+
+    recorrer_motor(motor, tmp_path / "paises.db", semilla, 30, comparar, 20, 150)
+
+def test_sqlite_sugiere_paises_agregados_por_otra_conexion(tmp_path, sin_estado_global):
+    ruta = str(tmp_path / "paises.db")
+    tabla = gp.TablaSQLite(ruta)
+    otra = gp.TablaSQLite(ruta)
+    try:
+        tabla.agregar_varios([gp.crear_pais("Japón", 125000000, 377975, "Asia")])
+        tabla.confirmar()
+        assert gp.buscar_parecidos(tabla, "japon") == [0]
+        otra.append(gp.crear_pais("Jordania", 10000000, 89342, "Asia"))
+        otra.confirmar()
+        assert gp.buscar_parecidos(tabla, "jordana") == [1]
+    finally:
+        otra.cerrar()
+        tabla.cerrar()